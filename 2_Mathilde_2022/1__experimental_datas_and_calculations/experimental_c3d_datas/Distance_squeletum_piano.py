@@ -1,44 +1,29 @@
-from ezc3d import c3d
-
-c3d = c3d("004_BasPreStaA.c3d")
+from c3d_kinematics import MIDDLE_FINGER_MARKER
+from anthropometry import read_markers, THORAX_MARKERS
 
+# The markers are read by their label, on the frame 2048 where the finger is on the key.
 # middle_finger : index [46]
 # thl_thorax_side : index [16]
 # XIPH_thorax_front : index [11]
 # XIPHback_thorax_back : index [15]
+markers = read_markers("004_BasPreStaA.c3d", THORAX_MARKERS, 2048)
 
-thl_thorax_side_x = c3d["data"]["points"][0][16][2048]
-thl_thorax_side_y = c3d["data"]["points"][1][16][2048]
-thl_thorax_side_z = c3d["data"]["points"][2][16][2048]
-
-XIPH_thorax_front_x = c3d["data"]["points"][0][11][2048]
-XIPH_thorax_front_y = c3d["data"]["points"][1][11][2048]
-XIPH_thorax_front_z = c3d["data"]["points"][2][11][2048]
-
-XIPHback_thorax_back_x = c3d["data"]["points"][0][15][2048]
-XIPHback_thorax_back_y = c3d["data"]["points"][1][15][2048]
-XIPHback_thorax_back_z = c3d["data"]["points"][2][15][2048]
+thl_thorax_side_x, thl_thorax_side_y, thl_thorax_side_z = markers["thl_thorax_side"]
+XIPH_thorax_front_x, XIPH_thorax_front_y, XIPH_thorax_front_z = markers["XIPH_thorax_front"]
+XIPHback_thorax_back_x, XIPHback_thorax_back_y, XIPHback_thorax_back_z = markers["XIPHback_thorax_back"]
 
 print("\n")
 print("// On the experimentation frame //")
-distance1 = []
-for i in range(3):
-    distance1.append(c3d["data"]["points"][i][16][2048])
+distance1 = list(markers["thl_thorax_side"])
 print("thl_thorax_side : ", distance1)
 
-distance2 = []
-for i in range(3):
-    distance2.append(c3d["data"]["points"][i][11][2048])
+distance2 = list(markers["XIPH_thorax_front"])
 print("XIPH_thorax_front : ", distance2)
 
-distance3 = []
-for i in range(3):
-    distance3.append(c3d["data"]["points"][i][15][2048])
+distance3 = list(markers["XIPHback_thorax_back"])
 print("XIPHback_thorax_back : ", distance3)
 
-distance = []
-for i in range(3):
-    distance.append(c3d["data"]["points"][i][16][2048] - c3d["data"]["points"][i][46][2048])
+distance = list(markers["thl_thorax_side"] - markers[MIDDLE_FINGER_MARKER])
 print("La distance entre le côté gauche du squelette et la touche LA est :", distance)
 
 x = XIPHback_thorax_back_x - XIPH_thorax_front_x
@@ -1,24 +1,16 @@
-from ezc3d import c3d
+from anthropometry import read_markers, HAND_MARKERS, HAND_STATIC_FRAME
 import numpy
 from numpy import linalg as la
 from matplotlib import pyplot as plt
 
-c3d = c3d("004_BasPreStaA.c3d")
-
-## Hand vectors far away from the origin
-STYLrad = []
-meta2 = []
-meta5 = []
-STYLulna = []
-STYLrad_up = []
-STYLulna_up = []
-for i in range(3):
-    meta2.append(c3d["data"]["points"][i][41][200])
-    meta5.append(c3d["data"]["points"][i][47][200])
-    STYLrad.append(c3d["data"]["points"][i][30][200])
-    STYLrad_up.append(c3d["data"]["points"][i][31][200])
-    STYLulna.append(c3d["data"]["points"][i][33][200])
-    STYLulna_up.append(c3d["data"]["points"][i][32][200])
+## Hand vectors far away from the origin, the markers are read by their label on the static frame 200
+hand = read_markers("004_BasPreStaA.c3d", HAND_MARKERS, HAND_STATIC_FRAME)
+STYLrad = list(hand["STYLrad"])
+meta2 = list(hand["meta2"])
+meta5 = list(hand["meta5"])
+STYLulna = list(hand["STYLulna"])
+STYLrad_up = list(hand["STYLrad_up"])
+STYLulna_up = list(hand["STYLulna_up"])
 
 print("Hand vectors far away from the origin : ", "\n", STYLrad, "\n", meta2, "\n", meta5, "\n", STYLulna, "\n")
 ####
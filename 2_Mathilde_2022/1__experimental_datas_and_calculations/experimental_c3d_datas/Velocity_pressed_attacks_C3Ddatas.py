@@ -1,4 +1,5 @@
-from ezc3d import c3d
+from c3d_kinematics import load_kinematics, attack_statistics, normalized_windows, MIDDLE_FINGER_MARKER, Z_AXIS
+from keystroke_events import detect_keystrokes, DETECTION
 import numpy as np
 from matplotlib import pyplot as plt
 from pyomeca import Analogs
@@ -9,18 +10,16 @@ from scipy import interpolate
 # Data Points
 #     # So each frame of the animation is printed, each frame has 75 datapoints (3 xyz, residual value, cameras value)
 
-c = c3d("004_BasPreStaA.c3d")
+# The c3d is read once, and the kinematics of the middle finger marker (read by its label) are computed at once.
+kinematics = load_kinematics("004_BasPreStaA.c3d", markers=[MIDDLE_FINGER_MARKER])
+rate = kinematics["rate"]
 
 # General velocity vector
-POS = c["data"]["points"][2][46][:]
-velocity = []
-for i in range(2, len(POS) - 1):
-    vel = (POS[i + 1] - POS[i - 1]) / (2 / 150)
-    velocity.append(vel)
-velocity = [ele for ele in velocity]
+POS = kinematics["position"][Z_AXIS, 0]
+velocity = kinematics["velocity"][Z_AXIS, 0]
 print(velocity)
 # Explanations :
-# 2/150 bc we want the velocity between i+1 et i-1 frame
+# velocity[i] = (POS[i + 1] - POS[i - 1]) / (2 / rate), so velocity[i] is the velocity of the frame i
 
 # Plot the position depending on the time
 Tsec = np.linspace(0, (len(POS) / 150), num=(len(POS)))
@@ -47,8 +46,8 @@ plt.axvline(x=2430, color="b", linestyle="-")
 plt.show()
 
 # Plot the velocity vector depending on the time
-Tsec = np.linspace(0, (len(POS) / 150) - 3, num=(len(POS) - 3))
-Tframe = np.linspace(0, (len(POS)) - 3, num=(len(POS) - 3))
+Tsec = np.linspace(0, (len(POS) / rate), num=(len(POS)))
+Tframe = np.linspace(0, (len(POS)), num=(len(POS)))
 T = Tframe
 
 plt.plot(T, velocity, "tab:red")
@@ -72,108 +71,37 @@ plt.show()
 
 T = Tsec
 
-# Data's, number of frames for each attacks
-DebDesc = [
-    473,
-    879,
-    1286,
-    1676,
-    2048,
-    2411,
-    2777,
-    3179,
-    3551,
-    3927,
-    4305,
-    4667,
-    5042,
-    5434,
-    5832,
-    6178,
-    6549,
-    6918,
-    7270,
-    7592,
-]
-DebFondTouche = [
-    485,
-    890,
-    1296,
-    1687,
-    2062,
-    2423,
-    2790,
-    3188,
-    3560,
-    3936,
-    4319,
-    4678,
-    5052,
-    5445,
-    5846,
-    6195,
-    6563,
-    6932,
-    7281,
-    7607,
-]
-FinFondTouche = [
-    498,
-    897,
-    1308,
-    1693,
-    2069,
-    2430,
-    2800,
-    3195,
-    3568,
-    3944,
-    4328,
-    4685,
-    5058,
-    5453,
-    5855,
-    6202,
-    6569,
-    6936,
-    7287,
-    7613,
-]
+# The frames of each attack, found from the position and velocity of the middle finger marker.
+# The descent starts when the finger moves down (the frames picked by hand were 5 frames early, DebDesc + 5) and only
+# the attacks with a descent of less than 10 frames are kept (see DETECTION).
+events = detect_keystrokes(POS, velocity, **DETECTION["pressed"])
+DebDesc = events["descent_start"]
+DebFondTouche = events["key_bed_start"]
+FinFondTouche = events["key_bed_end"]
 
 # # # # Average of velocity of all attacks for each frame during the attack
-# # All attacks between 0 and 100 sec
-# # Interpolation done for 20 point
-# # velocity_each_attack_arrays = []
-# velocity_each_attack_arrays = np.zeros((20, 8))
-# for i in range(20):
-#     T = (np.linspace(0, 100, num=len(velocity[DebDesc[i]: DebFondTouche[i]])))
-#     y = velocity[DebDesc[i]: DebFondTouche[i]]
-#     n = len(velocity[DebDesc[i]: DebFondTouche[i]])
-#     f = interpolate.interp1d(T, y)
-#     Tnew = np.linspace(0, 100, 8)
-#     interpolated = f(Tnew)
-#     plt.plot(Tnew, interpolated, '.')
-#     velocity_each_attack_arrays[i, :] = interpolated
-#
-#
-# plt.title("Velocity profile of the middle finger marker for each attack \n")
-# plt.xlabel('Time (s)')
-# plt.ylabel('Velocity (mm.s-1)')
-# plt.show()
-# print("20 velocities of 20 attacks : ", velocity_each_attack_arrays)
-#
+# # All attacks between 0 and 100 sec, interpolated at once on 8 points
+Tnew = np.linspace(0, 100, 8)
+velocity_each_attack_arrays = normalized_windows(velocity, DebDesc, DebFondTouche, Tnew / 100)
+plt.plot(Tnew, velocity_each_attack_arrays.T, ".")
+plt.title("Velocity profile of the middle finger marker for each attack \n")
+plt.xlabel("Time (s)")
+plt.ylabel("Velocity (mm.s-1)")
+plt.show()
+print(str(len(DebDesc)) + " velocities of " + str(len(DebDesc)) + " attacks : ", velocity_each_attack_arrays)
+
 # # Average of all attacks at each time step
-# average_velocities_profile = np.mean(velocity_each_attack_arrays, axis=0)
-# average_velocities_profile = average_velocities_profile
-# Tnew = np.linspace(0, 100, 8)
-#
-# print("average_velocities_profile : ", average_velocities_profile)
-#
-# plt.plot(Tnew, average_velocities_profile, ".")
-# plt.title("Average of velocity profiles of the middle finger marker of 20 attacks \n")
-# plt.xlabel('Time (s)')
-# plt.ylabel('Velocity (mm.s-1)')
-# plt.show()
+average_velocities_profile = np.mean(velocity_each_attack_arrays, axis=0)
+std_velocities_profile = np.std(velocity_each_attack_arrays, axis=0)
+
+print("average_velocities_profile : ", average_velocities_profile)
+print("std_velocities_profile : ", std_velocities_profile)
+
+plt.plot(Tnew, average_velocities_profile, ".")
+plt.title("Average of velocity profiles of the middle finger marker of " + str(len(DebDesc)) + " attacks \n")
+plt.xlabel("Time (s)")
+plt.ylabel("Velocity (mm.s-1)")
+plt.show()
 
 ##### FELIPE VALUES #####
 # # # For jeu_presse during the attack inside the key
@@ -224,61 +152,24 @@ plt.xlabel("Time (s)")
 plt.ylabel("Velocity (m.s-1)")
 plt.show()
 
-# With corrections : correct_1 = delete 5 frames to every DebDesc, correct_2 = only attacks that have less than 10 f.
-DebDesc_correct_1 = []
-for i in range(20):
-    DebDesc_correct_1.append(DebDesc[i] + 5)
-
-DebDesc_correct_2 = []
-DebFondTouche_correct_2 = []
-FinFondTouche_correct_2 = []
-for i in range(20):
-    a = DebFondTouche[i] - DebDesc_correct_1[i]
-    if a < 10:
-        DebDesc_correct_2.append(DebDesc_correct_1[i])
-        DebFondTouche_correct_2.append(DebFondTouche[i])
-        FinFondTouche_correct_2.append(FinFondTouche[i])
-
-#  FinRise_correct_2 for each attack
-FinRise_correct_2 = []
-for i in range(18):
-    FinRise_correct_2.append(FinFondTouche_correct_2[i] + 10)
-
-# Max velocity vectors of each attack
-velocity_max_for_20_attacks = []
-for i in range(18):
-    arr = np.array(velocity[DebDesc_correct_2[i] : DebFondTouche_correct_2[i]])
-    velocity_max_for_20_attacks.append(max(arr))
+# Max velocity of each attack and of each rise (10 frames after FinFondTouche), durations of each attack
+statistics = attack_statistics(velocity, rate, DebDesc, DebFondTouche, FinFondTouche, rise_frames=10)
 
 # Average of max velocity vectors of each attack
-average_velocity_max_20_attacks = sum(velocity_max_for_20_attacks) / 18
+average_velocity_max_20_attacks = np.mean(statistics["descent_max_velocity"])
 print("Average of max velocity vectors of each attack : " + str(average_velocity_max_20_attacks) + " mm.s-1")
 
-# Max velocity vectors of each rise
-velocity_max_for_20_rises = []
-for i in range(18):
-    arr = np.array(velocity[FinFondTouche_correct_2[i] : FinRise_correct_2[i]])
-    velocity_max_for_20_rises.append(max(arr))
-
 # Average of max velocity vectors of each rise
-average_velocity_max_20_rises = sum(velocity_max_for_20_rises) / 18
+average_velocity_max_20_rises = np.mean(statistics["rise_max_velocity"])
 print("Average of max velocity vectors of each rises : " + str(average_velocity_max_20_rises) + " mm.s-1")
 
 # Average of the time in s during the attack
-time_in_s_pushing = []
-for i in range(18):
-    time_in_s_pushing.append((DebFondTouche_correct_2[i] - DebDesc_correct_2[i]) / 150)
-
-average_time_in_s_pushing = sum(time_in_s_pushing) / 18
+average_time_in_s_pushing = np.mean(statistics["descent_time"])
 print("Average of the time during the attack : " + str(average_time_in_s_pushing * 1000) + " ms")
 
 
 # Average of the time in s in Fondetouche
-time_in_s_Fonddetouche = []
-for i in range(18):
-    time_in_s_Fonddetouche.append((FinFondTouche_correct_2[i] - DebFondTouche_correct_2[i]) / 150)
-
-average_time_in_s_Fonddetouche = sum(time_in_s_Fonddetouche) / 18
+average_time_in_s_Fonddetouche = np.mean(statistics["key_bed_time"])
 print("Average of the time in Fondedetouche : " + str(average_time_in_s_Fonddetouche * 1000) + " ms")
 
 ##### FELIPE VALUES #####
@@ -0,0 +1,76 @@
+"""
+Anthropometric distances of a trial, as measured by Hand_finger_mesures.py (the hand markers on a static frame) and
+Distance_squeletum_piano.py (the thorax markers and the finger on the key), for all the axes at once.
+The markers are read by their label, whatever their order in the .c3d file.
+The distances are in the frame and the unit of the .c3d file (mm).
+"""
+import numpy as np
+
+from c3d_kinematics import load_points, MIDDLE_FINGER_MARKER
+
+# The labels of the markers (their index in 004_BasPreStaA.c3d).
+# meta2 [41], meta5 [47], STYLrad [30], STYLrad_up [31], STYLulna [33], STYLulna_up [32]
+HAND_MARKERS = ("meta2", "meta5", "STYLrad", "STYLrad_up", "STYLulna", "STYLulna_up")
+# middle_finger [46], thl_thorax_side [16], XIPH_thorax_front [11], XIPHback_thorax_back [15]
+THORAX_MARKERS = (MIDDLE_FINGER_MARKER, "thl_thorax_side", "XIPH_thorax_front", "XIPHback_thorax_back")
+# The frame of Hand_finger_mesures.py, where the hand is static.
+HAND_STATIC_FRAME = 200
+
+
+def read_markers(path: str, markers: tuple, frame: int) -> dict:
+    """
+    The position (3,) of each marker on a frame, by its label
+    """
+    points, _ = load_points(path, markers)
+    return dict(zip(markers, np.asarray(points[:, :, frame]).T))
+
+
+def hand_distances(path: str, frame: int = HAND_STATIC_FRAME) -> dict:
+    """
+    The distances between the hand markers
+
+    Parameters
+    ----------
+    path: str
+        The path to the .c3d file
+    frame: int
+        The frame where the hand is static
+
+    Returns
+    -------
+    The dict of the half lengths (Rad / Rad_up, Ulna / Ulna_up), of the distance to the centre of the back of the hand and
+    of the vectors from STYLrad to meta2, meta5 and STYLulna (absolute values)
+    """
+    marker = read_markers(path, HAND_MARKERS, frame)
+    half_rad = np.linalg.norm(marker["STYLrad_up"] - marker["STYLrad"]) / 2
+    half_ulna = np.linalg.norm(marker["STYLulna_up"] - marker["STYLulna"]) / 2
+    return dict(
+        half_rad_radup=half_rad,
+        half_ulna_ulnaup=half_ulna,
+        back_of_the_hand_centre=(half_rad + half_ulna) / 2,
+        STYLrad_meta2=np.abs(marker["meta2"] - marker["STYLrad"]),
+        STYLrad_meta5=np.abs(marker["meta5"] - marker["STYLrad"]),
+        STYLrad_STYLulna=np.abs(marker["STYLulna"] - marker["STYLrad"]),
+    )
+
+
+def thorax_piano_distances(path: str, frame: int) -> dict:
+    """
+    The distances between the thorax and the finger on the key
+
+    Parameters
+    ----------
+    path: str
+        The path to the .c3d file
+    frame: int
+        A frame where the finger is on the key
+
+    Returns
+    -------
+    The dict of the vectors from the finger to the side of the thorax and from the front to the back of the thorax
+    """
+    marker = read_markers(path, THORAX_MARKERS, frame)
+    return dict(
+        finger_thorax_side=marker["thl_thorax_side"] - marker[MIDDLE_FINGER_MARKER],
+        thorax_front_back=marker["XIPHback_thorax_back"] - marker["XIPH_thorax_front"],
+    )
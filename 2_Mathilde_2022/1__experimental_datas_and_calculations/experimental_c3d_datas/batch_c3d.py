@@ -0,0 +1,251 @@
+"""
+Batch processing of the .c3d trials of several subjects, in a pool of worker processes.
+The trials are given by a directory (all the .c3d files in it and in its subfolders, one subfolder per subject) or by a
+manifest .csv file (a "path" column, relative to the manifest, and optional "subject" and "attack" columns).
+For each trial, the keystrokes are detected and the velocity profiles of the middle finger (time normalized), the
+durations of the attacks and the anthropometric distances are computed. The trials and their aggregation (mean and std
+over all the attacks of the trials of a subject and an attack type) are saved in one .pckl file, and a summary table
+of the trials in a .csv file.
+"""
+import os
+import time
+import pickle
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import pandas as pd
+
+from c3d_kinematics import load_kinematics, attack_statistics, normalized_windows, MIDDLE_FINGER_MARKER, Z_AXIS
+from keystroke_events import detect_keystrokes, DETECTION, PROFILE_PHASES
+from anthropometry import hand_distances, thorax_piano_distances
+
+# The attack type of a trial, from its file name (004_BasPreStaA.c3d, 012_BasFraStaB.c3d).
+ATTACK_CODES = dict(Pre="pressed", Fra="strucked")
+# The velocity profiles are normalized on 0 to 100 % of each phase, by 1 %.
+N_PROFILE_NODES = 101
+
+
+def attack_type(path: str) -> str:
+    name = os.path.basename(path)
+    for code, attack in ATTACK_CODES.items():
+        if code in name:
+            return attack
+    return "unknown"
+
+
+def list_trials(source: str) -> list:
+    """
+    The trials of a directory or of a manifest
+
+    Parameters
+    ----------
+    source: str
+        A directory of .c3d files (one subfolder per subject) or a manifest .csv file
+
+    Returns
+    -------
+    The list of the trials, dicts of their path, subject and attack type
+    """
+    if os.path.isdir(source):
+        trials = []
+        for folder, _, files in sorted(os.walk(source)):
+            # The trials directly in the directory are of the subject named by the directory.
+            subject = os.path.relpath(folder, source).split(os.sep)[0]
+            if subject == ".":
+                subject = os.path.basename(os.path.abspath(source))
+            for file in sorted(files):
+                if file.lower().endswith(".c3d"):
+                    path = os.path.join(folder, file)
+                    trials.append(dict(path=path, subject=subject, attack=attack_type(path)))
+        return trials
+
+    manifest = pd.read_csv(source)
+    folder = os.path.dirname(os.path.abspath(source))
+    trials = []
+    for row in manifest.to_dict("records"):
+        path = os.path.join(folder, row["path"])
+        trials.append(
+            dict(
+                path=path,
+                subject=str(row["subject"]) if pd.notna(row.get("subject")) else "unknown",
+                attack=row["attack"] if pd.notna(row.get("attack")) else attack_type(path),
+            )
+        )
+    return trials
+
+
+def process_trial(trial: dict, cutoff: float = None, n_nodes: int = N_PROFILE_NODES) -> dict:
+    """
+    The keystrokes, velocity profiles, attack durations and anthropometric distances of one trial
+
+    Parameters
+    ----------
+    trial: dict
+        The path, subject and attack type of the trial
+    cutoff: float
+        The cutoff frequency (Hz) of the low-pass filter of the positions, None to keep the raw positions
+    n_nodes: int
+        The number of points of the time normalized velocity profiles
+
+    Returns
+    -------
+    The dict of the results of the trial, the arrays are of one row per attack, and the error of the anthropometric
+    distances (None if they are computed)
+    """
+    # The kinematics of the finger marker only, the other markers are read on a few frames for the distances.
+    kinematics = load_kinematics(trial["path"], cutoff, markers=[MIDDLE_FINGER_MARKER])
+    position = kinematics["position"][Z_AXIS, 0]
+    velocity = kinematics["velocity"][Z_AXIS, 0]
+    events = detect_keystrokes(position, velocity, **DETECTION.get(trial["attack"], {}))
+
+    profiles = {
+        phase: normalized_windows(velocity, events[start], events[end] + 1, n_nodes)
+        for phase, (start, end) in PROFILE_PHASES.items()
+    }
+    # The distances need markers which some subjects do not have, and a trial long enough for the static frame of the
+    # hand : without them, the kinematic results of the trial are kept and the error of the distances is recorded.
+    anthropometry = {}
+    try:
+        anthropometry.update(hand_distances(trial["path"]))
+        if events["key_bed_start"].size:
+            anthropometry.update(thorax_piano_distances(trial["path"], events["key_bed_start"][0]))
+        anthropometry_error = None
+    except (KeyError, IndexError, ValueError) as error:
+        anthropometry_error = repr(error)
+    return dict(
+        trial,
+        rate=kinematics["rate"],
+        n_frames=position.shape[0],
+        events=events,
+        statistics=attack_statistics(
+            velocity, kinematics["rate"], events["descent_start"], events["key_bed_start"], events["key_bed_end"]
+        ),
+        profiles=profiles,
+        anthropometry=anthropometry,
+        anthropometry_error=anthropometry_error,
+    )
+
+
+def aggregate(trials: list) -> dict:
+    """
+    The mean and std over all the attacks of the trials of each subject and attack type
+
+    Parameters
+    ----------
+    trials: list
+        The results of the trials (see process_trial)
+
+    Returns
+    -------
+    The dict of the aggregated profiles and statistics, by (subject, attack)
+    """
+    groups = {}
+    for trial in trials:
+        groups.setdefault((trial["subject"], trial["attack"]), []).append(trial)
+
+    aggregated = {}
+    for group, group_trials in groups.items():
+        profiles = {phase: np.concatenate([t["profiles"][phase] for t in group_trials]) for phase in PROFILE_PHASES}
+        statistics = {
+            name: np.concatenate([t["statistics"][name] for t in group_trials])
+            for name in group_trials[0]["statistics"]
+        }
+        if not len(statistics["descent_time"]):
+            # No keystroke is found in the trials of the group.
+            continue
+        aggregated[group] = dict(
+            n_trials=len(group_trials),
+            n_attacks=len(statistics["descent_time"]),
+            profile_mean={phase: np.nanmean(profile, axis=0) for phase, profile in profiles.items()},
+            profile_std={phase: np.nanstd(profile, axis=0) for phase, profile in profiles.items()},
+            statistics_mean={name: np.nanmean(values) for name, values in statistics.items()},
+            statistics_std={name: np.nanstd(values) for name, values in statistics.items()},
+        )
+    return aggregated
+
+
+def summary_table(trials: list) -> pd.DataFrame:
+    """
+    One row per trial : its number of attacks, the mean and std of its statistics and its scalar distances
+    """
+    rows = []
+    for trial in trials:
+        row = dict(subject=trial["subject"], attack=trial["attack"], path=trial["path"])
+        if "error" in trial:
+            rows.append(dict(row, error=trial["error"]))
+            continue
+        row["n_attacks"] = len(trial["events"]["key_bed_start"])
+        for name, values in trial["statistics"].items():
+            row[name + "_mean"] = np.nanmean(values) if len(values) else np.nan
+            row[name + "_std"] = np.nanstd(values) if len(values) else np.nan
+        row.update({name: value for name, value in trial["anthropometry"].items() if np.ndim(value) == 0})
+        if trial.get("anthropometry_error") is not None:
+            row["anthropometry_error"] = trial["anthropometry_error"]
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def main(
+    source: str,
+    output_path: str = None,
+    n_workers: int = None,
+    cutoff: float = None,
+    n_nodes: int = N_PROFILE_NODES,
+) -> dict:
+    """
+    Process all the trials of a directory or of a manifest and save the consolidated dataset
+
+    Parameters
+    ----------
+    source: str
+        A directory of .c3d files or a manifest .csv file
+    output_path: str
+        The .pckl file of the dataset, the summary is saved next to it in a .csv file
+        (default: batch_c3d.pckl in the folder of the source)
+    n_workers: int
+        The number of worker processes (default: the number of cores)
+    cutoff: float
+        The cutoff frequency (Hz) of the low-pass filter of the positions, None to keep the raw positions
+    n_nodes: int
+        The number of points of the time normalized velocity profiles
+
+    Returns
+    -------
+    The dataset : the trials, their aggregation by subject and attack type, and the failed trials
+    """
+    trials = list_trials(source)
+    if output_path is None:
+        folder = source if os.path.isdir(source) else os.path.dirname(os.path.abspath(source))
+        output_path = os.path.join(folder, "batch_c3d.pckl")
+
+    tic = time.time()
+    results, failed = [], []
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        futures = {executor.submit(process_trial, trial, cutoff, n_nodes): trial for trial in trials}
+        for future in as_completed(futures):
+            trial = futures[future]
+            try:
+                results.append(future.result())
+            except Exception as error:
+                failed.append(dict(trial, error=repr(error)))
+                print("The trial " + trial["path"] + " failed : " + repr(error))
+    # The trials are kept in the order of the source, whatever the order they are done in.
+    order = {trial["path"]: i for i, trial in enumerate(trials)}
+    results.sort(key=lambda result: order[result["path"]])
+
+    dataset = dict(
+        trials=results,
+        aggregated=aggregate(results),
+        failed=failed,
+        n_nodes=n_nodes,
+        profile_phases=PROFILE_PHASES,
+        cutoff=cutoff,
+    )
+    with open(output_path, "wb") as file:
+        pickle.dump(dataset, file)
+    summary_table(results + failed).to_csv(os.path.splitext(output_path)[0] + "_summary.csv", index=False)
+    print(str(len(results)) + " trials processed, " + str(len(failed)) + " failed, in " + str(time.time() - tic) + " s")
+    return dataset
+
+
+if __name__ == "__main__":
+    main(os.path.dirname(os.path.abspath(__file__)))
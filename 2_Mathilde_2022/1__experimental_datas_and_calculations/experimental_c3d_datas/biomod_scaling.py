@@ -0,0 +1,354 @@
+"""
+Subject-specific hand, finger and key bioMod, scaled from the markers of a .c3d trial instead of the values measured by
+hand with Hand_finger_mesures.py and copied into the bioMod.
+The landmarks are averaged over all the static frames of the trial (the frames where no hand marker moves), and the
+model has the segments of FINAL_Finger_hand_1_key.bioMod : the hand (origin at the middle of the styloids, x axis to
+the middle of the metacarpals), the finger (a cylinder from the middle of the metacarpals to the finger marker) and the
+key, placed where the finger touches it.
+The positions are in the frame of the model (m) : the axes of the .c3d file are permuted as in
+Distance_squeletum_piano.py (model x, y, z = c3d z, x, y).
+"""
+import os
+import numpy as np
+
+from c3d_kinematics import load_kinematics, MIDDLE_FINGER_MARKER, Z_AXIS
+from keystroke_events import detect_keystrokes, DETECTION
+from anthropometry import HAND_MARKERS
+from batch_c3d import list_trials
+
+# model = C3D_TO_MODEL @ c3d, in m.
+C3D_TO_MODEL = np.array([[0, 0, 1], [1, 0, 0], [0, 1, 0]]) * 0.001
+SCALING_MARKERS = HAND_MARKERS + (MIDDLE_FINGER_MARKER,)
+# The speed under which a marker is static (mm.s-1).
+STATIC_SPEED = 20.0
+# The masses of FINAL_Finger_hand_1_key.bioMod (kg) : the finger is 1/12 of the hand.
+HAND_MASS = 0.4575
+FINGER_MASS = 0.038125
+FINGER_RADIUS = 0.008
+HAND_THICKNESS = 0.03
+# The key : its width and depth (m), and the middle of its top surface in the frame of the model.
+KEY_WIDTH = 0.023
+KEY_DEPTH = 0.01
+KEY_CENTRE = np.array([0, 0.0215, 0])
+
+MARKER_TEMPLATE = """marker {name}_marker
+        parent hand_right
+\t    position {position}
+    endmarker
+
+"""
+# The segments of FINAL_Finger_hand_1_key.bioMod.
+BIOMOD_TEMPLATE = """version 4
+
+// Scaled from the markers of {subject} (biomod_scaling.py)
+
+gravity 0 0 -9.81
+
+segment ground
+endsegment
+
+////// Hand //////
+
+segment hand_right
+    parent ground
+    RTinMatrix 1
+    RT
+{hand_rt}
+    translations xz
+    rotations xyz
+\tranges
+\t   -0.2 0.1
+\t   -0.08 0.50
+\t   -pi/4 pi/4
+\t   -pi/2 pi/2
+\t   -pi/4 pi/4
+    mass {hand_mass}
+    inertia
+{hand_inertia}
+    com {hand_com}
+    mesh 0 0 0
+    mesh {finger_translation}
+endsegment
+
+{hand_markers}////// finger //////
+
+segment finger
+    parent hand_right
+    RT 0 0 0 xyz {finger_translation}
+    rotations y
+    ranges
+\t    0 pi/2
+    mass {finger_mass}
+\tinertia
+{finger_inertia}
+\tcom {finger_com}
+\tmesh 0 0 0
+    mesh {finger_tip}
+endsegment
+
+marker finger_marker
+        parent finger
+\t    position {finger_tip}
+    endmarker
+
+contact    contact_finger
+        parent finger
+        position {finger_tip}
+        axis    xyz
+    endcontact
+
+////// Piano //////
+
+segment square
+{key_meshes}endsegment
+
+marker high_square
+    parent ground
+\t    position {high_square}
+\tendmarker
+
+marker low_square
+    parent ground
+\t    position {low_square}
+\tendmarker
+"""
+
+
+def static_frames(speed: np.ndarray, min_speed: float = STATIC_SPEED) -> np.ndarray:
+    """
+    The frames where all the markers are static
+
+    Parameters
+    ----------
+    speed: np.ndarray
+        The speed of the markers (n_markers, n_frames)
+    min_speed: float
+        The speed under which a marker is static
+
+    Returns
+    -------
+    The boolean mask of the static frames (n_frames,)
+    """
+    return np.all(speed < min_speed, axis=0)
+
+
+def static_landmarks(path: str, markers: tuple = SCALING_MARKERS, min_speed: float = STATIC_SPEED) -> dict:
+    """
+    The position of the landmarks, averaged over all the static frames of a trial
+
+    Parameters
+    ----------
+    path: str
+        The path to the .c3d file
+    markers: tuple
+        The labels of the markers
+    min_speed: float
+        The speed under which a marker is static (mm.s-1)
+
+    Returns
+    -------
+    The dict of the positions (3,) of the markers in the frame of the model (m), and of the number of static frames
+    """
+    kinematics = load_kinematics(path, markers=markers)
+    static = static_frames(np.linalg.norm(kinematics["velocity"], axis=0), min_speed)
+    if not static.any():
+        raise ValueError("No static frame in " + path + " under " + str(min_speed) + " mm.s-1")
+    mean_position = C3D_TO_MODEL @ np.nanmean(kinematics["position"][:, :, static], axis=2)
+    return dict(zip(markers, mean_position.T), n_static_frames=int(static.sum()))
+
+
+def cylinder_inertia(mass: float, radius: float, length: float) -> np.ndarray:
+    # Along the x axis, about the centre of mass.
+    transverse = mass * (radius**2 / 4 + length**2 / 12)
+    return np.diag([mass * radius**2 / 2, transverse, transverse])
+
+
+def box_inertia(mass: float, length: float, width: float, thickness: float) -> np.ndarray:
+    # Length along x, thickness along y and width along z, about the centre of mass.
+    return np.diag([width**2 + thickness**2, length**2 + width**2, length**2 + thickness**2]) * mass / 12
+
+
+def hand_model(
+    landmarks: dict,
+    key_contact: np.ndarray,
+    hand_mass: float = HAND_MASS,
+    finger_mass: float = FINGER_MASS,
+    finger_radius: float = FINGER_RADIUS,
+    hand_thickness: float = HAND_THICKNESS,
+) -> dict:
+    """
+    The RT, com and inertia of the hand and of the finger
+
+    Parameters
+    ----------
+    landmarks: dict
+        The positions of the markers in the frame of the model (see static_landmarks)
+    key_contact: np.ndarray
+        The mean position (3,) of the finger marker when it touches the key, in the frame of the model
+    hand_mass: float
+        The mass of the hand (kg)
+    finger_mass: float
+        The mass of the finger (kg)
+    finger_radius: float
+        The radius of the finger (m)
+    hand_thickness: float
+        The thickness of the hand (m)
+
+    Returns
+    -------
+    The dict of the parameters of the segments, the markers of the hand are in the frame of the hand
+    """
+    # The key is the origin of the model, as in FINAL_Finger_hand_1_key.bioMod.
+    offset = KEY_CENTRE - key_contact
+    wrist = (landmarks["STYLrad"] + landmarks["STYLulna"]) / 2 + offset
+    metacarpals = (landmarks["meta2"] + landmarks["meta5"]) / 2 + offset
+
+    # x from the wrist to the metacarpals, z from meta5 to meta2 (across the hand), y normal to the palm.
+    x = (metacarpals - wrist) / np.linalg.norm(metacarpals - wrist)
+    across = landmarks["meta2"] - landmarks["meta5"]
+    y = np.cross(across, x) / np.linalg.norm(np.cross(across, x))
+    rotation = np.column_stack((x, y, np.cross(x, y)))
+
+    def in_hand(position):
+        return rotation.T @ (position + offset - wrist)
+
+    markers = {name: in_hand(landmarks[name]) for name in HAND_MARKERS}
+    hand_length = np.linalg.norm(metacarpals - wrist)
+    finger_length = np.linalg.norm(landmarks[MIDDLE_FINGER_MARKER] + offset - metacarpals)
+    return dict(
+        hand_rotation=rotation,
+        hand_translation=wrist,
+        hand_mass=hand_mass,
+        # The centre of the landmarks, as the "com for the hand" of Hand_finger_mesures.py.
+        hand_com=np.mean(list(markers.values()), axis=0),
+        hand_inertia=box_inertia(hand_mass, hand_length, np.linalg.norm(across), hand_thickness),
+        hand_markers=markers,
+        finger_translation=rotation.T @ (metacarpals - wrist),
+        finger_length=finger_length,
+        finger_mass=finger_mass,
+        finger_inertia=cylinder_inertia(finger_mass, finger_radius, finger_length),
+    )
+
+
+def vector(values) -> str:
+    return " ".join(repr(float(value)) for value in values)
+
+
+def matrix(values, indent: str) -> str:
+    return "\n".join(indent + "\t".join(repr(float(value)) for value in row) for row in values)
+
+
+def biomod_text(model: dict, subject: str) -> str:
+    """
+    The bioMod of the hand, the finger and the key of a subject (see hand_model)
+    """
+    rt = np.eye(4)
+    rt[:3, :3], rt[:3, 3] = model["hand_rotation"], model["hand_translation"]
+    finger_tip = (model["finger_length"], 0, 0)
+    return BIOMOD_TEMPLATE.format(
+        subject=subject,
+        hand_rt=matrix(rt, "\t\t"),
+        hand_mass=model["hand_mass"],
+        hand_inertia=matrix(model["hand_inertia"], "        "),
+        hand_com=vector(model["hand_com"]),
+        hand_markers="".join(
+            MARKER_TEMPLATE.format(name=name, position=vector(position))
+            for name, position in model["hand_markers"].items()
+        ),
+        finger_translation=vector(model["finger_translation"]),
+        finger_mass=model["finger_mass"],
+        finger_inertia=matrix(model["finger_inertia"], "\t  "),
+        finger_com=vector((model["finger_length"] / 2, 0, 0)),
+        finger_tip=vector(finger_tip),
+        key_meshes="".join(
+            "    mesh " + vector((0, KEY_CENTRE[1] + y * KEY_WIDTH / 2, z)) + "\n"
+            for y, z in ((-1, 0), (-1, -KEY_DEPTH), (1, -KEY_DEPTH), (1, 0))
+        ),
+        high_square=vector(KEY_CENTRE),
+        low_square=vector(KEY_CENTRE - (0, 0, KEY_DEPTH)),
+    )
+
+
+def scale_trial(
+    path: str,
+    biomod_path: str,
+    attack: str = None,
+    subject: str = None,
+    min_speed: float = STATIC_SPEED,
+    **model_parameters,
+) -> dict:
+    """
+    Write the bioMod of a subject, scaled from one of its trials
+
+    Parameters
+    ----------
+    path: str
+        The path to the .c3d file
+    biomod_path: str
+        The path of the bioMod
+    attack: str
+        The attack type of the trial, for the detection of the keystrokes (see DETECTION)
+    subject: str
+        The name of the subject, written in the bioMod
+    min_speed: float
+        The speed under which a marker is static (mm.s-1)
+    model_parameters:
+        The masses and dimensions of hand_model
+
+    Returns
+    -------
+    The parameters of the segments (see hand_model)
+    """
+    landmarks = static_landmarks(path, min_speed=min_speed)
+    finger = load_kinematics(path, markers=[MIDDLE_FINGER_MARKER])
+    events = detect_keystrokes(
+        finger["position"][Z_AXIS, 0], finger["velocity"][Z_AXIS, 0], **DETECTION.get(attack, {})
+    )
+    if len(events["key_contact"]) == 0:
+        raise ValueError("No keystroke in " + path + ", the key cannot be placed")
+    # The top of the key, where the finger touches it.
+    key_contact = C3D_TO_MODEL @ np.nanmean(finger["position"][:, 0, events["key_contact"]], axis=1)
+    model = hand_model(landmarks, key_contact, **model_parameters)
+
+    os.makedirs(os.path.dirname(os.path.abspath(biomod_path)), exist_ok=True)
+    with open(biomod_path, "w") as file:
+        file.write(biomod_text(model, subject if subject is not None else os.path.basename(path)))
+    return model
+
+
+def main(source: str, output_folder: str = None, min_speed: float = STATIC_SPEED, **model_parameters) -> dict:
+    """
+    Write one bioMod per subject of a directory or of a manifest (see batch_c3d), from its first trial
+
+    Parameters
+    ----------
+    source: str
+        A directory of .c3d files or a manifest .csv file
+    output_folder: str
+        The folder of the bioMod files (default: biomod_subjects in the folder of the source)
+    min_speed: float
+        The speed under which a marker is static (mm.s-1)
+    model_parameters:
+        The masses and dimensions of hand_model
+
+    Returns
+    -------
+    The path of the bioMod of each subject
+    """
+    if output_folder is None:
+        folder = source if os.path.isdir(source) else os.path.dirname(os.path.abspath(source))
+        output_folder = os.path.join(folder, "biomod_subjects")
+    trials = {}
+    for trial in list_trials(source):
+        trials.setdefault(trial["subject"], trial)
+
+    biomod_paths = {}
+    for subject, trial in trials.items():
+        biomod_paths[subject] = os.path.join(output_folder, subject + ".bioMod")
+        scale_trial(trial["path"], biomod_paths[subject], trial["attack"], subject, min_speed, **model_parameters)
+        print("The bioMod of " + subject + " is written in " + biomod_paths[subject])
+    return biomod_paths
+
+
+if __name__ == "__main__":
+    main(os.path.dirname(os.path.abspath(__file__)))
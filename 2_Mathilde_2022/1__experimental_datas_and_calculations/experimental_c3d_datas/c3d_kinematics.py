@@ -0,0 +1,218 @@
+"""
+Kinematics of the markers of a .c3d file : the positions, velocities and accelerations of all the markers on all the
+axes are computed at once with NumPy, instead of one marker, one axis and one frame at a time.
+The velocity and acceleration of a frame are the central differences between the frames before and after it, so they
+are aligned with the frames (one-sided differences on the first and last frames).
+The arrays are of shape (3, n_markers, n_frames), as c3d["data"]["points"][:3]. The points are read from the
+memory-mapped store of the .c3d file (see c3d_store), all the markers or only the ones needed.
+"""
+import numpy as np
+from scipy.signal import butter, filtfilt
+
+from c3d_store import read_points
+
+# The label of the middle finger marker (index [46] in 004_BasPreStaA.c3d).
+MIDDLE_FINGER_MARKER = "middle_finger"
+Z_AXIS = 2
+
+
+def load_points(path: str, markers=None) -> tuple:
+    """
+    Read the points of a .c3d file, from its store
+
+    Parameters
+    ----------
+    path: str
+        The path to the .c3d file
+    markers:
+        The labels (or indices) of the markers to read, None to read all of them
+
+    Returns
+    -------
+    The points (3, n_markers, n_frames) and the frame rate (Hz)
+    """
+    return read_points(path, markers)
+
+
+def fill_gaps(points: np.ndarray) -> np.ndarray:
+    """
+    Linear interpolation of the frames where a marker is missing (NaN), only the trajectories with a gap are interpolated
+    """
+    points = np.array(points, dtype=float)
+    trajectories = points.reshape(-1, points.shape[-1])
+    frames = np.arange(points.shape[-1])
+    for index in np.flatnonzero(np.isnan(trajectories).any(axis=1)):
+        trajectory = trajectories[index]
+        missing = np.isnan(trajectory)
+        if not missing.all():
+            trajectory[missing] = np.interp(frames[missing], frames[~missing], trajectory[~missing])
+    return points
+
+
+def lowpass_filter(points: np.ndarray, rate: float, cutoff: float, order: int = 4) -> np.ndarray:
+    """
+    Zero lag Butterworth low-pass filter of all the trajectories at once
+
+    Parameters
+    ----------
+    points: np.ndarray
+        The points, the frames on the last axis
+    rate: float
+        The frame rate (Hz)
+    cutoff: float
+        The cutoff frequency (Hz)
+    order: int
+        The order of the filter
+
+    Returns
+    -------
+    The filtered points, the gaps are filled before the filter
+    """
+    b, a = butter(order, cutoff / (rate / 2))
+    return filtfilt(b, a, fill_gaps(points), axis=-1)
+
+
+def marker_kinematics(points: np.ndarray, rate: float, cutoff: float = None, order: int = 4) -> dict:
+    """
+    Compute the position, velocity and acceleration of all the markers
+
+    Parameters
+    ----------
+    points: np.ndarray
+        The points (3, n_markers, n_frames), or any array with the frames on the last axis
+    rate: float
+        The frame rate (Hz)
+    cutoff: float
+        The cutoff frequency (Hz) of the low-pass filter of the positions, None to keep the raw positions
+    order: int
+        The order of the filter
+
+    Returns
+    -------
+    The dict of the position, velocity and acceleration arrays, of the shape of points
+    """
+    position = np.asarray(points, dtype=float) if cutoff is None else lowpass_filter(points, rate, cutoff, order)
+
+    # (POS[i + 1] - POS[i - 1]) / (2 / rate) on the inner frames.
+    velocity = np.gradient(position, 1 / rate, axis=-1)
+
+    acceleration = np.empty_like(position)
+    acceleration[..., 1:-1] = (position[..., 2:] - 2 * position[..., 1:-1] + position[..., :-2]) * rate**2
+    acceleration[..., 0] = acceleration[..., 1]
+    acceleration[..., -1] = acceleration[..., -2]
+
+    return dict(position=position, velocity=velocity, acceleration=acceleration)
+
+
+def load_kinematics(path: str, cutoff: float = None, order: int = 4, markers=None) -> dict:
+    """
+    Read a .c3d file and compute the kinematics of its markers
+
+    Parameters
+    ----------
+    path: str
+        The path to the .c3d file
+    cutoff: float
+        The cutoff frequency (Hz) of the low-pass filter, None to keep the raw positions
+    order: int
+        The order of the filter
+    markers:
+        The labels (or indices) of the markers, None for all of them
+
+    Returns
+    -------
+    The dict of the position, velocity and acceleration arrays (3, n_markers, n_frames) and of the rate, the markers
+    are in the order of markers
+    """
+    points, rate = load_points(path, markers)
+    return dict(marker_kinematics(points, rate, cutoff, order), rate=rate)
+
+
+def window_reduce(signal: np.ndarray, starts, ends, reduce=np.nanmax) -> np.ndarray:
+    """
+    Reduce a signal on several windows of frames at once
+
+    Parameters
+    ----------
+    signal: np.ndarray
+        The signal (n_frames,)
+    starts:
+        The first frame of each window
+    ends:
+        The frame after the last frame of each window
+    reduce:
+        The NaN ignoring reduction (np.nanmax, np.nanmin, np.nanmean...)
+
+    Returns
+    -------
+    The reduced value of each window (n_windows,)
+    """
+    frames = np.arange(signal.shape[-1])
+    inside = (frames >= np.asarray(starts)[:, np.newaxis]) & (frames < np.asarray(ends)[:, np.newaxis])
+    return reduce(np.where(inside, signal, np.nan), axis=1)
+
+
+def attack_statistics(
+    velocity: np.ndarray, rate: float, descent_start, key_bed_start, key_bed_end, rise_frames: int = 10
+) -> dict:
+    """
+    The statistics of each attack of a trial, as arrays
+
+    Parameters
+    ----------
+    velocity: np.ndarray
+        The vertical velocity of the finger marker (n_frames,)
+    rate: float
+        The frame rate (Hz)
+    descent_start:
+        The frame where the descent of each attack starts
+    key_bed_start:
+        The first frame of each attack on the key bed (fond de touche)
+    key_bed_end:
+        The last frame of each attack on the key bed
+    rise_frames: int
+        The number of frames of the rise after the key bed
+
+    Returns
+    -------
+    The dict of the arrays (n_attacks,) of the max velocity of the descent and of the rise, and of the durations (s) of
+    the descent and of the key bed
+    """
+    descent_start, key_bed_start, key_bed_end = (
+        np.asarray(descent_start),
+        np.asarray(key_bed_start),
+        np.asarray(key_bed_end),
+    )
+    return dict(
+        descent_max_velocity=window_reduce(velocity, descent_start, key_bed_start),
+        rise_max_velocity=window_reduce(velocity, key_bed_end, key_bed_end + rise_frames),
+        descent_time=(key_bed_start - descent_start) / rate,
+        key_bed_time=(key_bed_end - key_bed_start) / rate,
+    )
+
+
+def normalized_windows(signal: np.ndarray, starts, ends, nodes) -> np.ndarray:
+    """
+    Time normalize a signal on several windows of frames at once, each window is linearly interpolated on the same
+    normalized times, from 0 (its first frame) to 1 (its last frame)
+
+    Parameters
+    ----------
+    signal: np.ndarray
+        The signal (n_frames,)
+    starts:
+        The first frame of each window
+    ends:
+        The frame after the last frame of each window
+    nodes:
+        The number of equally spaced points of each normalized window, or their normalized times (ex: the shooting
+        nodes and the collocation points of an ocp phase)
+
+    Returns
+    -------
+    The normalized windows (n_windows, n_nodes)
+    """
+    times = np.linspace(0, 1, nodes) if np.ndim(nodes) == 0 else np.asarray(nodes, dtype=float)
+    starts, ends = np.asarray(starts, dtype=float), np.asarray(ends, dtype=float)
+    frames = starts[:, np.newaxis] + times * (ends - 1 - starts)[:, np.newaxis]
+    return np.interp(frames, np.arange(signal.shape[-1]), signal)
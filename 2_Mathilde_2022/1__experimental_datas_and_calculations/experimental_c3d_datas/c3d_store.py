@@ -0,0 +1,174 @@
+"""
+Memory-mapped store of the points and analogs of a .c3d file.
+A .c3d file is converted once into a folder next to it (004_BasPreStaA.c3d.store) : the points in a .npy file of shape
+(n_markers, 3, n_frames), the analogs in a .npy file of shape (n_channels, n_samples), and the labels and rates in a
+.json file. The .npy files are opened memory-mapped, so a trial opens without parsing the .c3d file, only the pages of
+the markers read are loaded, and the parallel workers reading the same trial share these pages.
+The store is converted again when the .c3d file is modified (its size and modification time are in the .json file).
+The markers are read by their label (POINT:LABELS of the .c3d file) or by their index, the index of each label is
+built once per file.
+"""
+import os
+import sys
+import json
+import numpy as np
+from ezc3d import c3d
+
+# The helpers of the atomic writes are shared with the final models.
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from atomic_files import write_folder
+
+STORE_SUFFIX = ".store"
+POINTS_FILE = "points.npy"
+ANALOGS_FILE = "analogs.npy"
+METADATA_FILE = "metadata.json"
+
+_marker_indices = {}
+
+
+def store_path(path: str) -> str:
+    return path + STORE_SUFFIX
+
+
+def source_stamp(path: str) -> dict:
+    return dict(size=os.path.getsize(path), mtime=os.path.getmtime(path))
+
+
+def is_up_to_date(path: str) -> bool:
+    metadata_path = os.path.join(store_path(path), METADATA_FILE)
+    if not os.path.isfile(metadata_path):
+        return False
+    with open(metadata_path, "r") as file:
+        return json.load(file)["source"] == source_stamp(path)
+
+
+def convert(path: str) -> str:
+    """
+    Convert a .c3d file into its store, if the store is not up to date
+
+    Parameters
+    ----------
+    path: str
+        The path to the .c3d file
+
+    Returns
+    -------
+    The path of the store folder
+    """
+    folder = store_path(path)
+    if is_up_to_date(path):
+        return folder
+
+    c = c3d(path)
+    parameters = c["parameters"]
+
+    def write(tmp_folder: str):
+        np.save(os.path.join(tmp_folder, POINTS_FILE), np.ascontiguousarray(c["data"]["points"][:3].transpose(1, 0, 2)))
+        analogs = c["data"]["analogs"]
+        np.save(os.path.join(tmp_folder, ANALOGS_FILE), np.ascontiguousarray(analogs.reshape(-1, analogs.shape[-1])))
+        metadata = dict(
+            source=source_stamp(path),
+            point_labels=list(parameters["POINT"]["LABELS"]["value"]),
+            point_rate=float(parameters["POINT"]["RATE"]["value"][0]),
+            analog_labels=list(parameters["ANALOG"]["LABELS"]["value"]) if "ANALOG" in parameters else [],
+            analog_rate=float(parameters["ANALOG"]["RATE"]["value"][0]) if "ANALOG" in parameters else 0.0,
+        )
+        with open(os.path.join(tmp_folder, METADATA_FILE), "w") as file:
+            json.dump(metadata, file, indent=2)
+
+    # Written in a folder of the process, and put in place once complete, so a worker never reads a half written store.
+    write_folder(folder, write)
+    return folder
+
+
+def read_metadata(path: str) -> dict:
+    """
+    The labels and rates of a .c3d file, from its store (converted first if needed)
+    """
+    with open(os.path.join(convert(path), METADATA_FILE), "r") as file:
+        return json.load(file)
+
+
+def open_store(path: str) -> dict:
+    """
+    Open the store of a .c3d file, converted first if needed
+
+    Parameters
+    ----------
+    path: str
+        The path to the .c3d file
+
+    Returns
+    -------
+    The dict of the memory-mapped points (n_markers, 3, n_frames) and analogs (n_channels, n_samples), and of the
+    labels and rates
+    """
+    metadata = read_metadata(path)
+    folder = store_path(path)
+    return dict(
+        metadata,
+        points=np.load(os.path.join(folder, POINTS_FILE), mmap_mode="r"),
+        analogs=np.load(os.path.join(folder, ANALOGS_FILE), mmap_mode="r"),
+    )
+
+
+def normalize_label(label: str) -> str:
+    # The labels can be padded with spaces or prefixed by the name of the subject (Subject:label).
+    return label.strip().split(":")[-1].lower()
+
+
+def marker_indices(path: str) -> dict:
+    """
+    The index of each marker of a .c3d file by its (normalized) label, built once per file and per version of the file
+    """
+    key = (os.path.abspath(path), os.path.getsize(path), os.path.getmtime(path))
+    if key not in _marker_indices:
+        indices = {}
+        for index, label in enumerate(read_metadata(path)["point_labels"]):
+            indices.setdefault(normalize_label(label), index)
+        _marker_indices[key] = indices
+    return _marker_indices[key]
+
+
+def resolve_markers(path: str, markers) -> np.ndarray:
+    """
+    The indices of markers of a .c3d file
+
+    Parameters
+    ----------
+    path: str
+        The path to the .c3d file
+    markers:
+        The labels (or indices) of the markers
+
+    Returns
+    -------
+    The indices of the markers, in the order of markers
+    """
+    indices = marker_indices(path)
+    missing = [marker for marker in markers if isinstance(marker, str) and normalize_label(marker) not in indices]
+    if missing:
+        raise KeyError(
+            "The markers " + ", ".join(missing) + " are not in " + path + ", its markers are : " + ", ".join(indices)
+        )
+    return np.array([indices[normalize_label(marker)] if isinstance(marker, str) else marker for marker in markers])
+
+
+def read_points(path: str, markers=None) -> tuple:
+    """
+    Read the points of some markers of a .c3d file, from its store
+
+    Parameters
+    ----------
+    path: str
+        The path to the .c3d file
+    markers:
+        The labels (or indices) of the markers to read, None to read all of them
+
+    Returns
+    -------
+    The points (3, n_markers, n_frames), as c3d["data"]["points"][:3], and the frame rate (Hz)
+    """
+    store = open_store(path)
+    points = store["points"] if markers is None else store["points"][resolve_markers(path, markers)]
+    return np.asarray(points).transpose(1, 0, 2), store["point_rate"]
@@ -0,0 +1,143 @@
+"""
+Automatic detection of the events of each keystroke of a trial, from the vertical position and velocity of the finger
+marker, instead of the frames picked by hand on the plots (DebDesc, Touched_key, DebFondTouche, FinFondTouche).
+The key bed (fond de touche) is the lowest level of the finger : a keystroke is a run of frames where the finger is on
+the key bed, its descent starts when the finger starts to move down before it, and the key is touched when the finger
+is one key depth above the key bed.
+All the events of a trial are found at once and returned as arrays of frames.
+"""
+import numpy as np
+
+from c3d_kinematics import load_kinematics, window_reduce, MIDDLE_FINGER_MARKER, Z_AXIS
+
+# The parameters of detect_keystrokes for each attack type.
+DETECTION = dict(pressed=dict(max_descent_frames=9), strucked=dict())
+# The phases of a keystroke, between two of its events.
+PROFILE_PHASES = dict(
+    descent=("descent_start", "key_contact"),
+    key=("key_contact", "key_bed_start"),
+    attack=("descent_start", "key_bed_start"),
+)
+
+
+def runs(mask: np.ndarray) -> tuple:
+    """
+    The runs of True of a boolean array
+
+    Parameters
+    ----------
+    mask: np.ndarray
+        The boolean array (n_frames,)
+
+    Returns
+    -------
+    The first frame of each run and the frame after its last frame
+    """
+    edges = np.diff(np.concatenate(([0], np.asarray(mask, dtype=np.int8), [0])))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def last_frame_before(frames: np.ndarray, before: np.ndarray, default: np.ndarray) -> np.ndarray:
+    """
+    The last of the (sorted) frames before each frame of before, default when there is none
+    """
+    if frames.size == 0:
+        return np.asarray(default)
+    index = np.searchsorted(frames, before) - 1
+    return np.where(index >= 0, frames[np.maximum(index, 0)], default)
+
+
+def detect_keystrokes(
+    position: np.ndarray,
+    velocity: np.ndarray,
+    key_bed_level: float = None,
+    key_bed_tolerance: float = 2.0,
+    key_depth: float = 10.0,
+    velocity_threshold: float = 20.0,
+    min_key_bed_frames: int = 2,
+    max_descent_frames: int = None,
+) -> dict:
+    """
+    Find the events of all the keystrokes of a trial
+
+    Parameters
+    ----------
+    position: np.ndarray
+        The vertical position of the finger marker (n_frames,) (mm)
+    velocity: np.ndarray
+        The vertical velocity of the finger marker (n_frames,) (mm.s-1)
+    key_bed_level: float
+        The vertical position of the finger on the key bed (mm), None to take the 1st percentile of the position
+    key_bed_tolerance: float
+        The distance above the key bed level still on the key bed (mm)
+    key_depth: float
+        The depth of the key (mm), the key is touched when the finger is less than key_depth above the key bed
+    velocity_threshold: float
+        The downward velocity from which the finger is moving down (mm.s-1)
+    min_key_bed_frames: int
+        The minimum number of frames on the key bed of a keystroke
+    max_descent_frames: int
+        The keystrokes whose descent lasts more frames are dropped, None to keep all of them
+
+    Returns
+    -------
+    The dict of the arrays (n_keystrokes,) of the frames of the descent start, of the key contact, of the first frame on
+    the key bed and of the last frame on the key bed
+    """
+    position, velocity = np.asarray(position, dtype=float), np.asarray(velocity, dtype=float)
+    n_frames = position.shape[0]
+    if key_bed_level is None:
+        key_bed_level = np.nanpercentile(position, 1)
+
+    # The runs on the key bed, without the ones cut by the start or the end of the trial.
+    key_bed_start, key_bed_stop = runs(position <= key_bed_level + key_bed_tolerance)
+    keep = (key_bed_stop - key_bed_start >= min_key_bed_frames) & (key_bed_start > 0) & (key_bed_stop < n_frames)
+    key_bed_start, key_bed_end = key_bed_start[keep], key_bed_stop[keep] - 1
+
+    # The fastest frame of each descent, between the end of the previous keystroke and the key bed.
+    previous_end = np.concatenate(([0], key_bed_end[:-1] + 1))
+    fastest = window_reduce(velocity, previous_end, key_bed_start + 1, np.nanargmin).astype(int)
+
+    # The descent starts after the last frame before the fastest one where the finger was not moving down.
+    not_moving_down = np.flatnonzero(~(velocity < -velocity_threshold))
+    descent_start = np.maximum(last_frame_before(not_moving_down, fastest, previous_end - 1) + 1, previous_end)
+
+    # The key is touched after the last frame of the descent above the key surface.
+    above_key = np.flatnonzero(position > key_bed_level + key_depth)
+    key_contact = np.clip(last_frame_before(above_key, key_bed_start, descent_start - 1) + 1, descent_start, None)
+
+    events = dict(
+        descent_start=descent_start,
+        key_contact=np.minimum(key_contact, key_bed_start),
+        key_bed_start=key_bed_start,
+        key_bed_end=key_bed_end,
+    )
+    if max_descent_frames is not None:
+        keep = key_bed_start - descent_start <= max_descent_frames
+        events = {name: frames[keep] for name, frames in events.items()}
+    return events
+
+
+def load_keystrokes(path: str, marker: str = MIDDLE_FINGER_MARKER, cutoff: float = None, **detection) -> dict:
+    """
+    Read a .c3d file and find the events of all its keystrokes
+
+    Parameters
+    ----------
+    path: str
+        The path to the .c3d file
+    marker: str
+        The label (or index) of the finger marker
+    cutoff: float
+        The cutoff frequency (Hz) of the low-pass filter of the positions, None to keep the raw positions
+    detection:
+        The parameters of detect_keystrokes
+
+    Returns
+    -------
+    The dict of the arrays of the events (see detect_keystrokes) and of the rate
+    """
+    # Only the finger marker is read.
+    kinematics = load_kinematics(path, cutoff, markers=[marker])
+    events = detect_keystrokes(kinematics["position"][Z_AXIS, 0], kinematics["velocity"][Z_AXIS, 0], **detection)
+    return dict(events, rate=kinematics["rate"])
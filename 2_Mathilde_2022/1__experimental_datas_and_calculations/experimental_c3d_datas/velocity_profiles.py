@@ -0,0 +1,143 @@
+"""
+Mean velocity profile of the finger over all the keystrokes of a set of trials, time normalized on the nodes of an ocp
+phase, to be the target of the velocity of the finger instead of a profile copied by hand.
+All the keystrokes of a trial are interpolated at once on the normalized times of the nodes (any number of shooting
+nodes, with or without the collocation points), and the mean and std are computed over all the keystrokes of the
+trials. The profiles are cached in memory and in .npz files named by the trials (their path, size and modification
+time) and by the parameters of the profile, so the next ocp built on the same trials does not read the .c3d files.
+"""
+import os
+import sys
+import hashlib
+import numpy as np
+
+from c3d_kinematics import load_kinematics, normalized_windows, MIDDLE_FINGER_MARKER, Z_AXIS
+from keystroke_events import detect_keystrokes, DETECTION, PROFILE_PHASES
+
+# The helpers of the atomic writes are shared with the final models.
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from atomic_files import write_file
+
+DEFAULT_CACHE_FOLDER = os.environ.get(
+    "PIANOPTIM_VELOCITY_PROFILES", os.path.join(os.path.dirname(os.path.abspath(__file__)), "velocity_profiles_cache")
+)
+# The .c3d files are in mm, the ocp in m.
+MM_TO_M = 0.001
+
+_profiles = {}
+
+
+def trials_signature(paths) -> str:
+    """
+    The hash of a set of trials, from their path, size and modification time
+    """
+    signature = hashlib.sha1()
+    for path in sorted(os.path.abspath(path) for path in paths):
+        signature.update((path + str(os.path.getsize(path)) + str(os.path.getmtime(path))).encode())
+    return signature.hexdigest()
+
+
+def trial_profiles(
+    path: str,
+    times: np.ndarray,
+    phase: str = "key",
+    attack: str = None,
+    marker: str = MIDDLE_FINGER_MARKER,
+    cutoff: float = None,
+) -> np.ndarray:
+    """
+    The velocity profiles of all the keystrokes of one trial
+
+    Parameters
+    ----------
+    path: str
+        The path to the .c3d file
+    times: np.ndarray
+        The normalized times of the profiles
+    phase: str
+        The phase of the keystroke of PROFILE_PHASES
+    attack: str
+        The attack type of the trial, for the parameters of the detection of the keystrokes (see DETECTION)
+    marker: str
+        The label (or index) of the finger marker
+    cutoff: float
+        The cutoff frequency (Hz) of the low-pass filter of the positions, None to keep the raw positions
+
+    Returns
+    -------
+    The vertical velocity profiles (n_keystrokes, n_times) in m.s-1
+    """
+    # Only the finger marker is read.
+    kinematics = load_kinematics(path, cutoff, markers=[marker])
+    velocity = kinematics["velocity"][Z_AXIS, 0]
+    events = detect_keystrokes(kinematics["position"][Z_AXIS, 0], velocity, **DETECTION.get(attack, {}))
+    start, end = PROFILE_PHASES[phase]
+    # The profile goes from the first event to the second one, both included.
+    return normalized_windows(velocity, events[start], events[end] + 1, times) * MM_TO_M
+
+
+def velocity_profile(
+    paths,
+    nodes,
+    phase: str = "key",
+    attack: str = None,
+    marker: str = MIDDLE_FINGER_MARKER,
+    cutoff: float = None,
+    cache_folder: str = DEFAULT_CACHE_FOLDER,
+) -> dict:
+    """
+    The mean and std velocity profiles of the keystrokes of a set of trials
+
+    Parameters
+    ----------
+    paths:
+        The paths to the .c3d files of the trials
+    nodes:
+        The number of equally spaced nodes of the profile, or their normalized times (see ocp_nodes.node_times)
+    phase: str
+        The phase of the keystroke of PROFILE_PHASES
+    attack: str
+        The attack type of the trials, for the parameters of the detection of the keystrokes (see DETECTION)
+    marker: str
+        The label (or index) of the finger marker
+    cutoff: float
+        The cutoff frequency (Hz) of the low-pass filter of the positions, None to keep the raw positions
+    cache_folder: str
+        The folder of the .npz files of the profiles, None to cache in memory only
+
+    Returns
+    -------
+    The dict of the times, the mean and std profiles (in m.s-1) and the number of keystrokes
+    """
+    times = np.linspace(0, 1, nodes) if np.ndim(nodes) == 0 else np.asarray(nodes, dtype=float)
+    key = hashlib.sha1(
+        (trials_signature(paths) + repr((phase, attack, marker, cutoff, DETECTION.get(attack)))).encode()
+        + times.tobytes()
+    ).hexdigest()
+    if key in _profiles:
+        return _profiles[key]
+
+    cache_path = None if cache_folder is None else os.path.join(cache_folder, phase + "_" + key[:16] + ".npz")
+    if cache_path is not None and os.path.isfile(cache_path):
+        with np.load(cache_path) as data:
+            profile = {name: data[name] for name in data.files}
+    else:
+        profiles = np.concatenate([trial_profiles(path, times, phase, attack, marker, cutoff) for path in paths])
+        profile = dict(
+            times=times,
+            mean=np.mean(profiles, axis=0),
+            std=np.std(profiles, axis=0),
+            n_keystrokes=np.array(profiles.shape[0]),
+        )
+        if cache_path is not None:
+            os.makedirs(cache_folder, exist_ok=True)
+
+            def write(tmp_path: str):
+                # Written in an open file, np.savez would add .npz to the temporary path.
+                with open(tmp_path, "wb") as file:
+                    np.savez(file, **profile)
+
+            # The ocp of several workers can be built at the same time, a worker never loads a half written profile.
+            write_file(cache_path, write)
+    _profiles[key] = profile
+    return profile
@@ -0,0 +1,199 @@
+"""
+Benchmark of the 4 phases piano ocp : the pressed and strucked final problems, and a pressed problem with less shooting
+points, each built and solved in its own process with MUMPS (available without HSL licence).
+For each problem, the report gives the time to build the ocp, the time of the solve, the time spent in the evaluation of
+the NLP functions (and of each of them), the time spent in IPOPT itself (the solve minus the function evaluations), the
+number of iterations and the peak memory (RSS) of the process.
+The report is saved in a .json file named by the commit, so two commits can be compared with compare_reports.
+"""
+import os
+import sys
+import json
+import time
+import random
+import platform
+import resource
+import subprocess
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+BENCHMARKS_FOLDER = os.path.dirname(os.path.abspath(__file__))
+REPORTS_FOLDER = os.path.join(BENCHMARKS_FOLDER, "reports")
+# The problems of the benchmark, given to prepare_piano_ocp.
+PROBLEMS = dict(
+    pressed=dict(attack="pressed"),
+    strucked=dict(attack="strucked"),
+    pressed_reduced=dict(attack="pressed", n_shooting=(15, 4, 4, 18)),
+)
+THREADS_ENVIRONMENT_VARIABLES = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS")
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BENCHMARKS_FOLDER, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_problem(problem: dict, seed: int, max_iterations: int, compiled_functions: bool) -> dict:
+    """
+    Build and solve one problem, in a new process so its peak memory is its own
+
+    Parameters
+    ----------
+    problem: dict
+        The parameters of prepare_piano_ocp
+    seed: int
+        The seed of the random generators
+    max_iterations: int
+        The maximum number of iterations of IPOPT
+    compiled_functions: bool
+        If the kinematics functions are compiled (see compiled_functions)
+
+    Returns
+    -------
+    The measures of the problem
+    """
+    random.seed(seed)
+    np.random.seed(seed)
+
+    # Imported in the process of the problem, the import time is not counted in the build time.
+    from bioptim import Solver
+    from piano_ocp import prepare_piano_ocp
+
+    tic = time.perf_counter()
+    ocp = prepare_piano_ocp(**problem, compiled_functions=compiled_functions)
+    build_time = time.perf_counter() - tic
+
+    solv = Solver.IPOPT(show_online_optim=False)
+    solv.set_maximum_iterations(max_iterations)
+    solv.set_linear_solver("mumps")
+    sol = ocp.solve(solv)
+
+    stats = ocp.ocp_solver.ocp_solver.stats()
+    function_times = {key[len("t_wall_") :]: stats[key] for key in stats if key.startswith("t_wall_nlp_")}
+    function_calls = {key[len("n_call_") :]: stats[key] for key in stats if key.startswith("n_call_nlp_")}
+    function_evaluation_time = sum(function_times.values())
+    return dict(
+        n_shooting=[nlp.ns for nlp in ocp.nlp],
+        n_variables=int(ocp.ocp_solver.ocp_solver.size_in("x0")[0]),
+        build_time=build_time,
+        solve_time=sol.real_time_to_optimize,
+        ipopt_time=sol.real_time_to_optimize - function_evaluation_time,
+        function_evaluation_time=function_evaluation_time,
+        function_times=function_times,
+        function_calls=function_calls,
+        iterations=sol.iterations,
+        time_per_iteration=sol.real_time_to_optimize / max(sol.iterations, 1),
+        status=stats["return_status"],
+        cost=float(np.array(sol.cost)[0][0]),
+        # ru_maxrss is in kB on Linux.
+        peak_rss_mb=resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    )
+
+
+def run_benchmark(
+    problems: tuple = tuple(PROBLEMS.keys()),
+    seed: int = 0,
+    max_iterations: int = 3000,
+    compiled_functions: bool = False,
+    report_path: str = None,
+) -> dict:
+    """
+    Run the benchmark and save its report
+
+    Parameters
+    ----------
+    problems: tuple
+        The names of the problems of PROBLEMS to run
+    seed: int
+        The seed of the random generators
+    max_iterations: int
+        The maximum number of iterations of IPOPT
+    compiled_functions: bool
+        If the kinematics functions are compiled
+    report_path: str
+        The .json file of the report (default: reports/<commit>.json)
+
+    Returns
+    -------
+    The report
+    """
+    commit = git_commit()
+    report = dict(
+        commit=commit,
+        date=time.strftime("%Y-%m-%d %H:%M:%S"),
+        python=platform.python_version(),
+        platform=platform.platform(),
+        processor=platform.processor(),
+        seed=seed,
+        max_iterations=max_iterations,
+        linear_solver="mumps",
+        compiled_functions=compiled_functions,
+        problems={},
+    )
+
+    # One thread for the linear solver. The process of a problem imports numpy when it starts, before run_problem, and
+    # the BLAS/OpenMP libraries read their number of threads at this import : it is set in the environment it inherits.
+    for variable in THREADS_ENVIRONMENT_VARIABLES:
+        os.environ[variable] = "1"
+    context = multiprocessing.get_context("spawn")
+    for name in problems:
+        # A new process for each problem, nothing is cached from a previous problem.
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            report["problems"][name] = executor.submit(
+                run_problem, PROBLEMS[name], seed, max_iterations, compiled_functions
+            ).result()
+        print(name, " : ", report["problems"][name]["solve_time"], "s,", report["problems"][name]["iterations"], "it")
+
+    if report_path is None:
+        os.makedirs(REPORTS_FOLDER, exist_ok=True)
+        report_path = os.path.join(REPORTS_FOLDER, commit + ".json")
+    with open(report_path, "w") as file:
+        json.dump(report, file, indent=2)
+    return report
+
+
+def compare_reports(reference_path: str, report_path: str) -> dict:
+    """
+    Compare the measures of two reports, problem by problem
+
+    Parameters
+    ----------
+    reference_path: str
+        The .json file of the reference report (ex: the previous commit)
+    report_path: str
+        The .json file of the new report
+
+    Returns
+    -------
+    The ratio new / reference of each measure of each problem of both reports
+    """
+    with open(reference_path, "r") as file:
+        reference = json.load(file)
+    with open(report_path, "r") as file:
+        report = json.load(file)
+
+    measures = ("build_time", "solve_time", "ipopt_time", "function_evaluation_time", "iterations", "peak_rss_mb")
+    ratios = {}
+    for name in reference["problems"].keys() & report["problems"].keys():
+        ratios[name] = {
+            measure: report["problems"][name][measure] / reference["problems"][name][measure]
+            for measure in measures
+            if reference["problems"][name][measure]
+        }
+        print(name, " : ", ", ".join(measure + " x" + str(round(ratio, 3)) for measure, ratio in ratios[name].items()))
+    return ratios
+
+
+def main():
+    run_benchmark()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+"""
+Structure of the NLP of the piano ocp, to find the penalties which slow IPOPT down, without solving it.
+The ocp is built and its NLP is assembled as IPOPT receives it. The report gives the sizes of the NLP (variables,
+constraints, nonzeros of the Jacobian of the constraints and of the Hessian of the Lagrangian), then for each penalty
+(objective or constraint, of each phase) : its number of rows, the nonzeros of its Jacobian (constraints) or of its
+gradient (objectives), the nonzeros of its Hessian, the number of instructions of its CasADi function, and the time of
+one evaluation of its function and of its Jacobian.
+The penalties added on several phases (or with several parameters) are also summed by name, the most expensive first.
+"""
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+from casadi import MX, Function, jacobian, hessian, dot, sum1, vertcat
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from benchmark_piano_ocp import PROBLEMS, REPORTS_FOLDER, git_commit
+
+COLUMNS = (
+    "kind",
+    "phase",
+    "penalty",
+    "rows",
+    "jacobian_nnz",
+    "hessian_nnz",
+    "instructions",
+    "evaluation_time",
+    "jacobian_time",
+)
+
+
+def penalty_pools(ocp) -> list:
+    """
+    The pools of penalties of an ocp, in the order of the NLP given to IPOPT
+
+    Parameters
+    ----------
+    ocp: OptimalControlProgram
+        The ocp
+
+    Returns
+    -------
+    The (kind, phase, nlp of the pool, penalties) of each pool, the phase of the penalties of the whole ocp is -1
+    """
+    pools = [
+        ("constraint", -1, ocp, ocp.g_internal),
+        ("constraint", -1, ocp, ocp.g),
+        ("objective", -1, ocp, ocp.J_internal),
+        ("objective", -1, [], ocp.J),
+    ]
+    for phase, nlp in enumerate(ocp.nlp):
+        pools += [
+            ("constraint", phase, nlp, nlp.g_internal),
+            ("constraint", phase, nlp, nlp.g),
+            ("objective", phase, nlp, nlp.J_internal),
+            ("objective", phase, nlp, nlp.J),
+        ]
+    return pools
+
+
+def penalty_label(penalty) -> str:
+    # The name of the penalty, with the parameters of the custom functions (segment, marker...).
+    params = getattr(penalty, "params", None) or {}
+    parameters = ", ".join(str(key) + "=" + str(value) for key, value in params.items() if isinstance(value, str))
+    return penalty.name + (" (" + parameters + ")" if parameters else "")
+
+
+def evaluation_time(function: Function, x: np.ndarray, n_evaluations: int) -> float:
+    # The mean time of one evaluation, the first one (memory allocation) is not counted.
+    function(x)
+    tic = time.perf_counter()
+    for _ in range(n_evaluations):
+        function(x)
+    return (time.perf_counter() - tic) / n_evaluations
+
+
+def penalty_structure(kind: str, expression: MX, x: MX, x0: np.ndarray, n_evaluations: int) -> dict:
+    """
+    The structure of one penalty
+
+    Parameters
+    ----------
+    kind: str
+        "constraint" or "objective"
+    expression: MX
+        The values of the penalty in the NLP (the weighted terms of an objective, which are summed)
+    x: MX
+        The variables of the NLP
+    x0: np.ndarray
+        The variables the functions are evaluated at
+    n_evaluations: int
+        The number of evaluations of each function timed
+
+    Returns
+    -------
+    The structure of the penalty
+    """
+    if kind == "objective":
+        # The objective is the sum of its terms : its gradient, and the Hessian of the sum.
+        value = sum1(expression)
+        hessian_nnz = hessian(value, x)[0].sparsity().nnz()
+        derivative = jacobian(value, x)
+    else:
+        # The constraint is in the Hessian of the Lagrangian through its multipliers.
+        lam = MX.sym("lam", expression.shape[0])
+        hessian_nnz = hessian(dot(lam, expression), x)[0].sparsity().nnz()
+        derivative = jacobian(expression, x)
+
+    function = Function("penalty", [x], [expression])
+    jacobian_function = Function("penalty_jacobian", [x], [derivative])
+    return dict(
+        rows=expression.shape[0],
+        jacobian_nnz=derivative.sparsity().nnz(),
+        hessian_nnz=hessian_nnz,
+        instructions=function.n_instructions(),
+        evaluation_time=evaluation_time(function, x0, n_evaluations),
+        jacobian_time=evaluation_time(jacobian_function, x0, n_evaluations),
+    )
+
+
+def nlp_structure(ocp, n_evaluations: int = 100) -> tuple:
+    """
+    The sizes of the NLP of an ocp, and the structure of each of its penalties
+
+    Parameters
+    ----------
+    ocp: OptimalControlProgram
+        The ocp
+    n_evaluations: int
+        The number of evaluations of each function timed
+
+    Returns
+    -------
+    The sizes of the NLP, and the table of the penalties
+    """
+    from bioptim.interfaces.ipopt_interface import IpoptInterface
+
+    # The NLP is assembled by the interface of IPOPT, as for a solve.
+    interface = IpoptInterface(ocp)
+    x = ocp.v.vector
+    x0 = np.zeros(x.shape[0])
+
+    rows = []
+    all_objectives = []
+    all_constraints = []
+    for kind, phase, nlp, penalties in penalty_pools(ocp):
+        for penalty in penalties:
+            if penalty is None:
+                continue
+            expression = interface.get_all_penalties(nlp, [penalty])
+            if expression.shape[0] == 0:
+                continue
+            (all_objectives if kind == "objective" else all_constraints).append(expression)
+            rows.append(
+                dict(
+                    kind=kind,
+                    phase=phase,
+                    penalty=penalty_label(penalty),
+                    **penalty_structure(kind, expression, x, x0, n_evaluations),
+                )
+            )
+    penalties = pd.DataFrame(rows, columns=list(COLUMNS))
+
+    g = vertcat(*all_constraints)
+    lam = MX.sym("lam", g.shape[0])
+    lagrangian = sum1(vertcat(*all_objectives)) + dot(lam, g)
+    jacobian_nnz = jacobian(g, x).sparsity().nnz()
+    hessian_nnz = hessian(lagrangian, x)[0].sparsity().nnz()
+    sizes = dict(
+        n_shooting=[nlp.ns for nlp in ocp.nlp],
+        n_variables=x.shape[0],
+        n_constraints=g.shape[0],
+        jacobian_nnz=jacobian_nnz,
+        jacobian_density=jacobian_nnz / max(x.shape[0] * g.shape[0], 1),
+        hessian_nnz=hessian_nnz,
+        hessian_density=hessian_nnz / max(x.shape[0] ** 2, 1),
+    )
+    return sizes, penalties
+
+
+def penalties_by_name(penalties: pd.DataFrame) -> pd.DataFrame:
+    """
+    The penalties summed over their phases, the most expensive to evaluate first
+    """
+    summary = penalties.groupby(["kind", "penalty"]).agg(
+        phases=("phase", "count"),
+        rows=("rows", "sum"),
+        jacobian_nnz=("jacobian_nnz", "sum"),
+        hessian_nnz=("hessian_nnz", "sum"),
+        instructions=("instructions", "sum"),
+        evaluation_time=("evaluation_time", "sum"),
+        jacobian_time=("jacobian_time", "sum"),
+    )
+    # The share of each penalty in the time of one evaluation of all the functions and Jacobians.
+    total_time = summary["evaluation_time"] + summary["jacobian_time"]
+    summary["time_share"] = total_time / max(total_time.sum(), 1e-12)
+    return summary.sort_values("time_share", ascending=False).reset_index()
+
+
+def structure_report(
+    problem: str = "pressed", n_evaluations: int = 100, compiled_functions: bool = False, output_folder: str = None
+) -> tuple:
+    """
+    Build a problem of the benchmark, print the structure of its NLP and save the tables in .csv files
+
+    Parameters
+    ----------
+    problem: str
+        The name of the problem in PROBLEMS
+    n_evaluations: int
+        The number of evaluations of each function timed
+    compiled_functions: bool
+        If the kinematics functions are compiled (see compiled_functions)
+    output_folder: str
+        The folder of the .csv files (default: reports/)
+
+    Returns
+    -------
+    The sizes of the NLP, the table of the penalties and the table of the penalties summed by name
+    """
+    from piano_ocp import prepare_piano_ocp
+
+    tic = time.perf_counter()
+    ocp = prepare_piano_ocp(**PROBLEMS[problem], compiled_functions=compiled_functions)
+    build_time = time.perf_counter() - tic
+    sizes, penalties = nlp_structure(ocp, n_evaluations)
+    sizes["build_time"] = build_time
+    summary = penalties_by_name(penalties)
+
+    pd.set_option("display.width", 200)
+    pd.set_option("display.max_columns", 20)
+    for name, value in sizes.items():
+        print(name, " : ", value)
+    print(summary)
+
+    output_folder = REPORTS_FOLDER if output_folder is None else output_folder
+    os.makedirs(output_folder, exist_ok=True)
+    name = "nlp_structure_" + problem + "_" + git_commit()
+    penalties.to_csv(os.path.join(output_folder, name + "_penalties.csv"), index=False)
+    summary.to_csv(os.path.join(output_folder, name + "_by_name.csv"), index=False)
+    return sizes, penalties, summary
+
+
+if __name__ == "__main__":
+    # python nlp_structure.py [problem of PROBLEMS]
+    structure_report(sys.argv[1] if len(sys.argv) > 1 else "pressed")
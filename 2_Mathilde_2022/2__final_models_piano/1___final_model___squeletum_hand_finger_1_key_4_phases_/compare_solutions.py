@@ -0,0 +1,264 @@
+"""
+Comparison of the q, qdot and tau of any number of solutions, each dof in its own axis of a 4 x 3 grid.
+The time axis of each solution is built from its own phase durations and number of nodes (the collocation points of
+the states at their own time), and the phases of each solution are concatenated once per variable, so all the dofs of a solution are plotted in one pass.
+The figures are shown, or written as .png files without any display (batch mode, for the solutions of many sweeps
+selected in the solution catalog).
+"""
+import os
+import sys
+import numpy as np
+from matplotlib import pyplot as plt
+
+from solution_store import open_solution
+from tau_impulse import PRESSED_PHASE_TIME
+
+# solution_store adds the folder of the shared helpers to the path.
+from ocp_nodes import node_times
+
+# Phase durations of the attacks (see piano_ocp.ATTACKS), for the solutions saved without their phase_time.
+ATTACK_PHASE_TIME = dict(pressed=PRESSED_PHASE_TIME, strucked=(0.3, 0.027, 0.058, 0.3))
+DOF_TITLES = (
+    "pelvis_rotZ_anteversion(-)/retroversion(+)",
+    "thorax_rotY_rotation_right(-)/left(+)",
+    "thorax_rotZ_extension(-)/flexion(+)",
+    "humerus_rotX_abduction(-)/adduction(+)",
+    "humerus_rotY_rotation_extern(-)/intern(+)",
+    "humerus_rotZ_extension(-)/flexion(+)",
+    "ulna_effector_rotZ_extension(-)/flexion(+)",
+    "radius_effector_rotY_rotation_extern(-)/intern(+)",
+    "hand_rotX_extension(-)/flexion(+)",
+    "index_rotX_extension(-)/flexion(+)",
+)
+# The group of the solution, the label of the y axis and the name of the variable in the titles.
+VARIABLES = dict(
+    q=("states", "q (rad)", "States (q)"),
+    qdot=("states", "qdot (rad/s)", "States (qdot)"),
+    tau=("controls", "Tau (N.m)", "Torque (tau)"),
+)
+GRID_SHAPE = (4, 3)
+LINE_STYLES = ("-", "--", "-.", ":")
+
+
+def phase_boundaries(phase_time) -> np.ndarray:
+    # The start of the first phase and the end of each phase.
+    return np.concatenate(([0], np.cumsum(phase_time)))
+
+
+def phase_node_times(n_nodes: int, n_shooting: int) -> np.ndarray:
+    """
+    The normalized times (0 to 1) of the nodes of a variable of a phase
+
+    Parameters
+    ----------
+    n_nodes: int
+        The number of nodes of the variable, the states of a COLLOCATION solution have the collocation points of each
+        interval between its shooting nodes
+    n_shooting: int
+        The number of shooting intervals of the phase
+
+    Returns
+    -------
+    The times of the nodes, the collocation points are placed at their own time (see ocp_nodes.node_times)
+    """
+    polynomial_degree = (n_nodes - 1) // n_shooting - 1
+    return node_times(n_shooting, polynomial_degree if polynomial_degree > 0 else None)
+
+
+def concatenated_phases(phases: list, phase_time, n_shooting: list) -> tuple:
+    """
+    Concatenate the phases of a variable and build its time axis
+
+    Parameters
+    ----------
+    phases: list
+        The array (n_dof, n_nodes) of each phase, the last node of a phase is the first node of the next one
+    phase_time:
+        The real duration of each phase
+    n_shooting: list
+        The number of shooting intervals of each phase
+
+    Returns
+    -------
+    The times (n_nodes_total,) and the values (n_dof, n_nodes_total), the last node of each phase but the last one is
+    dropped
+    """
+    boundaries = phase_boundaries(phase_time)
+    ends = [-1] * (len(phases) - 1) + [None]
+    times = np.concatenate(
+        [
+            boundaries[i] + phase_time[i] * phase_node_times(np.shape(phase)[1], n_shooting[i])[: ends[i]]
+            for i, phase in enumerate(phases)
+        ]
+    )
+    values = np.hstack([np.asarray(phase)[:, : ends[i]] for i, phase in enumerate(phases)])
+    return times, values
+
+
+def solution_shooting(solution) -> list:
+    # The controls have one column per shooting node, the last one (NaN) included.
+    return [np.shape(phase["tau"])[1] - 1 for phase in solution["controls"]]
+
+
+def solution_phase_time(solution, attack: str = None):
+    if solution.get("phase_time") is not None:
+        return solution["phase_time"]
+    return ATTACK_PHASE_TIME[solution.get("attack", attack or "pressed")]
+
+
+def plot_variable(solutions: list, labels: list, variable: str = "q", attack: str = None, title: str = None):
+    """
+    Plot one variable of several solutions, each dof in its own axis
+
+    Parameters
+    ----------
+    solutions: list
+        The data dicts of the solutions (see solution_store.open_solution)
+    labels: list
+        The label of each solution in the legend
+    variable: str
+        "q", "qdot" or "tau"
+    attack: str
+        The attack, for the phase durations of the solutions saved without their phase_time
+    title: str
+        The end of the title of the figure (the context of the comparison)
+
+    Returns
+    -------
+    The figure
+    """
+    group, y_label, name = VARIABLES[variable]
+    fig, axs = plt.subplots(*GRID_SHAPE, figsize=(24, 16))
+    for ax in axs.flat[len(DOF_TITLES) :]:
+        fig.delaxes(ax)
+    axs = axs.flat[: len(DOF_TITLES)]
+    fig.subplots_adjust(top=0.895, bottom=0.045, left=0.042, right=0.986, hspace=0.514, wspace=0.15)
+
+    colors = plt.rcParams["axes.prop_cycle"].by_key()["color"]
+    for i, (solution, label) in enumerate(zip(solutions, labels)):
+        phase_time = solution_phase_time(solution, attack)
+        times, values = concatenated_phases(
+            [phase[variable] for phase in solution[group]], phase_time, solution_shooting(solution)
+        )
+        style = dict(color=colors[i % len(colors)], linestyle=LINE_STYLES[i % len(LINE_STYLES)])
+        for dof, ax in enumerate(axs):
+            ax.plot(times, values[dof], label=label if dof == 0 else None, **style)
+
+    # phase lines (of the first solution) and axe titles
+    for dof, ax in enumerate(axs):
+        for boundary in phase_boundaries(solution_phase_time(solutions[0], attack))[1:]:
+            ax.axvline(x=boundary, color="gray", linestyle="--")
+        ax.set_title(("Tau_" if variable == "tau" and dof < len(DOF_TITLES) - 1 else "") + DOF_TITLES[dof], fontsize=14)
+        ax.set_xlabel("Time (s)", fontsize=12)
+        ax.set_ylabel(y_label, fontsize=12)
+        ax.grid()
+
+    fig.suptitle(name + " of limbs" + ("" if title is None else " " + title), fontweight="bold", size=18)
+    fig.legend(
+        loc="lower right",
+        borderaxespad=0,
+        title="Weight of minimisation controls for :",
+        prop={"size": 14},
+        title_fontsize=18,
+    )
+    return fig
+
+
+def compare_solutions(
+    paths: list,
+    labels: list = None,
+    variables: tuple = ("q", "qdot", "tau"),
+    attack: str = None,
+    title: str = None,
+    output_folder: str = None,
+    name: str = "comparison",
+) -> list:
+    """
+    Plot the q, qdot and tau of several solutions
+
+    Parameters
+    ----------
+    paths: list
+        The paths to the .sol solutions or .pckl files
+    labels: list
+        The label of each solution in the legend (default: the name of its file)
+    variables: tuple
+        The variables plotted, one figure each
+    attack: str
+        The attack, for the phase durations of the solutions saved without their phase_time
+    title: str
+        The end of the title of the figures
+    output_folder: str
+        The folder of the .png files, without any display. None to show the figures
+    name: str
+        The start of the name of the .png files (name_q.png...)
+
+    Returns
+    -------
+    The paths of the .png files, or the figures if they are shown
+    """
+    if labels is None:
+        labels = [os.path.splitext(os.path.basename(os.path.normpath(path)))[0] for path in paths]
+    solutions = [open_solution(path) for path in paths]
+    if output_folder is not None:
+        # No display is needed to write the .png files.
+        plt.switch_backend("Agg")
+        os.makedirs(output_folder, exist_ok=True)
+
+    outputs = []
+    for variable in variables:
+        fig = plot_variable(solutions, labels, variable, attack, title)
+        if output_folder is None:
+            outputs.append(fig)
+        else:
+            outputs.append(os.path.join(output_folder, name + "_" + variable + ".png"))
+            fig.savefig(outputs[-1])
+            plt.close(fig)
+    if output_folder is None:
+        plt.show()
+    return outputs
+
+
+def compare_sweeps(root: str, queries: dict, output_folder: str, variables: tuple = ("q", "qdot", "tau")) -> dict:
+    """
+    Write the comparison .png files of several selections of the solution catalog
+
+    Parameters
+    ----------
+    root: str
+        The root of the tree of results (see solution_catalog)
+    queries: dict
+        The query of the solutions of each comparison, by the name of its .png files
+    output_folder: str
+        The folder of the .png files
+    variables: tuple
+        The variables plotted
+
+    Returns
+    -------
+    The paths of the .png files of each comparison
+    """
+    from solution_catalog import select_solutions, scan
+
+    scan(root)
+    outputs = {}
+    for name, query in queries.items():
+        selection = select_solutions(root, query, rescan=False)
+        if selection.empty:
+            print("No solution for " + name + " : " + query)
+            continue
+        labels = [
+            "tau weight " + str(tau_weight) + ", objectives * " + str(coefficient)
+            for tau_weight, coefficient in zip(
+                selection["tau_minimisation_weight"], selection["objectives_weight_coefficient"]
+            )
+        ]
+        outputs[name] = compare_solutions(
+            list(selection["path"]), labels, variables, title="(" + query + ")", output_folder=output_folder, name=name
+        )
+    return outputs
+
+
+if __name__ == "__main__":
+    # python compare_solutions.py <root of the results> "<query>" <output folder>
+    print(compare_sweeps(sys.argv[1], {"comparison": sys.argv[2]}, sys.argv[3]))
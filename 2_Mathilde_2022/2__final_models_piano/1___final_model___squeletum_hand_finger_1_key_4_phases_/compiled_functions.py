@@ -0,0 +1,113 @@
+"""
+On-disk cache of CasADi functions compiled to shared libraries.
+A function is generated in C with its first and second order Jacobians, compiled once with the C compiler, and the
+.so file is reused by the next runs and by the worker processes of the multistart, instead of evaluating the CasADi
+virtual machine at each IPOPT iteration.
+The .so files are named by the function name, the model hash and the hash of the function itself (its signature and
+its serialized graph), so an edited bioMod or function gives a new library.
+"""
+import os
+import sys
+import hashlib
+import subprocess
+import casadi
+from casadi import Function, CodeGenerator
+
+# The helpers of the atomic writes are shared with the experimental datas.
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from atomic_files import write_file
+
+DEFAULT_CACHE_FOLDER = os.environ.get(
+    "PIANOPTIM_COMPILED_FUNCTIONS", os.path.join(os.path.dirname(os.path.abspath(__file__)), "compiled_functions_cache")
+)
+COMPILER = os.environ.get("CC", "gcc")
+COMPILER_FLAGS = ("-O3", "-fPIC", "-shared")
+# The Jacobians are named as CasADi looks for them in an external library : jac_<name>, jac_jac_<name>.
+JACOBIAN_ORDER = 2
+
+_loaded = {}
+
+
+def function_signature(function: Function) -> str:
+    """
+    The hash of a CasADi function : its inputs, outputs and serialized graph, the CasADi version and the compiler flags
+    """
+    signature = hashlib.sha1()
+    signature.update(str(function).encode())
+    signature.update(function.serialize().encode())
+    signature.update((casadi.__version__ + COMPILER + " ".join(COMPILER_FLAGS)).encode())
+    return signature.hexdigest()
+
+
+def library_path(function: Function, model_hash: str, cache_folder: str = DEFAULT_CACHE_FOLDER) -> str:
+    return os.path.join(
+        cache_folder, function.name() + "_" + model_hash[:12] + "_" + function_signature(function)[:16] + ".so"
+    )
+
+
+def generate_library(function: Function, path: str):
+    """
+    Generate the C code of a function and of its Jacobians, and compile it to a shared library
+
+    Parameters
+    ----------
+    function: Function
+        The CasADi function
+    path: str
+        The path of the .so file
+    """
+    # The temporary files are named by process, several workers can compile the same function at the same time.
+    tmp_name = os.path.basename(path)[: -len(".so")] + "_" + str(os.getpid())
+    folder = os.path.dirname(path)
+
+    code_generator = CodeGenerator(tmp_name + ".c")
+    code_generator.add(function)
+    jacobian = function
+    for order in range(1, JACOBIAN_ORDER + 1):
+        jacobian = jacobian.jacobian()
+        code_generator.add(
+            Function(
+                "jac_" * order + function.name(),
+                jacobian.mx_in(),
+                jacobian.call(jacobian.mx_in()),
+                jacobian.name_in(),
+                jacobian.name_out(),
+            )
+        )
+    code_generator.generate(folder + os.sep)
+
+    c_path = os.path.join(folder, tmp_name + ".c")
+    try:
+        # Renamed once compiled, so a worker never loads a half written library.
+        write_file(
+            path, lambda tmp_path: subprocess.run([COMPILER, *COMPILER_FLAGS, c_path, "-o", tmp_path], check=True)
+        )
+    finally:
+        os.remove(c_path)
+
+
+def compiled_function(function: Function, model_hash: str, cache_folder: str = DEFAULT_CACHE_FOLDER) -> Function:
+    """
+    The compiled version of a CasADi function, compiled only if it is not in the cache folder yet
+
+    Parameters
+    ----------
+    function: Function
+        The CasADi function, built with MX or SX
+    model_hash: str
+        The hash of the bioMod the function is built from
+    cache_folder: str
+        The folder of the .so files
+
+    Returns
+    -------
+    The external CasADi function, with the same inputs and outputs.
+    It can not be expanded to SX, the expressions calling it must stay MX.
+    """
+    path = library_path(function, model_hash, cache_folder)
+    if path not in _loaded:
+        if not os.path.isfile(path):
+            os.makedirs(cache_folder, exist_ok=True)
+            generate_library(function, path)
+        _loaded[path] = casadi.external(function.name(), path)
+    return _loaded[path]
@@ -0,0 +1,39 @@
+"""
+Marker trajectories of a solution, evaluated on all the nodes of all the phases at once.
+The markers function of a bioMod is built once (see model_cache), then mapped over the nodes, instead of building a
+new CasADi function for each node with BiorbdInterface.mx_to_cx.
+"""
+import numpy as np
+import biorbd_casadi as biorbd
+from model_cache import markers_function
+
+
+def marker_trajectories(model, q, markers: list) -> dict:
+    """
+    Evaluate the position of the markers on every node
+
+    Parameters
+    ----------
+    model: biorbd.Model
+        The model
+    q:
+        The states q, one array (n_q, n_nodes) or a list of one array per phase (the phases are concatenated)
+    markers: list
+        The indices or names of the markers
+
+    Returns
+    -------
+    The trajectory of each marker, of shape (n_nodes, 3) (x, y, z on each node)
+    """
+    all_q = np.hstack(q) if isinstance(q, (list, tuple)) else np.asarray(q)
+    n_nodes = all_q.shape[1]
+    n_markers = model.nbMarkers()
+
+    # The mapped function gives the markers of each node side by side : (3, n_nodes * n_markers).
+    all_markers = np.array(markers_function(model).map(n_nodes)(all_q)).reshape(3, n_nodes, n_markers)
+
+    trajectories = {}
+    for marker in markers:
+        marker_idx = biorbd.marker_index(model, marker) if isinstance(marker, str) else marker
+        trajectories[marker] = np.ascontiguousarray(all_markers[:, :, marker_idx].T)
+    return trajectories
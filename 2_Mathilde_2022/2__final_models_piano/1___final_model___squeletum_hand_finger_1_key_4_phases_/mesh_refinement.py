@@ -0,0 +1,171 @@
+"""
+Coarse-to-fine solve of the piano ocp : the problem is first solved with less shooting points and a collocation of
+lower degree, its solution is resampled on the shooting of the next level (see piano_ocp.resampled_warm_start) and is
+the initial guess of the next level, up to the target shooting and degree.
+The coarse levels are cheap and bring the initial guess close to the solution, so the fine levels (for example 2 to 4
+times the shooting points of the 44 ms of the key descent) converge in a few iterations instead of starting from zero.
+The time to build the ocp, the time of the solve, the iterations and the cost of each level are reported.
+"""
+import sys
+import time
+import numpy as np
+import pandas as pd
+from bioptim import OdeSolver, Solver
+
+from piano_ocp import prepare_piano_ocp, ATTACKS
+
+
+def shooting_label(n_shooting: tuple) -> str:
+    # (30, 7, 7, 35) -> "30;7;7;35", as the n_shooting column of the solution catalog.
+    return ";".join(str(n) for n in n_shooting)
+
+
+def refinement_levels(
+    n_shooting: tuple,
+    polynomial_degree: int = 4,
+    n_levels: int = 3,
+    factor: float = 2,
+    coarse_polynomial_degree: int = 2,
+    min_shooting: int = 3,
+) -> list:
+    """
+    The levels of a coarse-to-fine solve, the shooting points are divided by factor from one level to the previous one
+
+    Parameters
+    ----------
+    n_shooting: tuple
+        The number of shooting points of each phase of the last level
+    polynomial_degree: int
+        The degree of the collocation of the last level
+    n_levels: int
+        The number of levels, the last one included
+    factor: float
+        The ratio of the shooting points of a level to the ones of the previous level
+    coarse_polynomial_degree: int
+        The degree of the collocation of the levels before the last one
+    min_shooting: int
+        The minimal number of shooting points of a phase
+
+    Returns
+    -------
+    The (n_shooting, polynomial_degree) of each level, from the coarsest one, the levels with the same shooting as the
+    next one are removed
+    """
+    levels = []
+    for level in range(n_levels - 1, -1, -1):
+        level_shooting = tuple(max(min_shooting, int(np.ceil(n / factor**level))) for n in n_shooting)
+        level_degree = polynomial_degree if level == 0 else coarse_polynomial_degree
+        if levels and levels[-1][0] == level_shooting:
+            levels.pop()
+        levels.append((level_shooting, level_degree))
+    return levels
+
+
+def solve_mesh_refinement(
+    attack: str = "pressed",
+    n_shooting: tuple = None,
+    levels: list = None,
+    linear_solver: str = "ma57",
+    max_iterations: int = 1000000,
+    coarse_tolerance: float = 1e-4,
+    **ocp_parameters,
+) -> tuple:
+    """
+    Solve an ocp from the coarsest level to the finest one, each level starting from the solution of the previous one
+
+    Parameters
+    ----------
+    attack: str
+        "pressed" or "strucked"
+    n_shooting: tuple
+        The number of shooting points of each phase of the last level (default: the one of the attack)
+    levels: list
+        The (n_shooting, polynomial_degree) of each level, from the coarsest one (default: see refinement_levels)
+    linear_solver: str
+        The linear solver of IPOPT
+    max_iterations: int
+        The maximum number of iterations of each level
+    coarse_tolerance: float
+        The tolerance of IPOPT for the levels before the last one, which are only initial guesses
+    ocp_parameters:
+        The other parameters of prepare_piano_ocp (weights, phase_time...)
+
+    Returns
+    -------
+    The solution of the last level, its ocp and the timing of each level
+    """
+    if levels is None:
+        levels = refinement_levels(ATTACKS[attack]["n_shooting"] if n_shooting is None else n_shooting)
+
+    timings = []
+    warm_start = None
+    for level, (level_shooting, polynomial_degree) in enumerate(levels):
+        is_last_level = level == len(levels) - 1
+        tic = time.time()
+        ocp = prepare_piano_ocp(
+            attack,
+            n_shooting=level_shooting,
+            ode_solver=OdeSolver.COLLOCATION(polynomial_degree=polynomial_degree),
+            warm_start=warm_start,
+            **ocp_parameters,
+        )
+        build_time = time.time() - tic
+
+        solv = Solver.IPOPT(show_online_optim=False)
+        solv.set_maximum_iterations(max_iterations)
+        solv.set_linear_solver(linear_solver)
+        if not is_last_level:
+            solv.set_tol(coarse_tolerance)
+        tic = time.time()
+        sol = ocp.solve(solv)
+        solve_time = time.time() - tic
+
+        timings.append(
+            dict(
+                level=level,
+                n_shooting=shooting_label(level_shooting),
+                polynomial_degree=polynomial_degree,
+                build_time=build_time,
+                solve_time=solve_time,
+                iterations=sol.iterations,
+                cost=float(np.array(sol.cost)[0][0]),
+                status=sol.status,
+            )
+        )
+        print(
+            "Level "
+            + str(level)
+            + " ("
+            + shooting_label(level_shooting)
+            + " shooting points, degree "
+            + str(polynomial_degree)
+            + ") : built in "
+            + format(build_time, ".2f")
+            + " s, solved in "
+            + format(solve_time, ".2f")
+            + " s, "
+            + str(sol.iterations)
+            + " iterations."
+        )
+        # The states and controls of the level are resampled on the shooting of the next level.
+        warm_start = dict(states=sol.states, controls=sol.controls)
+
+    return sol, ocp, pd.DataFrame(timings)
+
+
+def main(attack: str = "pressed", key_descent_factor: int = 1):
+    """
+    Solve an attack coarse-to-fine, with key_descent_factor times the shooting points of the phase 1 of the attack
+    """
+    n_shooting = list(ATTACKS[attack]["n_shooting"])
+    n_shooting[1] *= key_descent_factor
+    sol, _, timings = solve_mesh_refinement(attack, n_shooting=tuple(n_shooting))
+    pd.set_option("display.width", 200)
+    print(timings)
+    print("Temps de resolution total : ", timings["build_time"].sum() + timings["solve_time"].sum(), "s")
+    sol.print_cost()
+
+
+if __name__ == "__main__":
+    # python mesh_refinement.py [pressed|strucked] [factor of the shooting points of the phase 1]
+    main(sys.argv[1] if len(sys.argv) > 1 else "pressed", int(sys.argv[2]) if len(sys.argv) > 2 else 1)
@@ -0,0 +1,166 @@
+"""
+Cache of the parsed bioMod models and of their kinematics CasADi functions, shared in each process.
+The cache is keyed by the path and the content hash of the bioMod, so an edited bioMod is parsed again.
+After use_compiled_functions, the kinematics functions are compiled to shared libraries (see compiled_functions).
+"""
+import os
+import hashlib
+from casadi import MX, Function
+import biorbd_casadi as biorbd
+from compiled_functions import compiled_function, DEFAULT_CACHE_FOLDER
+
+_hashes = {}
+_models = {}
+_functions = {}
+# The folder of the compiled .so files, None if the functions are evaluated by the CasADi virtual machine.
+_compiled_cache_folder = None
+
+
+def biomod_key(biorbd_model_path: str) -> tuple:
+    """
+    The (absolute path, content hash) key of a bioMod, the hash is computed again only if the file changed
+
+    Parameters
+    ----------
+    biorbd_model_path: str
+        The path to the bioMod
+
+    Returns
+    -------
+    The key of the bioMod
+    """
+    path = os.path.abspath(biorbd_model_path)
+    modification_time = os.path.getmtime(path)
+    if path not in _hashes or _hashes[path][0] != modification_time:
+        with open(path, "rb") as file:
+            _hashes[path] = (modification_time, hashlib.sha1(file.read()).hexdigest())
+    return path, _hashes[path][1]
+
+
+def model_key(model) -> tuple:
+    return biomod_key(model.path().absolutePath().to_string())
+
+
+def cached_model(biorbd_model_path: str):
+    """
+    The model of a bioMod, parsed once per process
+
+    Parameters
+    ----------
+    biorbd_model_path: str
+        The path to the bioMod
+
+    Returns
+    -------
+    The biorbd.Model
+    """
+    key = biomod_key(biorbd_model_path)
+    if key not in _models:
+        _models[key] = biorbd.Model(biorbd_model_path)
+    return _models[key]
+
+
+def phase_models(biorbd_model_path: str, n_phases: int) -> tuple:
+    """
+    The models of the phases of an ocp, which all share the same parsed model
+
+    Parameters
+    ----------
+    biorbd_model_path: str
+        The path to the bioMod
+    n_phases: int
+        The number of phases
+
+    Returns
+    -------
+    The tuple of the models of the phases
+    """
+    return (cached_model(biorbd_model_path),) * n_phases
+
+
+def use_compiled_functions(compiled: bool = True, cache_folder: str = DEFAULT_CACHE_FOLDER):
+    """
+    Choose if the kinematics functions built from now on in this process are compiled to shared libraries
+
+    Parameters
+    ----------
+    compiled: bool
+        If the functions are compiled
+    cache_folder: str
+        The folder of the compiled .so files, shared by the runs and the worker processes
+    """
+    global _compiled_cache_folder
+    _compiled_cache_folder = cache_folder if compiled else None
+
+
+def cached_function(model, name: str, build):
+    """
+    A CasADi function of a model, built once per bioMod and name
+
+    Parameters
+    ----------
+    model: biorbd.Model
+        The model
+    name: str
+        The name of the function
+    build: Callable
+        The function building the CasADi function from the model
+
+    Returns
+    -------
+    The CasADi function
+    """
+    key = (model_key(model), name, _compiled_cache_folder)
+    if key not in _functions:
+        function = build(model)
+        if _compiled_cache_folder is not None:
+            function = compiled_function(function, key[0][1], _compiled_cache_folder)
+        _functions[key] = function
+    return _functions[key]
+
+
+def kinematics_to_cx(name: str, symbolic_expression: MX, *symbolic_elements):
+    """
+    Same as BiorbdInterface.mx_to_cx, for the expressions of the kinematics functions of this module : the function is
+    not expanded to SX when they are compiled, as an external function can not be expanded
+
+    Parameters
+    ----------
+    name: str
+        The name of the function
+    symbolic_expression: MX
+        The expression, built with the .mx of the symbolic elements
+    symbolic_elements:
+        The OptimizationVariable the expression depends on
+
+    Returns
+    -------
+    The expression of the .cx of the symbolic elements
+    """
+    function = Function(name, [element.mx for element in symbolic_elements], [symbolic_expression])
+    if _compiled_cache_folder is None:
+        function = function.expand()
+    return function(*[element.cx for element in symbolic_elements])
+
+
+def markers_function(model):
+    """
+    The function q -> markers (3 x n_markers) of a model
+    """
+    return cached_function(
+        model, "markers", lambda m: biorbd.to_casadi_func("markers", m.markers, MX.sym("q", m.nbQ(), 1))
+    )
+
+
+def global_jcs_function(model, segment: str):
+    """
+    The function q -> global JCS (4 x 4 homogeneous matrix) of a segment of a model
+    """
+
+    def build(m):
+        segment_index = biorbd.segment_index(m, segment)
+        return biorbd.to_casadi_func(
+            "global_jcs_" + segment, lambda q: m.globalJCS(q, segment_index), MX.sym("q", m.nbQ(), 1)
+        )
+
+    return cached_function(model, "global_jcs_" + segment, build)
@@ -0,0 +1,167 @@
+"""
+Pareto front of the torques of the proximal limbs against the torques of the distal limbs, for the table of the
+multistart simulations (see results_table).
+The sums of each group of dofs are computed on whole columns, the non-dominated simulations of each panel are extracted
+by sorting (n log n, for thousands of simulations) and the hypervolume of each front is computed on the sorted front.
+Both torques are minimized : a simulation is dominated if another one has less distal and less proximal torque.
+"""
+import numpy as np
+import pandas as pd
+from matplotlib import pyplot as plt
+
+from results_table import DOF_NAMES
+
+DISTAL_DOFS = ("ulna", "radius", "hand", "finger")
+# The proximal dofs of each panel, its title and the name of its torque on the y axis.
+PANELS = dict(
+    every_proximal_limbs=(DOF_NAMES[:6], "Every proximal limbs", "proximaux"),
+    humerus=(("humerus_x", "humerus_y", "humerus_z"), "Humerus", "humerus"),
+    thorax=(("thorax_y", "thorax_z"), "Thorax", "thorax"),
+    pelvis=(("pelvis_z",), "Pelvis", "pelvis"),
+)
+
+
+def torque_sums(tab_tau: pd.DataFrame) -> pd.DataFrame:
+    """
+    The sum of the absolute torque impulses of the distal dofs and of the proximal dofs of each panel
+
+    Parameters
+    ----------
+    tab_tau: pd.DataFrame
+        The table of the simulations, one column per dof
+
+    Returns
+    -------
+    The table of the simulations, with a distal column and a column per panel
+    """
+    sums = pd.DataFrame({"simulation": tab_tau["simulation"].values})
+    sums["distal"] = tab_tau[list(DISTAL_DOFS)].abs().sum(axis=1).values
+    for panel, (dofs, _, _) in PANELS.items():
+        sums[panel] = tab_tau[list(dofs)].abs().sum(axis=1).values
+    return sums
+
+
+def non_dominated(points: np.ndarray) -> np.ndarray:
+    """
+    The non-dominated points, all the objectives being minimized
+
+    Parameters
+    ----------
+    points: np.ndarray
+        The objectives of each point (n_points, n_objectives)
+
+    Returns
+    -------
+    The boolean mask of the non-dominated points (n_points,), the duplicates of a non-dominated point are kept
+    """
+    points = np.asarray(points, dtype=float)
+    # The duplicates are filtered once, and take the status of their unique point.
+    unique_points, inverse = np.unique(points, axis=0, return_inverse=True)
+    inverse = inverse.ravel()
+
+    if unique_points.shape[1] == 2:
+        # Sorted by x then y, a point is non-dominated if its y is less than the y of all the points before it.
+        order = np.lexsort((unique_points[:, 1], unique_points[:, 0]))
+        y = unique_points[order, 1]
+        previous_min = np.concatenate(([np.inf], np.minimum.accumulate(y)[:-1]))
+        is_efficient = np.zeros(len(unique_points), dtype=bool)
+        is_efficient[order] = y < previous_min
+    else:
+        # Each remaining point removes all the points it dominates, the points with the least sum go first.
+        order = np.argsort(unique_points.sum(axis=1))
+        candidates = unique_points[order]
+        keep = np.ones(len(candidates), dtype=bool)
+        for i in range(len(candidates)):
+            if keep[i]:
+                dominated = np.all(candidates[i] <= candidates, axis=1) & np.any(candidates[i] < candidates, axis=1)
+                keep &= ~dominated
+        is_efficient = np.zeros(len(unique_points), dtype=bool)
+        is_efficient[order] = keep
+    return is_efficient[inverse]
+
+
+def hypervolume_2d(front: np.ndarray, reference: np.ndarray) -> float:
+    """
+    The area dominated by a 2D front and bounded by a reference point, both objectives being minimized
+
+    Parameters
+    ----------
+    front: np.ndarray
+        The non-dominated points (n_points, 2)
+    reference: np.ndarray
+        The reference point (2,), worse than the front on both objectives
+
+    Returns
+    -------
+    The hypervolume
+    """
+    front = np.unique(np.asarray(front, dtype=float), axis=0)
+    front = front[np.all(front < reference, axis=1)]
+    if len(front) == 0:
+        return 0.0
+    # Sorted by x, the y of a front decreases : each point adds the rectangle up to the x of the next point.
+    front = front[np.argsort(front[:, 0])]
+    widths = np.diff(np.append(front[:, 0], reference[0]))
+    return float(np.sum(widths * (reference[1] - front[:, 1])))
+
+
+def pareto_analysis(tab_tau: pd.DataFrame, reference: dict = None) -> tuple:
+    """
+    The non-dominated simulations and the hypervolume of each panel
+
+    Parameters
+    ----------
+    tab_tau: pd.DataFrame
+        The table of the simulations
+    reference: dict
+        The reference point (distal, proximal) of each panel (default: the worst simulation on each axis)
+
+    Returns
+    -------
+    The torque sums with a <panel>_pareto mask column per panel, and the hypervolume of each panel
+    """
+    sums = torque_sums(tab_tau)
+    hypervolumes = {}
+    for panel in PANELS:
+        points = sums[["distal", panel]].to_numpy()
+        sums[panel + "_pareto"] = non_dominated(points)
+        if len(points) == 0:
+            hypervolumes[panel] = 0.0
+            continue
+        panel_reference = points.max(axis=0) if reference is None else np.asarray(reference[panel])
+        hypervolumes[panel] = hypervolume_2d(points[sums[panel + "_pareto"].to_numpy()], panel_reference)
+    return sums, hypervolumes
+
+
+def plot_pareto(sums: pd.DataFrame, hypervolumes: dict, point_labels: bool = True):
+    """
+    Plot each panel with one scatter of the simulations and the line of its Pareto front
+
+    Parameters
+    ----------
+    sums: pd.DataFrame
+        The torque sums and the Pareto masks (see pareto_analysis)
+    hypervolumes: dict
+        The hypervolume of each panel
+    point_labels: bool
+        If the name of the simulation is shown by clicking a point (needs mpldatacursor)
+
+    Returns
+    -------
+    The figure
+    """
+    fig, axs = plt.subplots(2, 2)
+    plt.subplots_adjust(top=0.88, bottom=0.11, left=0.125, right=0.9, hspace=0.295, wspace=0.2)
+    for ax, (panel, (_, title, torque_name)) in zip(axs.flat, PANELS.items()):
+        scatter = ax.scatter(sums["distal"], sums[panel], c=np.where(sums[panel + "_pareto"], "tab:red", "tab:blue"))
+        front = sums[sums[panel + "_pareto"]].sort_values("distal")
+        ax.step(front["distal"], front[panel], where="post", color="tab:red", linewidth=1)
+        if point_labels:
+            from mpldatacursor import datacursor
+
+            datacursor(scatter, point_labels=sums["simulation"].tolist())
+        hypervolume = format(hypervolumes[panel], ".4g")
+        ax.set_title(title + " (hypervolume : " + hypervolume + ")", fontsize=14, fontweight="bold")
+        ax.set_xlabel("Σ(| tau_distaux * dt |) (en N.m)", fontsize=12)
+        ax.set_ylabel("Σ(| tau_" + torque_name + " * dt |) (en N.m)", fontsize=12)
+    return fig
@@ -0,0 +1,658 @@
+"""
+Optimal control program of one attack of the key (pressed or strucked) in 4 phases : 0 the finger goes to the key,
+1 the key is pushed down, 2 the finger is on the key bed (contact), 3 the finger goes back above the key.
+The attack, the shooting of each phase, the duration of each phase and the weights of the objectives are parameters,
+so the final scripts, the multistart and the benchmarks all build their ocp with prepare_piano_ocp.
+The weights and the initial guess of a built ocp are updated with update_piano_ocp, so a sweep of weights builds its
+ocp once and solves it again with each set of weights.
+Nothing is computed when the module is imported, and the bioMod is parsed once per process (see model_cache).
+
+ !! Les axes du modèle ne sont pas les mêmes que ceux généralement utilisés en biomécanique : x axe de flexion, y supination/pronation, z vertical
+ ici on a : Y -» X , Z-» Y et X -» Z
+"""
+import os
+import sys
+import numpy as np
+from casadi import MX, acos, vertcat, dot, pi
+import biorbd_casadi as biorbd
+from bioptim import (
+    PenaltyNode,
+    ObjectiveList,
+    PhaseTransitionFcn,
+    DynamicsList,
+    ConstraintFcn,
+    BoundsList,
+    InitialGuessList,
+    PhaseTransitionList,
+    Node,
+    OptimalControlProgram,
+    DynamicsFcn,
+    ObjectiveFcn,
+    ConstraintList,
+    PenaltyNodeList,
+    QAndQDotBounds,
+    OdeSolver,
+    InterpolationType,
+)
+from model_cache import phase_models, markers_function, global_jcs_function, use_compiled_functions, kinematics_to_cx
+
+# The .c3d trials and the tools to measure the velocity profiles of the finger.
+EXPERIMENTAL_DATA_FOLDER = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "..",
+    "..",
+    "1__experimental_datas_and_calculations",
+    "experimental_c3d_datas",
+)
+sys.path.append(EXPERIMENTAL_DATA_FOLDER)
+
+BIORBD_MODEL_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "bioMod", "Squeletum_hand_finger_3D_2_keys_octave_LA.bioMod"
+)
+N_PHASES = 4
+PROXIMAL_DOFS = [0, 1, 2, 3, 4, 5]
+DISTAL_DOFS = [6, 7, 8, 9]
+TAU_MIN, TAU_MAX, TAU_INIT = -200, 200, 0
+
+# Weights of the objectives. The torques weights are used as they are, the other weights are multiplied by the
+# objectives_weight_coefficient of prepare_piano_ocp. An objective whose weight is 0 is not added.
+DEFAULT_WEIGHTS = dict(
+    proximal_tau=100,
+    distal_tau=100,
+    qdot=0.0001,
+    # To block ulna rotation before the key pressing.
+    ulna_qdot=100000,
+    finger_velocity=10000,
+    # One weight per phase.
+    finger_orientation=(1000, 100000, 100000, 1000),
+    finger_qdot_derivative=100,
+    tau_continuity=1000,
+)
+# The weights which are not multiplied by the objectives_weight_coefficient.
+TAU_WEIGHTS = ("proximal_tau", "distal_tau")
+# The (weight, dofs) of the torques objectives of each phase, as the final scripts and the multistart added them, so the
+# detailed cost of a solution has the same entries as its previous runs :
+# "grouped" : one objective on the proximal dofs and one on the distal dofs (the multistart),
+# "distal_per_dof" : one objective on the proximal dofs and one on each distal dof, to see the cost of each of them,
+# "all" : one objective on every dof, the proximal and distal weights must be the same.
+TAU_OBJECTIVES = dict(
+    grouped=(("proximal_tau", PROXIMAL_DOFS), ("distal_tau", DISTAL_DOFS)),
+    distal_per_dof=(("proximal_tau", PROXIMAL_DOFS),) + tuple(("distal_tau", dof) for dof in DISTAL_DOFS),
+    all=(("proximal_tau", PROXIMAL_DOFS + DISTAL_DOFS),),
+)
+
+# Average of N frames by phase ; Average of phases time ; all measured with the motion capture datas.
+# The velocity of the finger during the phase 1 tracks the mean profile of the keystrokes of the velocity_trials (see
+# velocity_profiles), velocity_profile is the profile used when the trials are not available.
+ATTACKS = dict(
+    pressed=dict(
+        n_shooting=(30, 7, 7, 35),
+        phase_time=(0.3, 0.044, 0.051, 0.35),
+        velocity_profile=(
+            0,
+            -0.113772161006927,
+            -0.180575996580578,
+            -0.270097219830468,
+            -0.347421549388341,
+            -0.290588704744975,
+            -0.0996376128423782,
+            0,
+        ),
+        velocity_trials=(os.path.join(EXPERIMENTAL_DATA_FOLDER, "004_BasPreStaA.c3d"),),
+        # The finger is on the key during the whole phase 0.
+        key_surface_nodes=(Node.ALL,),
+        weights=dict(),
+    ),
+    strucked=dict(
+        n_shooting=(30, 6, 9, 30),
+        phase_time=(0.3, 0.027, 0.058, 0.3),
+        velocity_profile=(
+            -0.698417100906372,
+            -0.474601301515033,
+            -0.368024758139809,
+            -0.357349785081633,
+            -0.367995643393795,
+            -0.277969583506421,
+            0,
+        ),
+        velocity_trials=(os.path.join(EXPERIMENTAL_DATA_FOLDER, "012_BasFraStaB.c3d"),),
+        # The finger leaves the key and strikes it again at the end of the phase 0.
+        key_surface_nodes=(Node.START, Node.END),
+        weights=dict(ulna_qdot=0, finger_orientation=(100000, 100000, 100000, 100000)),
+    ),
+)
+
+
+def minimize_difference(all_pn: PenaltyNode):
+    return all_pn[0].nlp.controls.cx_end - all_pn[1].nlp.controls.cx
+
+
+def custom_func_track_finger_5_on_the_right_of_principal_finger(all_pn: PenaltyNodeList) -> MX:
+    finger_marker_idx = biorbd.marker_index(all_pn.nlp.model, "finger_marker")
+    markers = kinematics_to_cx(
+        "markers", markers_function(all_pn.nlp.model)(all_pn.nlp.states["q"].mx), all_pn.nlp.states["q"]
+    )
+    finger_marker = markers[:, finger_marker_idx]
+
+    finger_marker_5_idx = biorbd.marker_index(all_pn.nlp.model, "finger_marker_5")
+    markers_5 = kinematics_to_cx(
+        "markers_5", markers_function(all_pn.nlp.model)(all_pn.nlp.states["q"].mx), all_pn.nlp.states["q"]
+    )
+    finger_marker_5 = markers_5[:, finger_marker_5_idx]
+
+    markers_diff_key2 = finger_marker[1] - finger_marker_5[1]
+
+    return markers_diff_key2
+
+
+def custom_func_track_principal_finger_and_finger5_above_bed_key(all_pn: PenaltyNodeList, marker: str) -> MX:
+    finger_marker_idx = biorbd.marker_index(all_pn.nlp.model, marker)
+    markers = kinematics_to_cx(
+        "markers", markers_function(all_pn.nlp.model)(all_pn.nlp.states["q"].mx), all_pn.nlp.states["q"]
+    )
+    finger_marker = markers[:, finger_marker_idx]
+
+    markers_diff_key3 = finger_marker[2] - (0.07808863830566405 - 0.02)
+
+    return markers_diff_key3
+
+
+def custom_func_track_roty_principal_finger(
+    all_pn: PenaltyNodeList,
+) -> MX:
+
+    model = all_pn.nlp.model
+    q = all_pn.nlp.states["q"].mx
+
+    rotation_matrix = global_jcs_function(model, "2proxph_2mcp_flexion")(q)
+
+    output = vertcat(
+        rotation_matrix[1, 0],
+        rotation_matrix[1, 2],
+        rotation_matrix[0, 1],
+        rotation_matrix[2, 1],
+        rotation_matrix[1, 1] - MX(1),
+    )
+    rotation_matrix_output = kinematics_to_cx("rot_mat", output, all_pn.nlp.states["q"])
+
+    return rotation_matrix_output
+
+
+def custom_func_track_principal_finger_pi_in_two_global_axis(all_pn: PenaltyNodeList, segment: str) -> MX:
+    model = all_pn.nlp.model
+    q = all_pn.nlp.states["q"].mx
+    # global JCS gives the local matrix according to the global matrix
+    principal_finger_axis = global_jcs_function(model, segment)(q)  # x finger = y global
+    y = MX.zeros(4)
+    y[:4] = np.array([0, 1, 0, 1])
+    # @ x : pour avoir l'orientation du vecteur x du jcs local exprimé dans le global
+    # @ produit matriciel
+    principal_finger_y = principal_finger_axis @ y
+    principal_finger_y = principal_finger_y[:3, :]
+
+    global_y = MX.zeros(3)
+    global_y[:3] = np.array([0, 1, 0])
+
+    teta = acos(dot(principal_finger_y, global_y[:3]))
+    output_casadi = kinematics_to_cx("scal_prod", teta, all_pn.nlp.states["q"])
+
+    return output_casadi
+
+
+def velocity_target(velocity_profile, n_nodes: int) -> np.ndarray:
+    """
+    The velocity profile of the finger on the nodes of the phase 1, linearly resampled if the phase 1 has not the
+    number of nodes of the profile
+
+    Parameters
+    ----------
+    velocity_profile:
+        The measured velocity profile
+    n_nodes: int
+        The number of nodes of the phase 1
+
+    Returns
+    -------
+    The target of shape (1, n_nodes)
+    """
+    velocity_profile = np.asarray(velocity_profile, dtype=float)
+    if velocity_profile.shape[0] != n_nodes:
+        velocity_profile = np.interp(
+            np.linspace(0, 1, n_nodes), np.linspace(0, 1, velocity_profile.shape[0]), velocity_profile
+        )
+    return velocity_profile[np.newaxis, :]
+
+
+def finger_velocity_target(attack: str, n_nodes: int, velocity_trials: tuple = None) -> np.ndarray:
+    """
+    The target of the velocity of the finger on the nodes of the phase 1 : the mean velocity profile of the keystrokes
+    of the trials, between the key contact and the key bed
+
+    Parameters
+    ----------
+    attack: str
+        "pressed" or "strucked"
+    n_nodes: int
+        The number of nodes of the phase 1
+    velocity_trials: tuple
+        The .c3d files of the trials (default: the ones of the attack), () to use the velocity_profile of the attack
+
+    Returns
+    -------
+    The target of shape (1, n_nodes)
+    """
+    if velocity_trials is None:
+        velocity_trials = ATTACKS[attack]["velocity_trials"]
+        if not all(os.path.isfile(path) for path in velocity_trials):
+            print("The trials of the " + attack + " attack are not found, its velocity_profile is the target.")
+            velocity_trials = ()
+    if not velocity_trials:
+        return velocity_target(ATTACKS[attack]["velocity_profile"], n_nodes)
+
+    # Imported only when the profile is measured, the .c3d reader is not needed otherwise.
+    from velocity_profiles import velocity_profile
+
+    return velocity_profile(velocity_trials, n_nodes, phase="key", attack=attack)["mean"][np.newaxis, :]
+
+
+def piano_weights(attack: str, weights: dict = None) -> dict:
+    # The weights of DEFAULT_WEIGHTS, replaced by the ones of the attack, then by the given ones.
+    return {**DEFAULT_WEIGHTS, **ATTACKS[attack]["weights"], **(weights if weights is not None else {})}
+
+
+def check_tau_objectives(weights: dict, tau_objectives: str):
+    # With one objective on every dof, the weight of the proximal dofs is the weight of the distal dofs too.
+    if tau_objectives == "all" and weights["proximal_tau"] != weights["distal_tau"]:
+        raise ValueError("With tau_objectives='all', the proximal_tau and distal_tau weights must be the same.")
+
+
+def objective_weight(weights: dict, objectives_weight_coefficient: float, weight_key: str, phase: int = None) -> float:
+    """
+    The weight of an objective
+
+    Parameters
+    ----------
+    weights: dict
+        The weights of the objectives (see piano_weights)
+    objectives_weight_coefficient: float
+        The coefficient multiplying the weights of the objectives other than the torques
+    weight_key: str
+        The key of the weight in the weights
+    phase: int
+        The phase of the weights given per phase, None for the other weights
+
+    Returns
+    -------
+    The weight of the objective
+    """
+    weight = weights[weight_key] if phase is None else weights[weight_key][phase]
+    return weight if weight_key in TAU_WEIGHTS else weight * objectives_weight_coefficient
+
+
+def resampled_warm_start(states: np.ndarray, controls: np.ndarray, n_shooting: int) -> tuple:
+    """
+    The states and the controls of one phase of a solution, on the shooting nodes of a phase with another number of
+    shooting points : the states are linearly interpolated, and each control interval takes the control of the
+    interval of the solution which contains its middle (piecewise constant controls)
+
+    Parameters
+    ----------
+    states: np.ndarray
+        The states of the phase (n_states, n_nodes), with the collocation points of the solution if it has some
+    controls: np.ndarray
+        The controls of the phase (n_controls, n_shooting_of_the_solution + 1), the last control is NaN
+    n_shooting: int
+        The number of shooting points of the phase
+
+    Returns
+    -------
+    The states (n_states, n_shooting + 1) and the controls (n_controls, n_shooting)
+    """
+    source_shooting = controls.shape[1] - 1
+    # Only the states of the shooting nodes are kept (COLLOCATION saves the collocation points too).
+    states = np.asarray(states)[:, :: (states.shape[1] - 1) // source_shooting]
+    controls = np.asarray(controls)[:, :-1]
+    if source_shooting == n_shooting:
+        return states, controls
+
+    source_nodes = np.linspace(0, 1, source_shooting + 1)
+    nodes = np.linspace(0, 1, n_shooting + 1)
+    states = np.array([np.interp(nodes, source_nodes, state) for state in states])
+    middles = (np.arange(n_shooting) + 0.5) / n_shooting
+    return states, controls[:, np.minimum((middles * source_shooting).astype(int), source_shooting - 1)]
+
+
+def piano_initial_guess(biorbd_model: list, n_shooting: tuple, warm_start: dict = None) -> tuple:
+    """
+    The initial guess of the states and of the controls
+
+    Parameters
+    ----------
+    biorbd_model: list
+        The model of each phase
+    n_shooting: tuple
+        The number of shooting points of each phase
+    warm_start: dict
+        The data of an already solved ocp, whose states and controls are the initial guess (resampled if its shooting
+        is not the same)
+
+    Returns
+    -------
+    The InitialGuessList of the states and the one of the controls
+    """
+    x_init = InitialGuessList()
+    u_init = InitialGuessList()
+    for phase in range(N_PHASES):
+        if warm_start is None:
+            x_init.add([0] * (biorbd_model[phase].nbQ() + biorbd_model[phase].nbQdot()))
+            x_init[phase][4, 0] = 0.08
+            x_init[phase][5, 0] = 0.67
+            x_init[phase][6, 0] = 1.11
+            x_init[phase][7, 0] = 1.48
+            x_init[phase][9, 0] = 0.17
+            u_init.add([TAU_INIT] * biorbd_model[phase].nbGeneralizedTorque())
+        else:
+            states, controls = resampled_warm_start(
+                warm_start["states"][phase]["all"], warm_start["controls"][phase]["all"], n_shooting[phase]
+            )
+            x_init.add(states, interpolation=InterpolationType.EACH_FRAME)
+            u_init.add(controls, interpolation=InterpolationType.EACH_FRAME)
+    return x_init, u_init
+
+
+def prepare_piano_ocp(
+    attack: str = "pressed",
+    n_shooting: tuple = None,
+    phase_time: tuple = None,
+    weights: dict = None,
+    objectives_weight_coefficient: float = 1,
+    biorbd_model_path: str = BIORBD_MODEL_PATH,
+    ode_solver: OdeSolver = None,
+    warm_start: dict = None,
+    compiled_functions: bool = False,
+    velocity_trials: tuple = None,
+    tau_objectives: str = "grouped",
+) -> OptimalControlProgram:
+    """
+    Prepare the ocp of an attack
+
+    Parameters
+    ----------
+    attack: str
+        "pressed" or "strucked"
+    n_shooting: tuple
+        The number of shooting points of each phase (default: the one of the attack)
+    phase_time: tuple
+        The duration of each phase (default: the one of the attack)
+    weights: dict
+        The weights replacing the ones of DEFAULT_WEIGHTS and of the attack, ex: dict(distal_tau=10000)
+    objectives_weight_coefficient: float
+        The coefficient multiplying the weights of the objectives other than the torques
+    biorbd_model_path: str
+        The path to the bioMod
+    ode_solver: OdeSolver
+        The ode solve to use (default: COLLOCATION of degree 4)
+    warm_start: dict
+        The data of an already solved ocp, whose states and controls are the initial guess (resampled if its shooting
+        is not the same, see resampled_warm_start)
+    compiled_functions: bool
+        If the kinematics functions of the custom penalties are compiled to shared libraries (cached on disk)
+    velocity_trials: tuple
+        The .c3d files of the trials of the velocity profile of the phase 1 (see finger_velocity_target)
+    tau_objectives: str
+        The objectives of the torques of each phase, "grouped", "distal_per_dof" or "all" (see TAU_OBJECTIVES)
+
+    Returns
+    -------
+    The OptimalControlProgram ready to be solved
+    """
+
+    attack_parameters = ATTACKS[attack]
+    n_shooting = attack_parameters["n_shooting"] if n_shooting is None else tuple(n_shooting)
+    phase_time = attack_parameters["phase_time"] if phase_time is None else tuple(phase_time)
+    weights = piano_weights(attack, weights)
+    check_tau_objectives(weights, tau_objectives)
+    if ode_solver is None:
+        ode_solver = OdeSolver.COLLOCATION(polynomial_degree=4)
+
+    use_compiled_functions(compiled_functions)
+    # One parsed model per process, shared by the phases and by the next ocp built in the same process.
+    biorbd_model = phase_models(biorbd_model_path, N_PHASES)
+    n_tau = biorbd_model[0].nbGeneralizedTorque()
+
+    # Objectives
+    objective_functions = ObjectiveList()
+
+    def add_objective(objective, weight_key: str, weight_phase: int = None, **objective_parameters):
+        objective_functions.add(
+            objective,
+            weight=objective_weight(weights, objectives_weight_coefficient, weight_key, weight_phase),
+            **objective_parameters,
+        )
+        # The objective keeps the key of its weight, so update_piano_ocp can change it without rebuilding the ocp.
+        objective_functions[objective_parameters["phase"]][-1].piano_weight = (weight_key, weight_phase)
+
+    for phase in range(N_PHASES):
+        # Minimize Torques generated into articulations
+        for weight_key, dofs in TAU_OBJECTIVES[tau_objectives]:
+            add_objective(ObjectiveFcn.Lagrange.MINIMIZE_CONTROL, weight_key, key="tau", phase=phase, index=dofs)
+
+    for phase in range(N_PHASES):
+        # In the phases 0 and 3, the hand and finger velocities are regularized by their derivative (see below).
+        add_objective(
+            ObjectiveFcn.Lagrange.MINIMIZE_STATE,
+            "qdot",
+            key="qdot",
+            phase=phase,
+            index=PROXIMAL_DOFS + DISTAL_DOFS[:2] if phase in (0, 3) else PROXIMAL_DOFS + DISTAL_DOFS,
+        )
+
+    # To block ulna rotation before the key pressing.
+    if weights["ulna_qdot"]:
+        add_objective(ObjectiveFcn.Lagrange.MINIMIZE_STATE, "ulna_qdot", key="qdot", phase=0, index=[7])
+
+    add_objective(
+        ObjectiveFcn.Mayer.TRACK_MARKERS_VELOCITY,
+        "finger_velocity",
+        target=finger_velocity_target(attack, n_shooting[1] + 1, velocity_trials),
+        node=Node.ALL,
+        phase=1,
+        marker_index=4,
+    )
+
+    # To keep the hand/index perpendicular of the key piano all long the attack.
+    for segment in ("2proxph_2mcp_flexion", "secondmc"):
+        for phase in range(N_PHASES):
+            add_objective(
+                custom_func_track_principal_finger_pi_in_two_global_axis,
+                "finger_orientation",
+                weight_phase=phase,
+                custom_type=ObjectiveFcn.Lagrange,
+                node=Node.ALL,
+                phase=phase,
+                quadratic=True,
+                target=np.full((1, n_shooting[phase] + 1), pi / 2),
+                segment=segment,
+            )
+
+    # To avoid the apparition of "noise" caused by the objective function just before.
+    for phase in (0, 3):
+        add_objective(
+            ObjectiveFcn.Lagrange.MINIMIZE_STATE,
+            "finger_qdot_derivative",
+            key="qdot",
+            phase=phase,
+            index=[8, 9],
+            derivative=True,
+        )
+
+    # To minimize the difference between the last torque of a phase and the first torque of the next phase.
+    for phase in range(1, N_PHASES):
+        add_objective(
+            minimize_difference,
+            "tau_continuity",
+            custom_type=ObjectiveFcn.Mayer,
+            node=Node.TRANSITION,
+            phase=phase,
+            quadratic=True,
+        )
+
+    # Dynamics
+    dynamics = DynamicsList()
+    for phase in range(N_PHASES):
+        dynamics.add(DynamicsFcn.TORQUE_DRIVEN, with_contact=phase == 2, phase=phase)
+
+    # Constraints
+    constraints = ConstraintList()
+
+    for node in attack_parameters["key_surface_nodes"]:
+        constraints.add(
+            ConstraintFcn.SUPERIMPOSE_MARKERS,
+            node=node,
+            first_marker="finger_marker",
+            second_marker="high_square",
+            phase=0,
+        )
+    constraints.add(
+        ConstraintFcn.SUPERIMPOSE_MARKERS,
+        node=Node.END,
+        first_marker="finger_marker",
+        second_marker="low_square",
+        phase=1,
+    )
+    constraints.add(
+        ConstraintFcn.TRACK_CONTACT_FORCES, node=Node.ALL, contact_index=0, min_bound=-5, max_bound=5, phase=2
+    )
+    constraints.add(
+        ConstraintFcn.TRACK_CONTACT_FORCES, node=Node.ALL, contact_index=1, min_bound=-5, max_bound=5, phase=2
+    )
+    constraints.add(
+        ConstraintFcn.TRACK_CONTACT_FORCES, node=Node.ALL, contact_index=2, min_bound=0, max_bound=30, phase=2
+    )
+    constraints.add(
+        ConstraintFcn.SUPERIMPOSE_MARKERS,
+        node=Node.END,
+        first_marker="finger_marker",
+        second_marker="high_square",
+        phase=3,
+    )
+
+    # To keep the index and the small finger above the bed key.
+    for marker in ("finger_marker", "finger_marker_5"):
+        for phase in range(N_PHASES):
+            constraints.add(
+                custom_func_track_principal_finger_and_finger5_above_bed_key,
+                node=Node.ALL,
+                marker=marker,
+                min_bound=0,
+                max_bound=10000,
+                phase=phase,
+            )
+
+    # To keep the small finger on the right of the principal finger.
+    for phase in range(N_PHASES):
+        constraints.add(
+            custom_func_track_finger_5_on_the_right_of_principal_finger,
+            node=Node.ALL,
+            min_bound=0.00001,
+            max_bound=10000,
+            phase=phase,
+        )
+
+    phase_transition = PhaseTransitionList()
+    phase_transition.add(PhaseTransitionFcn.IMPACT, phase_pre_idx=1)
+
+    # EXPLANATION
+    # ex: x_bounds[0][3, 0] = vel_pushing
+    # [ phase 0 ]
+    # [indice du ddl (0 et 1 position y z, 2 et 3 vitesse y z),
+    # time (0 =» 1st point, 1 =» all middle points, 2 =» last point)]
+
+    # Path constraint
+    x_bounds = BoundsList()
+    for phase in range(N_PHASES):
+        x_bounds.add(bounds=QAndQDotBounds(biorbd_model[phase]))
+
+    x_bounds[0][[0, 1, 2], 0] = 0
+    x_bounds[3][[0, 1, 2], 2] = 0
+
+    # Initial guess
+    x_init, u_init = piano_initial_guess(biorbd_model, n_shooting, warm_start)
+
+    # Define control path constraint
+    u_bounds = BoundsList()
+    for phase in range(N_PHASES):
+        u_bounds.add([TAU_MIN] * n_tau, [TAU_MAX] * n_tau)
+
+    ocp = OptimalControlProgram(
+        biorbd_model,
+        dynamics,
+        n_shooting,
+        phase_time,
+        x_init,
+        u_init,
+        x_bounds,
+        u_bounds,
+        objective_functions=objective_functions,
+        constraints=constraints,
+        phase_transitions=phase_transition,
+        ode_solver=ode_solver,
+    )
+    # Kept for update_piano_ocp, as the key of the weight of each objective.
+    ocp.piano_tau_objectives = tau_objectives
+    return ocp
+
+
+def update_piano_ocp(
+    ocp: OptimalControlProgram,
+    attack: str = "pressed",
+    weights: dict = None,
+    objectives_weight_coefficient: float = 1,
+    warm_start: dict = None,
+) -> OptimalControlProgram:
+    """
+    Change the weights of the objectives and the initial guess of an ocp built by prepare_piano_ocp, without building
+    it again : the models, the dynamics and the casadi functions of the penalties are kept, the weight is an input of
+    the function of each penalty, so only the NLP is assembled again by the next solve
+
+    Parameters
+    ----------
+    ocp: OptimalControlProgram
+        The ocp built by prepare_piano_ocp for this attack
+    attack: str
+        "pressed" or "strucked"
+    weights: dict
+        The weights replacing the ones of DEFAULT_WEIGHTS and of the attack, ex: dict(distal_tau=10000)
+    objectives_weight_coefficient: float
+        The coefficient multiplying the weights of the objectives other than the torques
+    warm_start: dict
+        The data of an already solved ocp, whose states and controls are the initial guess (resampled if its shooting
+        is not the same), None for the initial guess of prepare_piano_ocp
+
+    Returns
+    -------
+    The updated ocp
+    """
+
+    weights = piano_weights(attack, weights)
+    tau_objectives = getattr(ocp, "piano_tau_objectives", "grouped")
+    check_tau_objectives(weights, tau_objectives)
+    penalties = [penalty for nlp in ocp.nlp for penalty in nlp.J] + list(ocp.J)
+    # The distal torques of an ocp built with tau_objectives="all" are in the objective of the proximal weight.
+    updated_keys = {"distal_tau"} if tau_objectives == "all" else set()
+    for penalty in penalties:
+        if penalty is None or not hasattr(penalty, "piano_weight"):
+            continue
+        weight_key, weight_phase = penalty.piano_weight
+        penalty.weight = objective_weight(weights, objectives_weight_coefficient, weight_key, weight_phase)
+        updated_keys.add(weight_key)
+    if not updated_keys:
+        raise RuntimeError("The ocp has no objective of prepare_piano_ocp, its weights cannot be updated.")
+    # An objective whose weight was 0 was not added, it can only be added by building the ocp again.
+    missing_keys = [key for key in DEFAULT_WEIGHTS if key not in updated_keys and np.any(weights[key])]
+    if missing_keys:
+        raise ValueError("The objectives " + ", ".join(missing_keys) + " are not in the ocp, build it again.")
+
+    x_init, u_init = piano_initial_guess([nlp.model for nlp in ocp.nlp], [nlp.ns for nlp in ocp.nlp], warm_start)
+    ocp.update_initial_guess(x_init, u_init)
+    return ocp
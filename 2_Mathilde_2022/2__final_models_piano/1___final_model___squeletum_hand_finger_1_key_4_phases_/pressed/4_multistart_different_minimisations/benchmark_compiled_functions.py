@@ -0,0 +1,111 @@
+"""
+Benchmark of the compiled kinematics functions (see compiled_functions) on the 4 phases pressed problem.
+1. The kinematics functions of the custom penalties and their Jacobians, evaluated on all the nodes of the 4 phases,
+    as IPOPT does at each iteration, with the CasADi virtual machine and with the compiled .so files.
+2. The same ocp solved with and without the compiled functions for a fixed number of iterations, to compare the time
+    per iteration of the whole solve.
+"""
+import os
+import sys
+import time
+import numpy as np
+from casadi import MX, Function, jacobian
+from bioptim import Solver
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from model_cache import cached_model, markers_function, global_jcs_function, use_compiled_functions
+from piano_ocp import prepare_piano_ocp, BIORBD_MODEL_PATH, ATTACKS
+
+# The nodes of the 4 phases of the pressed problem.
+N_SHOOTING = ATTACKS["pressed"]["n_shooting"]
+SEGMENTS = ("2proxph_2mcp_flexion", "secondmc")
+
+
+def kinematics_evaluation_time(n_evaluations: int = 100) -> float:
+    """
+    The time of one evaluation of the kinematics functions and of their Jacobians on all the nodes
+
+    Parameters
+    ----------
+    n_evaluations: int
+        The number of evaluations the time is averaged on
+
+    Returns
+    -------
+    The mean time of one evaluation (s)
+    """
+    model = cached_model(BIORBD_MODEL_PATH)
+    q = MX.sym("q", model.nbQ(), 1)
+    functions = [markers_function(model)] + [global_jcs_function(model, segment) for segment in SEGMENTS]
+    # The value and the Jacobian of each function, as the penalties and their constraint Jacobian need them.
+    evaluations = [
+        Function(function.name() + "_and_jacobian", [q], [function(q), jacobian(function(q), q)]).map(
+            sum(N_SHOOTING) + len(N_SHOOTING)
+        )
+        for function in functions
+    ]
+    all_q = np.random.default_rng(0).uniform(-1, 1, (model.nbQ(), sum(N_SHOOTING) + len(N_SHOOTING)))
+
+    tic = time.perf_counter()
+    for _ in range(n_evaluations):
+        for evaluation in evaluations:
+            evaluation(all_q)
+    return (time.perf_counter() - tic) / n_evaluations
+
+
+def time_per_iteration(compiled_functions: bool, n_iterations: int = 50) -> tuple:
+    """
+    The time per iteration of the pressed ocp
+
+    Parameters
+    ----------
+    compiled_functions: bool
+        If the kinematics functions are compiled
+    n_iterations: int
+        The number of iterations of the solve
+
+    Returns
+    -------
+    The time to build the ocp (s) and the mean time of one iteration (s)
+    """
+    tic = time.perf_counter()
+    ocp = prepare_piano_ocp("pressed", weights=dict(distal_tau=1000), compiled_functions=compiled_functions)
+    build_time = time.perf_counter() - tic
+
+    solv = Solver.IPOPT(show_online_optim=False)
+    solv.set_maximum_iterations(n_iterations)
+    solv.set_linear_solver("mumps")
+    solv.set_print_level(0)
+    sol = ocp.solve(solv)
+    return build_time, sol.real_time_to_optimize / max(sol.iterations, 1)
+
+
+def main(n_evaluations: int = 100, n_iterations: int = 50):
+    # The .so files are compiled by the first call, so it is done before the timing.
+    use_compiled_functions(True)
+    kinematics_evaluation_time(1)
+
+    for compiled in (False, True):
+        use_compiled_functions(compiled)
+        print(
+            ("Compiled" if compiled else "CasADi VM")
+            + " kinematics functions and Jacobians, all nodes : "
+            + str(kinematics_evaluation_time(n_evaluations) * 1000)
+            + " ms"
+        )
+
+    results = {compiled: time_per_iteration(compiled, n_iterations) for compiled in (False, True)}
+    for compiled, (build_time, iteration_time) in results.items():
+        print(
+            ("Compiled" if compiled else "CasADi VM")
+            + " : ocp built in "
+            + str(build_time)
+            + " s, "
+            + str(iteration_time * 1000)
+            + " ms per iteration"
+        )
+    print("Speedup per iteration : ", results[False][1] / results[True][1])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Ledger of the multistart jobs, saved next to 1_results_multistart.
+It records the status of each (tau_minimisation_weight, objectives_weight_coefficient) job, so an interrupted
+multistart only solves again the jobs which are not done.
+"""
+import json
+import os
+import pickle
+from collections.abc import Mapping
+
+from solution_store import open_solution
+
+# solution_store adds the folder of the shared helpers to the path.
+from atomic_files import write_file
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+def job_name(tau_minimisation_weight, objectives_weight_coefficient) -> str:
+    # Same name as the "simulation" column of tab_tau_each_dof.
+    return "minim_" + str(tau_minimisation_weight) + "_obj_" + str(objectives_weight_coefficient)
+
+
+def load_valid_solution(path: str):
+    """
+    Load a solution of the multistart, if it exists, is complete and converged
+
+    Parameters
+    ----------
+    path: str
+        The path to the .sol solution, the .pckl file of the same name is converted if there is no .sol solution
+
+    Returns
+    -------
+    The data dict of the solution, or None if the solution is missing, truncated, incomplete or not converged
+    """
+    pickle_path = os.path.splitext(path)[0] + ".pckl"
+    if not os.path.isdir(path) and os.path.isfile(pickle_path):
+        # The solutions saved before the .sol format.
+        path = pickle_path
+    elif not os.path.isdir(path):
+        return None
+    try:
+        data = open_solution(path)
+    except (EOFError, pickle.UnpicklingError, AttributeError, ImportError, ValueError, OSError, KeyError):
+        return None
+
+    if not isinstance(data, Mapping) or not {"states", "controls", "iterations", "cost"} <= data.keys():
+        return None
+    if len(data["controls"]) != 4 or any("tau" not in controls for controls in data["controls"]):
+        return None
+    # A solve stopped by IPOPT before converging is solved again. The solutions saved before the status are converged.
+    if data.get("status", 0) != 0:
+        return None
+    return data
+
+
+class JobLedger:
+    """
+    The status (pending/running/done/failed), wall time, iterations and attempts of each job, saved in a .json file
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.jobs = {}
+        if os.path.isfile(path):
+            with open(path, "r") as file:
+                self.jobs = json.load(file)
+
+    def save(self):
+        def write(tmp_path: str):
+            with open(tmp_path, "w") as file:
+                json.dump(self.jobs, file, indent=2)
+
+        # Written in a temporary file then renamed, so a crash never leaves a half written ledger.
+        write_file(self.path, write)
+
+    def job(self, tau_minimisation_weight, objectives_weight_coefficient) -> dict:
+        name = job_name(tau_minimisation_weight, objectives_weight_coefficient)
+        if name not in self.jobs:
+            self.jobs[name] = dict(
+                tau_minimisation_weight=tau_minimisation_weight,
+                objectives_weight_coefficient=objectives_weight_coefficient,
+                status=PENDING,
+                attempts=0,
+                wall_time=None,
+                iterations=None,
+                error=None,
+            )
+        return self.jobs[name]
+
+    def status(self, tau_minimisation_weight, objectives_weight_coefficient) -> str:
+        return self.job(tau_minimisation_weight, objectives_weight_coefficient)["status"]
+
+    def set_pending(self, tau_minimisation_weight, objectives_weight_coefficient):
+        self.job(tau_minimisation_weight, objectives_weight_coefficient)["status"] = PENDING
+        self.save()
+
+    def set_running(self, tau_minimisation_weight, objectives_weight_coefficient):
+        job = self.job(tau_minimisation_weight, objectives_weight_coefficient)
+        job["status"] = RUNNING
+        job["attempts"] += 1
+        self.save()
+
+    def set_done(self, tau_minimisation_weight, objectives_weight_coefficient, wall_time=None, iterations=None):
+        job = self.job(tau_minimisation_weight, objectives_weight_coefficient)
+        job["status"] = DONE
+        job["error"] = None
+        if wall_time is not None:
+            job["wall_time"] = wall_time
+        if iterations is not None:
+            job["iterations"] = iterations
+        self.save()
+
+    def set_failed(self, tau_minimisation_weight, objectives_weight_coefficient, error: str):
+        job = self.job(tau_minimisation_weight, objectives_weight_coefficient)
+        job["status"] = FAILED
+        job["error"] = error
+        self.save()
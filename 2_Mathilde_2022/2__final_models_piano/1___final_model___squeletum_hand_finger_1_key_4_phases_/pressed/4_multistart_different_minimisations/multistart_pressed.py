@@ -2,723 +2,639 @@
  !! Les axes du modèle ne sont pas les mêmes que ceux généralement utilisés en biomécanique : x axe de flexion, y supination/pronation, z vertical
  ici on a : Y -» X , Z-» Y et X -» Z
  """
-from casadi import MX, acos, vertcat, dot, pi
 import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
 import numpy as np
-from dataclasses import make_dataclass
 import pandas as pd
-import biorbd_casadi as biorbd
 import os
-import pickle
-from bioptim import (
-    PenaltyNode,
-    ObjectiveList,
-    PhaseTransitionFcn,
-    DynamicsList,
-    ConstraintFcn,
-    BoundsList,
-    InitialGuessList,
-    CostType,
-    PhaseTransitionList,
-    Node,
-    OptimalControlProgram,
-    DynamicsFcn,
-    ObjectiveFcn,
-    ConstraintList,
-    PenaltyNodeList,
-    QAndQDotBounds,
-    OdeSolver,
-    BiorbdInterface,
-    Solver,
-)
+import sys
+import re
+from types import SimpleNamespace
+from bioptim import Solver
+from bioptim.interfaces.ipopt_interface import IpoptInterface
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from multistart_ledger import JobLedger, job_name, load_valid_solution, DONE, FAILED
+from solution_store import save_solution
+from results_table import DOF_NAMES, append_row, read_results_table, compact_results_table
+from pareto_front import torque_sums
+from tau_impulse import tau_impulse, PRESSED_PHASE_TIME
+from piano_ocp import prepare_piano_ocp, update_piano_ocp
 
-def minimize_difference(all_pn: PenaltyNode):
-    return all_pn[0].nlp.controls.cx_end - all_pn[1].nlp.controls.cx
 
+"""
 
-def custom_func_track_finger_5_on_the_right_of_principal_finger(all_pn: PenaltyNodeList) -> MX:
-    finger_marker_idx = biorbd.marker_index(all_pn.nlp.model, "finger_marker")
-    markers = BiorbdInterface.mx_to_cx("markers", all_pn.nlp.model.markers, all_pn.nlp.states["q"])
-    finger_marker = markers[:, finger_marker_idx]
+MULTI-START : Solve a multiphase ocp, and save the solution results for different weight of minimisations.  
+Each (tau_minimisation_weight, objectives_weight_coefficient) pair is solved by its own worker process, 
+and writes its own row of the tab_tau_each_dof table. Only the main process writes the ledger of the jobs.
+If the multistart is interrupted, running it again only solves the jobs which are not done.
+With continuation=True, each job is warm started from the nearest solved weight of its family.
+With adaptive=True, the ends of each family are solved first, then the weights where the front has its largest gaps.
+Each worker builds its ocp once, the next jobs of the worker only change its weights and its initial guess.
 
-    finger_marker_5_idx = biorbd.marker_index(all_pn.nlp.model, "finger_marker_5")
-    markers_5 = BiorbdInterface.mx_to_cx("markers_5", all_pn.nlp.model.markers, all_pn.nlp.states["q"])
-    finger_marker_5 = markers_5[:, finger_marker_5_idx]
+"""
 
-    markers_diff_key2 = finger_marker[1] - finger_marker_5[1]
+MULTISTART_FOLDER = os.path.dirname(os.path.abspath(__file__))
+RESULTS_FOLDER = os.path.join(MULTISTART_FOLDER, "1_results_multistart")
+TAB_TAU_FOLDER = os.path.join(
+    MULTISTART_FOLDER,
+    "2_results_analysis",
+    "pareto_front_curve_of_one_proximal_limb_torques_d._on_distal_limbs_torques",
+)
+# The table of the first multistart, pickled before the table of row files, its rows are added to the table.
+LEGACY_TABLE_PATH = os.path.join(TAB_TAU_FOLDER, "tab_tau_each_dof.pckl")
+# The name of a simulation of the table : minim_<tau_minimisation_weight>_obj_<objectives_weight_coefficient>.
+SIMULATION_NAME = re.compile(r"minim_([0-9.]+)_obj_([0-9.]+)$")
+LEDGER_PATH = os.path.join(MULTISTART_FOLDER, "multistart_ledger.json")
+# Environment variables read by the BLAS/OpenMP libraries linked to IPOPT and its linear solver.
+THREADS_ENVIRONMENT_VARIABLES = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS")
+# The ocp built by a worker process, by compiled_functions, reused by the next jobs of the worker.
+WORKER_OCPS = {}
+
+
+def sweep_jobs() -> list:
+    """
+    The (tau_minimisation_weight, objectives_weight_coefficient) pairs of the multistart
+    """
+    return [
+        (tau_minimisation_weight, objectives_weight_coefficient)
+        for tau_minimisation_weight in range(1000, 20000, 3000)  # Tests
+        for objectives_weight_coefficient in [tau_minimisation_weight / 1000, tau_minimisation_weight / 100]
+    ]
 
-    return markers_diff_key2
 
+def weight_folder(tau_minimisation_weight) -> str:
+    return os.path.join(
+        RESULTS_FOLDER, "Solutions__minimisation_weight_for_distal_articulations_at_" + str(tau_minimisation_weight)
+    )
 
-def custom_func_track_principal_finger_and_finger5_above_bed_key(all_pn: PenaltyNodeList, marker: str) -> MX:
-    finger_marker_idx = biorbd.marker_index(all_pn.nlp.model, marker)
-    markers = BiorbdInterface.mx_to_cx("markers", all_pn.nlp.model.markers, all_pn.nlp.states["q"])
-    finger_marker = markers[:, finger_marker_idx]
 
-    markers_diff_key3 = finger_marker[2] - (0.07808863830566405 - 0.02)
+def solution_path(tau_minimisation_weight, objectives_weight_coefficient) -> str:
+    return os.path.join(
+        weight_folder(tau_minimisation_weight),
+        "other_objectives_multiply_by_" + str(objectives_weight_coefficient) + ".sol",
+    )
 
-    return markers_diff_key3
 
+def tab_tau_row(controls: list, phase_time, tau_minimisation_weight, objectives_weight_coefficient) -> pd.DataFrame:
+    """
+    To file a tab for each proximal articulations, in order to plot a pareto front curve of y(x)
+        after the multi start in an external code.
+    1st column (x) : Sum of distal articulations torques (absolute values).
+    2nd column (y) : Sum of the torque of the chosen proximal articulation (absolute values).
 
-def custom_func_track_roty_principal_finger(
-    all_pn: PenaltyNodeList,
-) -> MX:
+    Parameters
+    ----------
+    controls: list
+        The sol.controls of the solution, one dict per phase
+    phase_time:
+        The real duration of each phase
+    tau_minimisation_weight:
+        The weight of the distal articulations torque minimisation
+    objectives_weight_coefficient:
+        The coefficient multiplying the other objectives
 
-    model = all_pn.nlp.model
-    rotation_matrix_index = biorbd.segment_index(model, "2proxph_2mcp_flexion")
-    q = all_pn.nlp.states["q"].mx
+    Returns
+    -------
+    The one row tab of the simulation
+    """
 
-    rotation_matrix = all_pn.nlp.model.globalJCS(q, rotation_matrix_index).to_mx()
+    # Σ(| tau * dt |) of each dof, summed over the phases.
+    impulse = tau_impulse(controls, phase_time).sum(axis=1)
 
-    output = vertcat(
-        rotation_matrix[1, 0],
-        rotation_matrix[1, 2],
-        rotation_matrix[0, 1],
-        rotation_matrix[2, 1],
-        rotation_matrix[1, 1] - MX(1),
+    return pd.DataFrame(
+        dict(
+            simulation=[job_name(tau_minimisation_weight, objectives_weight_coefficient)],
+            **{dof: [impulse[i]] for i, dof in enumerate(DOF_NAMES)},
+            tau_minimisation_weight=[tau_minimisation_weight],
+            objectives_weight_coefficient=[objectives_weight_coefficient],
+        )
     )
-    rotation_matrix_output = BiorbdInterface.mx_to_cx("rot_mat", output, all_pn.nlp.states["q"])
 
-    return rotation_matrix_output
 
+def name_weight(value: str):
+    # "100" -> 100 and "1.5" -> 1.5, as the weights written in the names of the simulations.
+    weight = float(value)
+    return int(weight) if weight.is_integer() else weight
 
-def custom_func_track_principal_finger_pi_in_two_global_axis(all_pn: PenaltyNodeList, segment: str) -> MX:
-    model = all_pn.nlp.model
-    rotation_matrix_index = biorbd.segment_index(model, segment)
-    q = all_pn.nlp.states["q"].mx
-    # global JCS gives the local matrix according to the global matrix
-    principal_finger_axis = all_pn.nlp.model.globalJCS(q, rotation_matrix_index).to_mx()  # x finger = y global
-    y = MX.zeros(4)
-    y[:4] = np.array([0, 1, 0, 1])
-    # @ x : pour avoir l'orientation du vecteur x du jcs local exprimé dans le global
-    # @ produit matriciel
-    principal_finger_y = principal_finger_axis @ y
-    principal_finger_y = principal_finger_y[:3, :]
 
-    global_y = MX.zeros(3)
-    global_y[:3] = np.array([0, 1, 0])
+def migrate_legacy_table() -> int:
+    """
+    Add to the table the rows of the old tab_tau_each_dof.pckl which are not in it (the simulations of the first
+    multistart), with their weights read from their name. The old table is kept.
 
-    teta = acos(dot(principal_finger_y, global_y[:3]))
-    output_casadi = BiorbdInterface.mx_to_cx("scal_prod", teta, all_pn.nlp.states["q"])
+    Returns
+    -------
+    The number of rows added
+    """
+    simulations_in_table = set(read_results_table(TAB_TAU_FOLDER)["simulation"])
+    n_rows = 0
+    for row in pd.read_pickle(LEGACY_TABLE_PATH).to_dict("records"):
+        match = SIMULATION_NAME.match(row["simulation"])
+        if match is None or row["simulation"] in simulations_in_table:
+            continue
+        append_row(
+            TAB_TAU_FOLDER,
+            pd.DataFrame(
+                dict(
+                    simulation=[row["simulation"]],
+                    **{dof: [row[dof]] for dof in DOF_NAMES},
+                    tau_minimisation_weight=[name_weight(match.group(1))],
+                    objectives_weight_coefficient=[name_weight(match.group(2))],
+                )
+            ),
+        )
+        n_rows += 1
+    return n_rows
 
-    return output_casadi
 
+def init_worker(cores_queue):
+    """
+    Pin a worker process : bind the process to its own cores (its threads are limited by worker_pool)
 
-def prepare_ocp(
-    tau_minimisation_weight,
-    objectives_weight_coefficient,
-    biorbd_model_path: str = "/home/lim/Documents/Stage Mathilde/PianOptim/Mathilde_2022/2__final_models_piano/5___final___final___squeletum_hand_finger_1_key_4_phases_!/bioMod/Squeletum_hand_finger_3D_2_keys_octave_LA.bioMod",
-    ode_solver: OdeSolver = OdeSolver.COLLOCATION(polynomial_degree=4),
-) -> OptimalControlProgram:
+    Parameters
+    ----------
+    cores_queue:
+        The queue of the cores blocks, one block is taken by each worker (empty block = no affinity)
+    """
+    cores = cores_queue.get()
+    if cores:
+        os.sched_setaffinity(0, cores)
 
+
+def worker_pool(n_workers: int, n_threads_per_job: int, available_cores: list) -> ProcessPoolExecutor:
     """
-    Prepare the ocp
+    A pool of worker processes, each one limited to n_threads_per_job threads and pinned to its own block of cores
+    (see init_worker)
 
     Parameters
     ----------
-    biorbd_model_path: str
-        The path to the bioMod
-    ode_solver: OdeSolver
-        The ode solve to use
+    n_workers: int
+        The number of worker processes
+    n_threads_per_job: int
+        The number of threads (and pinned cores) given to the linear solver of each job
+    available_cores: list
+        The cores the workers are pinned to
 
     Returns
     -------
-    The OptimalControlProgram ready to be solved
+    The pool of workers
     """
-
-    biorbd_model = (
-        biorbd.Model(biorbd_model_path),
-        biorbd.Model(biorbd_model_path),
-        biorbd.Model(biorbd_model_path),
-        biorbd.Model(biorbd_model_path),
-    )
-
-    # Average of N frames by phase ; Average of phases T ; both measured with the motion capture datas.
-    n_shooting = (30, 7, 7, 35)
-    phase_time = (0.3, 0.044, 0.051, 0.35)
-    tau_min, tau_max, tau_init = -200, 200, 0
-    # Velocity profile found thanks to the motion capture datas.
-    vel_push_array2 = [
-        [
-            0,
-            -0.113772161006927,
-            -0.180575996580578,
-            -0.270097219830468,
-            -0.347421549388341,
-            -0.290588704744975,
-            -0.0996376128423782,
-            0,
-        ]
-    ]
-
-    pi_sur_2_phase_0 = np.full((1, n_shooting[0] + 1), pi / 2)
-    pi_sur_2_phase_1 = np.full((1, n_shooting[1] + 1), pi / 2)
-    pi_sur_2_phase_2 = np.full((1, n_shooting[2] + 1), pi / 2)
-    pi_sur_2_phase_3 = np.full((1, n_shooting[3] + 1), pi / 2)
-
-    # Objectives
-    # Minimize Torques generated into articulations
-    objective_functions = ObjectiveList()
-    objective_functions.add(
-        ObjectiveFcn.Lagrange.MINIMIZE_CONTROL, key="tau", phase=0, weight=100, index=[0, 1, 2, 3, 4, 5]
-    )
-    objective_functions.add(
-        ObjectiveFcn.Lagrange.MINIMIZE_CONTROL, key="tau", phase=1, weight=100, index=[0, 1, 2, 3, 4, 5]
-    )
-    objective_functions.add(
-        ObjectiveFcn.Lagrange.MINIMIZE_CONTROL, key="tau", phase=2, weight=100, index=[0, 1, 2, 3, 4, 5]
-    )
-    objective_functions.add(
-        ObjectiveFcn.Lagrange.MINIMIZE_CONTROL, key="tau", phase=3, weight=100, index=[0, 1, 2, 3, 4, 5]
-    )
-
-    objective_functions.add(
-        ObjectiveFcn.Lagrange.MINIMIZE_CONTROL, key="tau", phase=0, weight=tau_minimisation_weight, index=[6, 7, 8, 9]
-    )
-    objective_functions.add(
-        ObjectiveFcn.Lagrange.MINIMIZE_CONTROL, key="tau", phase=1, weight=tau_minimisation_weight, index=[6, 7, 8, 9]
-    )
-    objective_functions.add(
-        ObjectiveFcn.Lagrange.MINIMIZE_CONTROL, key="tau", phase=2, weight=tau_minimisation_weight, index=[6, 7, 8, 9]
-    )
-    objective_functions.add(
-        ObjectiveFcn.Lagrange.MINIMIZE_CONTROL, key="tau", phase=3, weight=tau_minimisation_weight, index=[6, 7, 8, 9]
-    )
-
-    objective_functions.add(
-        ObjectiveFcn.Lagrange.MINIMIZE_STATE,
-        key="qdot",
-        phase=0,
-        weight=0.0001 * objectives_weight_coefficient,
-        index=[0, 1, 2, 3, 4, 5, 6, 7],
-    )
-    objective_functions.add(
-        ObjectiveFcn.Lagrange.MINIMIZE_STATE,
-        key="qdot",
-        phase=1,
-        weight=0.0001 * objectives_weight_coefficient,
-        index=[0, 1, 2, 3, 4, 5, 6, 7, 8, 9],
-    )
-    objective_functions.add(
-        ObjectiveFcn.Lagrange.MINIMIZE_STATE,
-        key="qdot",
-        phase=2,
-        weight=0.0001 * objectives_weight_coefficient,
-        index=[0, 1, 2, 3, 4, 5, 6, 7, 8, 9],
-    )
-    objective_functions.add(
-        ObjectiveFcn.Lagrange.MINIMIZE_STATE,
-        key="qdot",
-        phase=3,
-        weight=0.0001 * objectives_weight_coefficient,
-        index=[0, 1, 2, 3, 4, 5, 6, 7],
-    )
-
-    # To block ulna rotation before the key pressing.
-    objective_functions.add(
-        ObjectiveFcn.Lagrange.MINIMIZE_STATE,
-        key="qdot",
-        phase=0,
-        weight=100000 * objectives_weight_coefficient,
-        index=[7],
-    )
-
-    objective_functions.add(
-        ObjectiveFcn.Mayer.TRACK_MARKERS_VELOCITY,
-        target=vel_push_array2,
-        node=Node.ALL,
-        phase=1,
-        marker_index=4,
-        weight=10000 * objectives_weight_coefficient,
-    )
-
-    # To keep the hand/index perpendicular of the key piano all long the attack.
-    objective_functions.add(
-        custom_func_track_principal_finger_pi_in_two_global_axis,
-        custom_type=ObjectiveFcn.Lagrange,
-        node=Node.ALL,
-        phase=0,
-        weight=1000 * objectives_weight_coefficient,
-        quadratic=True,
-        target=pi_sur_2_phase_0,
-        segment="2proxph_2mcp_flexion",
-    )
-    objective_functions.add(
-        custom_func_track_principal_finger_pi_in_two_global_axis,
-        custom_type=ObjectiveFcn.Lagrange,
-        node=Node.ALL,
-        phase=1,
-        weight=100000 * objectives_weight_coefficient,
-        quadratic=True,
-        target=pi_sur_2_phase_1,
-        segment="2proxph_2mcp_flexion",
-    )
-    objective_functions.add(
-        custom_func_track_principal_finger_pi_in_two_global_axis,
-        custom_type=ObjectiveFcn.Lagrange,
-        node=Node.ALL,
-        phase=2,
-        weight=100000 * objectives_weight_coefficient,
-        quadratic=True,
-        target=pi_sur_2_phase_2,
-        segment="2proxph_2mcp_flexion",
-    )
-    objective_functions.add(
-        custom_func_track_principal_finger_pi_in_two_global_axis,
-        custom_type=ObjectiveFcn.Lagrange,
-        node=Node.ALL,
-        phase=3,
-        weight=1000 * objectives_weight_coefficient,
-        quadratic=True,
-        target=pi_sur_2_phase_3,
-        segment="2proxph_2mcp_flexion",
-    )
-
-    objective_functions.add(
-        custom_func_track_principal_finger_pi_in_two_global_axis,
-        custom_type=ObjectiveFcn.Lagrange,
-        node=Node.ALL,
-        phase=0,
-        weight=1000 * objectives_weight_coefficient,
-        quadratic=True,
-        target=pi_sur_2_phase_0,
-        segment="secondmc",
-    )
-    objective_functions.add(
-        custom_func_track_principal_finger_pi_in_two_global_axis,
-        custom_type=ObjectiveFcn.Lagrange,
-        node=Node.ALL,
-        phase=1,
-        weight=100000 * objectives_weight_coefficient,
-        quadratic=True,
-        target=pi_sur_2_phase_1,
-        segment="secondmc",
-    )
-    objective_functions.add(
-        custom_func_track_principal_finger_pi_in_two_global_axis,
-        custom_type=ObjectiveFcn.Lagrange,
-        node=Node.ALL,
-        phase=2,
-        weight=100000 * objectives_weight_coefficient,
-        quadratic=True,
-        target=pi_sur_2_phase_2,
-        segment="secondmc",
-    )
-    objective_functions.add(
-        custom_func_track_principal_finger_pi_in_two_global_axis,
-        custom_type=ObjectiveFcn.Lagrange,
-        node=Node.ALL,
-        phase=3,
-        weight=1000 * objectives_weight_coefficient,
-        quadratic=True,
-        target=pi_sur_2_phase_3,
-        segment="secondmc",
+    # A spawned worker imports this module (numpy, casadi, bioptim...) before its initializer runs, and the BLAS/OpenMP
+    # libraries read their number of threads at this import : it is set in the environment the workers inherit.
+    for variable in THREADS_ENVIRONMENT_VARIABLES:
+        os.environ[variable] = str(n_threads_per_job)
+    # One block of cores per worker, if there are enough cores to pin every worker.
+    context = multiprocessing.get_context("spawn")
+    cores_queue = context.Queue()
+    for i in range(n_workers):
+        if n_workers * n_threads_per_job <= len(available_cores):
+            cores_queue.put(available_cores[i * n_threads_per_job : (i + 1) * n_threads_per_job])
+        else:
+            cores_queue.put([])
+    return ProcessPoolExecutor(
+        max_workers=n_workers,
+        mp_context=context,
+        initializer=init_worker,
+        initargs=(cores_queue,),
     )
 
-    # To avoid the apparition of "noise" caused by the objective function just before.
-    objective_functions.add(
-        ObjectiveFcn.Lagrange.MINIMIZE_STATE,
-        key="qdot",
-        phase=0,
-        weight=100 * objectives_weight_coefficient,
-        index=[8, 9],
-        derivative=True,
-    )
-    objective_functions.add(
-        ObjectiveFcn.Lagrange.MINIMIZE_STATE,
-        key="qdot",
-        phase=3,
-        weight=100 * objectives_weight_coefficient,
-        index=[8, 9],
-        derivative=True,
-    )
 
-    # To minimize the difference between 0 and 1
-    objective_functions.add(
-        minimize_difference,
-        custom_type=ObjectiveFcn.Mayer,
-        node=Node.TRANSITION,
-        weight=1000 * objectives_weight_coefficient,
-        phase=1,
-        quadratic=True,
-    )
-    # To minimize the difference between 1 and 2
-    objective_functions.add(
-        minimize_difference,
-        custom_type=ObjectiveFcn.Mayer,
-        node=Node.TRANSITION,
-        weight=1000 * objectives_weight_coefficient,
-        phase=2,
-        quadratic=True,
-    )
-    # To minimize the difference between 2 and 3
-    objective_functions.add(
-        minimize_difference,
-        custom_type=ObjectiveFcn.Mayer,
-        node=Node.TRANSITION,
-        weight=1000 * objectives_weight_coefficient,
-        phase=3,
-        quadratic=True,
-    )
-
-    # Dynamics
-    dynamics = DynamicsList()
-    dynamics.add(DynamicsFcn.TORQUE_DRIVEN, phase=0)
-    dynamics.add(DynamicsFcn.TORQUE_DRIVEN, phase=1)
-    dynamics.add(DynamicsFcn.TORQUE_DRIVEN, with_contact=True, phase=2)
-    dynamics.add(DynamicsFcn.TORQUE_DRIVEN, phase=3)
-
-    # Constraints
-    constraints = ConstraintList()
-
-    constraints.add(
-        ConstraintFcn.SUPERIMPOSE_MARKERS,
-        node=Node.ALL,
-        first_marker="finger_marker",
-        second_marker="high_square",
-        phase=0,
-    )
-    constraints.add(
-        ConstraintFcn.SUPERIMPOSE_MARKERS,
-        node=Node.END,
-        first_marker="finger_marker",
-        second_marker="low_square",
-        phase=1,
-    )
-    constraints.add(
-        ConstraintFcn.TRACK_CONTACT_FORCES, node=Node.ALL, contact_index=0, min_bound=-5, max_bound=5, phase=2
-    )
-    constraints.add(
-        ConstraintFcn.TRACK_CONTACT_FORCES, node=Node.ALL, contact_index=1, min_bound=-5, max_bound=5, phase=2
-    )
-    constraints.add(
-        ConstraintFcn.TRACK_CONTACT_FORCES, node=Node.ALL, contact_index=2, min_bound=0, max_bound=30, phase=2
-    )
-    constraints.add(
-        ConstraintFcn.SUPERIMPOSE_MARKERS,
-        node=Node.END,
-        first_marker="finger_marker",
-        second_marker="high_square",
-        phase=3,
-    )
+def solve_job(
+    tau_minimisation_weight,
+    objectives_weight_coefficient,
+    warm_start_path: str = None,
+    compiled_functions: bool = False,
+    reuse_ocp: bool = True,
+) -> tuple:
+    """
+    Solve the ocp of one (weight, coefficient) pair in a worker process, and save its own .sol solution
 
-    # To keep the index and the small finger above the bed key.
-    constraints.add(
-        custom_func_track_principal_finger_and_finger5_above_bed_key,
-        node=Node.ALL,
-        marker="finger_marker",
-        min_bound=0,
-        max_bound=10000,
-        phase=0,
-    )
-    constraints.add(
-        custom_func_track_principal_finger_and_finger5_above_bed_key,
-        node=Node.ALL,
-        marker="finger_marker",
-        min_bound=0,
-        max_bound=10000,
-        phase=1,
-    )
-    constraints.add(
-        custom_func_track_principal_finger_and_finger5_above_bed_key,
-        node=Node.ALL,
-        marker="finger_marker",
-        min_bound=0,
-        max_bound=10000,
-        phase=2,
-    )
-    constraints.add(
-        custom_func_track_principal_finger_and_finger5_above_bed_key,
-        node=Node.ALL,
-        marker="finger_marker",
-        min_bound=0,
-        max_bound=10000,
-        phase=3,
-    )
+    Parameters
+    ----------
+    tau_minimisation_weight:
+        The weight of the distal articulations torque minimisation
+    objectives_weight_coefficient:
+        The coefficient multiplying the other objectives
+    warm_start_path: str
+        The solution of an already solved job, whose states, controls and multipliers start the solve
+    compiled_functions: bool
+        If the kinematics functions are compiled, see prepare_piano_ocp
+    reuse_ocp: bool
+        If the ocp already built by the worker is solved with the weights of the job, instead of building a new one
 
-    constraints.add(
-        custom_func_track_principal_finger_and_finger5_above_bed_key,
-        node=Node.ALL,
-        marker="finger_marker_5",
-        min_bound=0,
-        max_bound=10000,
-        phase=0,
-    )
-    constraints.add(
-        custom_func_track_principal_finger_and_finger5_above_bed_key,
-        node=Node.ALL,
-        marker="finger_marker_5",
-        min_bound=0,
-        max_bound=10000,
-        phase=1,
-    )
-    constraints.add(
-        custom_func_track_principal_finger_and_finger5_above_bed_key,
-        node=Node.ALL,
-        marker="finger_marker_5",
-        min_bound=0,
-        max_bound=10000,
-        phase=2,
-    )
-    constraints.add(
-        custom_func_track_principal_finger_and_finger5_above_bed_key,
-        node=Node.ALL,
-        marker="finger_marker_5",
-        min_bound=0,
-        max_bound=10000,
-        phase=3,
-    )
+    Returns
+    -------
+    The number of iterations and the wall time of the job, a RuntimeError is raised if IPOPT did not converge
+    """
 
-    # To keep the small finger on the right of the principal finger.
-    constraints.add(
-        custom_func_track_finger_5_on_the_right_of_principal_finger,
-        node=Node.ALL,
-        min_bound=0.00001,
-        max_bound=10000,
-        phase=0,
-    )
-    constraints.add(
-        custom_func_track_finger_5_on_the_right_of_principal_finger,
-        node=Node.ALL,
-        min_bound=0.00001,
-        max_bound=10000,
-        phase=1,
-    )
-    constraints.add(
-        custom_func_track_finger_5_on_the_right_of_principal_finger,
-        node=Node.ALL,
-        min_bound=0.00001,
-        max_bound=10000,
-        phase=2,
-    )
-    constraints.add(
-        custom_func_track_finger_5_on_the_right_of_principal_finger,
-        node=Node.ALL,
-        min_bound=0.00001,
-        max_bound=10000,
-        phase=3,
-    )
+    print(
+        "\nMinimisation weight for ulna, radius, finger and hand at "
+        + str(tau_minimisation_weight)
+        + " & other articulations minimized at 100, with other objectives multiply by "
+        + str(objectives_weight_coefficient)
+        + "."
+    )
+    tic = time.time()
+    warm_start = load_valid_solution(warm_start_path) if warm_start_path is not None else None
+
+    weights = dict(distal_tau=tau_minimisation_weight)
+    if reuse_ocp and compiled_functions in WORKER_OCPS:
+        # The ocp of every job has the same structure, only the weights of its objectives and its initial guess change.
+        ocp = update_piano_ocp(
+            WORKER_OCPS[compiled_functions],
+            "pressed",
+            weights=weights,
+            objectives_weight_coefficient=objectives_weight_coefficient,
+            warm_start=warm_start,
+        )
+    else:
+        # Each worker builds its own biorbd models and OptimalControlProgram.
+        ocp = prepare_piano_ocp(
+            "pressed",
+            weights=weights,
+            objectives_weight_coefficient=objectives_weight_coefficient,
+            warm_start=warm_start,
+            compiled_functions=compiled_functions,
+        )
+        if reuse_ocp:
+            WORKER_OCPS[compiled_functions] = ocp
+
+    # # --- Solve the program --- # #
+
+    solv = Solver.IPOPT(show_online_optim=False)
+    solv.set_maximum_iterations(100000000)
+    solv.set_linear_solver("ma57")
+    # A new interface for each job, so the NLP is assembled with the weights of the job and nothing of the previous
+    # solve of the worker is kept.
+    ocp.ocp_solver = IpoptInterface(ocp)
+    if warm_start is not None and warm_start.get("lam_g") is not None:
+        # The ocp of every job has the same structure, only the weights change, so the multipliers can be reused.
+        ocp.ocp_solver.set_lagrange_multiplier(SimpleNamespace(lam_g=warm_start["lam_g"], lam_x=warm_start["lam_x"]))
+        solv.set_warm_start_options(1e-10)
+    sol = ocp.solve(solv)
+
+    # # --- Download datas on a .sol solution --- #
+
+    data = dict(
+        states=sol.states,
+        controls=sol.controls,
+        parameters=sol.parameters,
+        iterations=sol.iterations,
+        cost=np.array(sol.cost)[0][0],
+        detailed_cost=sol.detailed_cost,
+        real_time_to_optimize=sol.real_time_to_optimize,
+        param_scaling=[nlp.parameters.scaling for nlp in ocp.nlp],
+        lam_g=np.array(sol.lam_g),
+        lam_x=np.array(sol.lam_x),
+        phase_time=[nlp.tf for nlp in ocp.nlp],
+        status=sol.status,
+        return_status=ocp.ocp_solver.ocp_solver.stats()["return_status"],
+        attack="pressed",
+        weights=dict(
+            tau_minimisation_weight=tau_minimisation_weight,
+            objectives_weight_coefficient=objectives_weight_coefficient,
+        ),
+    )
+    # Each job has its own solution, so the workers never write the same files.
+    # It is written in a temporary folder then renamed, so a crash never leaves a truncated solution.
+    save_solution(solution_path(tau_minimisation_weight, objectives_weight_coefficient), data)
+    if sol.status != 0:
+        # IPOPT stopped without converging (maximum iterations, failed restoration, infeasible problem...) : the
+        # solution is kept to be looked at, but the job fails and has no row in the table.
+        raise RuntimeError("IPOPT did not converge : " + data["return_status"])
+
+    # # --- Results analysis --- # #
+
+    # - Pareto front curve of one proximal limb torques d. on distal limbs torques - #
+
+    # Each job appends its own row file to the table, the table is never read and rewritten by the workers.
+    append_row(
+        TAB_TAU_FOLDER,
+        tab_tau_row(sol.controls, data["phase_time"], tau_minimisation_weight, objectives_weight_coefficient),
+    )
+    return sol.iterations, time.time() - tic
+
+
+def weight_family(job: tuple) -> float:
+    # The jobs whose objectives_weight_coefficient / tau_minimisation_weight ratio is the same form a family.
+    return round(job[1] / job[0], 12)
+
+
+def continuation_seed(job: tuple, solved_jobs: set):
+    """
+    The nearest already solved job of the same objectives_weight_coefficient / tau_minimisation_weight family
 
-    phase_transition = PhaseTransitionList()
-    phase_transition.add(PhaseTransitionFcn.IMPACT, phase_pre_idx=1)
-
-    # EXPLANATION
-    # ex: x_bounds[0][3, 0] = vel_pushing
-    # [ phase 0 ]
-    # [indice du ddl (0 et 1 position y z, 2 et 3 vitesse y z),
-    # T (0 =» 1st point, 1 =» all middle points, 2 =» last point)]
-
-    # Path constraint
-    x_bounds = BoundsList()
-    x_bounds.add(bounds=QAndQDotBounds(biorbd_model[0]))
-    x_bounds.add(bounds=QAndQDotBounds(biorbd_model[0]))
-    x_bounds.add(bounds=QAndQDotBounds(biorbd_model[0]))
-    x_bounds.add(bounds=QAndQDotBounds(biorbd_model[0]))
-
-    x_bounds[0][[0, 1, 2], 0] = 0
-    x_bounds[3][[0, 1, 2], 2] = 0
-
-    # Initial guess
-    x_init = InitialGuessList()
-    x_init.add([0] * (biorbd_model[0].nbQ() + biorbd_model[0].nbQdot()))
-    x_init.add([0] * (biorbd_model[0].nbQ() + biorbd_model[0].nbQdot()))
-    x_init.add([0] * (biorbd_model[0].nbQ() + biorbd_model[0].nbQdot()))
-    x_init.add([0] * (biorbd_model[0].nbQ() + biorbd_model[0].nbQdot()))
-
-    for i in range(4):
-        x_init[i][4, 0] = 0.08
-        x_init[i][5, 0] = 0.67
-        x_init[i][6, 0] = 1.11
-        x_init[i][7, 0] = 1.48
-        x_init[i][9, 0] = 0.17
-
-    # Define control path constraint
-    u_bounds = BoundsList()
-    u_bounds.add([tau_min] * biorbd_model[0].nbGeneralizedTorque(), [tau_max] * biorbd_model[0].nbGeneralizedTorque())
-    u_bounds.add([tau_min] * biorbd_model[0].nbGeneralizedTorque(), [tau_max] * biorbd_model[0].nbGeneralizedTorque())
-    u_bounds.add([tau_min] * biorbd_model[0].nbGeneralizedTorque(), [tau_max] * biorbd_model[0].nbGeneralizedTorque())
-    u_bounds.add([tau_min] * biorbd_model[0].nbGeneralizedTorque(), [tau_max] * biorbd_model[0].nbGeneralizedTorque())
-
-    u_init = InitialGuessList()
-    u_init.add([tau_init] * biorbd_model[0].nbGeneralizedTorque())
-    u_init.add([tau_init] * biorbd_model[0].nbGeneralizedTorque())
-    u_init.add([tau_init] * biorbd_model[0].nbGeneralizedTorque())
-    u_init.add([tau_init] * biorbd_model[0].nbGeneralizedTorque())
-
-    return OptimalControlProgram(
-        biorbd_model,
-        dynamics,
-        n_shooting,
-        phase_time,
-        x_init,
-        u_init,
-        x_bounds,
-        u_bounds,
-        objective_functions=objective_functions,
-        constraints=constraints,
-        phase_transitions=phase_transition,
-        ode_solver=ode_solver,
-    )
+    Parameters
+    ----------
+    job: tuple
+        The (tau_minimisation_weight, objectives_weight_coefficient) job to seed
+    solved_jobs: set
+        The jobs already solved
 
+    Returns
+    -------
+    The seed job, or None if no job of the family is solved
+    """
+    family = [solved for solved in solved_jobs if weight_family(solved) == weight_family(job)]
+    if not family:
+        return None
+    return min(family, key=lambda solved: abs(solved[0] - job[0]))
 
-"""
 
-MULTI-START : Solve a multiphase ocp, and save the solution results for different weight of minimisations.  
+def continuation_ready_jobs(jobs: list, solved_jobs: set, remaining_jobs: list, n_anchors: int) -> list:
+    """
+    The jobs which can be started now in continuation mode : the direct neighbours (in weight) of a solved job of
+    their family, or, for a family without any solved job, n_anchors evenly spaced jobs solved from scratch
 
-"""
+    Parameters
+    ----------
+    jobs: list
+        All the jobs of the multistart
+    solved_jobs: set
+        The jobs already solved
+    remaining_jobs: list
+        The jobs neither solved nor started
+    n_anchors: int
+        The number of jobs solved from scratch in each family
 
-number_simulation = -1
+    Returns
+    -------
+    The jobs to start
+    """
+    ready = []
+    for ratio in sorted({weight_family(job) for job in jobs}):
+        family = sorted([job for job in jobs if weight_family(job) == ratio])
+        if not any(job in solved_jobs for job in family):
+            anchors = {family[int((i + 0.5) * len(family) / n_anchors)] for i in range(min(n_anchors, len(family)))}
+            ready += [job for job in family if job in anchors and job in remaining_jobs]
+            continue
+        for i, job in enumerate(family):
+            neighbours = family[max(i - 1, 0) : i + 2]
+            if job in remaining_jobs and any(neighbour in solved_jobs for neighbour in neighbours):
+                ready.append(job)
+    return ready
+
+
+def family_end_jobs(jobs: list) -> list:
+    """
+    The jobs of the least and of the greatest tau_minimisation_weight of each family, the ends of its front
+    """
+    ends = set()
+    for ratio in {weight_family(job) for job in jobs}:
+        family = sorted(job for job in jobs if weight_family(job) == ratio)
+        ends |= {family[0], family[-1]}
+    return sorted(ends)
 
-for tau_minimisation_weight in range(1000, 20000, 3000):  # Tests
-    os.mkdir(
-        "../4_multistart_different_minimisations/1_results_multistart"
-        "/Solutions__minimisation_weight_for_distal_articulations_at_" + str(tau_minimisation_weight)
-    )
-    for objectives_weight_coefficient in [tau_minimisation_weight/1000, tau_minimisation_weight/100]:
-        print(
-            "\nMinimisation weight for ulna, radius, finger and hand at "
-            + str(tau_minimisation_weight)
-            + " & other articulations minimized at 100, with other objectives multiply by "
-            + str(objectives_weight_coefficient)
-            + "."
-        )
 
-        ocp = prepare_ocp(tau_minimisation_weight, objectives_weight_coefficient)
-        ocp.add_plot_penalty(CostType.ALL)
+def front_points(table: pd.DataFrame) -> dict:
+    """
+    The (distal, proximal) torque sums of each solved job, from the table of the simulations
+    """
+    sums = torque_sums(table)
+    jobs = zip(table["tau_minimisation_weight"], table["objectives_weight_coefficient"])
+    return {job: point for job, point in zip(jobs, sums[["distal", "every_proximal_limbs"]].to_numpy())}
+
+
+def adaptive_jobs(
+    points: dict,
+    running_jobs: set,
+    n_jobs: int,
+    gap_tolerance: float = 0.05,
+    min_weight_ratio: float = 1.1,
+    failed_jobs: set = frozenset(),
+) -> list:
+    """
+    The next jobs of an adaptive sweep : in each family, the weight between the two neighbour solved weights whose
+    points are the farthest apart on the front (bisection in log of the weight, as the weights span decades)
 
-        # # --- Solve the program --- # #
+    Parameters
+    ----------
+    points: dict
+        The (distal, proximal) torque sums of each solved job
+    running_jobs: set
+        The jobs started and not solved yet, the intervals which contain one are not split again
+    n_jobs: int
+        The maximal number of jobs returned
+    gap_tolerance: float
+        The gaps of the front shorter than this fraction of the extent of the front of the family are not split
+    min_weight_ratio: float
+        The intervals whose greatest weight is less than min_weight_ratio times the least one are not split
+    failed_jobs: set
+        The jobs which failed for good, the intervals which contain one are not split again (its weight would be
+        proposed again)
 
-        solv = Solver.IPOPT(show_online_optim=False)
-        solv.set_maximum_iterations(100000000)
-        solv.set_linear_solver("ma57")
-        tic = time.time()
-        sol = ocp.solve(solv)
+    Returns
+    -------
+    The new jobs, the largest gaps first
+    """
+    candidates = []
+    for ratio in {weight_family(job) for job in points}:
+        family = sorted(job for job in points if weight_family(job) == ratio)
+        if len(family) < 2:
+            continue
+        family_points = np.array([points[job] for job in family])
+        extent = np.ptp(family_points, axis=0)
+        gaps = np.linalg.norm(np.diff(family_points, axis=0) / np.where(extent > 0, extent, 1), axis=1)
+        blocked_weights = [job[0] for job in set(running_jobs) | set(failed_jobs) if weight_family(job) == ratio]
+        for low, high, gap in zip(family[:-1], family[1:], gaps):
+            if gap <= gap_tolerance or high[0] < min_weight_ratio * low[0]:
+                continue
+            if any(low[0] < weight < high[0] for weight in blocked_weights):
+                continue
+            weight = float(np.sqrt(low[0] * high[0]))
+            weight = int(round(weight)) if weight >= 10 else round(weight, 3)
+            candidates.append((gap, (weight, round(weight * ratio, 12))))
+    return [job for _, job in sorted(candidates, reverse=True)[:n_jobs]]
+
+
+def main(
+    n_workers: int = None,
+    n_threads_per_job: int = 1,
+    resume: bool = True,
+    n_retries: int = 2,
+    continuation: bool = False,
+    n_anchors: int = None,
+    compiled_functions: bool = False,
+    adaptive: bool = False,
+    max_jobs: int = 20,
+    gap_tolerance: float = 0.05,
+    reuse_ocp: bool = True,
+):
+    """
+    Run the multistart, dispatching each (weight, coefficient) pair to a worker process.
+    The status of each job is recorded in the ledger, so an interrupted multistart can be resumed.
+    In continuation mode, each job starts from the solution of the nearest solved weight of its family instead of
+    the initial guess, and the jobs are started along the weights from the solved ones.
 
-        # # --- Download datas on a .pckl file --- #
+    Parameters
+    ----------
+    n_workers: int
+        The number of worker processes (default: as many as the cores allow with n_threads_per_job threads each)
+    n_threads_per_job: int
+        The number of threads (and pinned cores) given to the linear solver of each job
+    resume: bool
+        If the jobs whose solution already exists and is valid are skipped
+    n_retries: int
+        The number of times a failed job is solved again
+    continuation: bool
+        If each job is warm started from the nearest already solved job
+    n_anchors: int
+        In continuation mode, the number of jobs solved from scratch in a family without any solved job
+        (default: the workers are shared between the families)
+    compiled_functions: bool
+        If the kinematics functions are compiled, the .so files are compiled once and shared by the workers
+    adaptive: bool
+        If only the ends of the front of each family of sweep_jobs are solved first, then the weights where the front
+        has its largest gaps, instead of the whole grid of sweep_jobs
+    max_jobs: int
+        In adaptive mode, the maximal number of jobs of the multistart
+    gap_tolerance: float
+        In adaptive mode, the gaps of the front shorter than this fraction of its extent are not split
+    reuse_ocp: bool
+        If each worker builds its ocp once and only updates its weights for its next jobs
+    """
 
-        data = dict(
-            states=sol.states,
-            controls=sol.controls,
-            parameters=sol.parameters,
-            iterations=sol.iterations,
-            cost=np.array(sol.cost)[0][0],
-            detailed_cost=sol.detailed_cost,
-            real_time_to_optimize=sol.real_time_to_optimize,
-            param_scaling=[nlp.parameters.scaling for nlp in ocp.nlp],
-        )
-        with open(
-            "../4_multistart_different_minimisations/1_results_multistart"
-            "/Solutions__minimisation_weight_for_distal_articulations_at_"
-            + str(tau_minimisation_weight)
-            + "/other_objectives_multiply_by_"
-            + str(objectives_weight_coefficient)
-            + ".pckl",
-            "wb",
-        ) as file:
-            pickle.dump(data, file)
-
-        # # --- Results analysis --- # #
-
-        # - Pareto front curve of one proximal limb torques d. on distal limbs torques - #
-
-        """ 
-        
-        To file a tab for each proximal articulations, in order to plot a pareto front curve of y(x) 
-            after the multi start in an external code.
-        1st column (x) : Sum of distal articulations torques (absolute values).
-        2nd column (y) : Sum of the torque of the chosen proximal articulation (absolute values). 
-        
-        """
-
-        # new_value
-        simulation = []
-        pelvis_z = []
-        thorax_y = []
-        thorax_z = []
-        humerus_x = []
-        humerus_y = []
-        humerus_z = []
-        ulna = []
-        radius = []
-        hand = []
-        finger = []
-
-        dt = [
-            0.3 / len(sol.controls[0]["tau"][0, :-1]),
-            0.044 / len(sol.controls[1]["tau"][0, :-1]),
-            0.051 / len(sol.controls[2]["tau"][0, :-1]),
-            0.35 / len(sol.controls[3]["tau"][0, :-1]),
+    ledger = JobLedger(LEDGER_PATH)
+    if os.path.isfile(LEGACY_TABLE_PATH):
+        n_rows = migrate_legacy_table()
+        if n_rows:
+            print(str(n_rows) + " rows of the old tab_tau_each_dof.pckl are added to the table.")
+    jobs = sweep_jobs()
+    if adaptive:
+        # The ends of each front, and the jobs already done by a previous adaptive sweep.
+        done_jobs = [
+            (job["tau_minimisation_weight"], job["objectives_weight_coefficient"])
+            for job in ledger.jobs.values()
+            if job["status"] == DONE
         ]
-
-        a = np.delete(sol.controls[0]["tau"], -1, axis=1)
-        simulation += ["minim_" + str(tau_minimisation_weight) + "_obj_" + str(objectives_weight_coefficient)]
-        pelvis_z += [sum(abs((a[0, :]) * dt[0]))]
-        thorax_y += [sum(abs((a[1, :]) * dt[0]))]
-        thorax_z += [sum(abs((a[2, :]) * dt[0]))]
-        humerus_x += [sum(abs((a[3, :]) * dt[0]))]
-        humerus_y += [sum(abs((a[4, :]) * dt[0]))]
-        humerus_z += [sum(abs((a[5, :]) * dt[0]))]
-        ulna += [sum(abs((a[6, :]) * dt[0]))]
-        radius += [sum(abs((a[7, :]) * dt[0]))]
-        hand += [sum(abs((a[8, :]) * dt[0]))]
-        finger += [sum(abs((a[9, :]) * dt[0]))]
-
-        number_simulation += 1
-
-        for i in range(1, 4):
-            a = np.delete(sol.controls[i]["tau"], -1, axis=1)
-            pelvis_z[0] += sum(abs(a[0, :] * dt[i]))
-            thorax_y[0] += sum(abs(a[1, :] * dt[i]))
-            thorax_z[0] += sum(abs(a[2, :] * dt[i]))
-            humerus_x[0] += sum(abs(a[3, :] * dt[i]))
-            humerus_y[0] += sum(abs(a[4, :] * dt[i]))
-            humerus_z[0] += sum(abs(a[5, :] * dt[i]))
-            ulna[0] += sum(abs(a[6, :] * dt[i]))
-            radius[0] += sum(abs(a[7, :] * dt[i]))
-            hand[0] += sum(abs(a[8, :] * dt[i]))
-            finger[0] += sum(abs(a[9, :] * dt[i]))
-
-        new_value = pd.DataFrame(
-            {
-                "simulation": simulation,
-                "pelvis_z": pelvis_z,
-                "thorax_y": thorax_y,
-                "thorax_z": thorax_z,
-                "humerus_x": humerus_x,
-                "humerus_y": humerus_y,
-                "humerus_z": humerus_z,
-                "ulna": ulna,
-                "radius": radius,
-                "hand": hand,
-                "finger": finger,
-            }
-        )
-        if number_simulation == 0:
-            tab_tau = new_value
-            with open(
-                "../4_multistart_different_minimisations/2_results_analysis/"
-                "pareto_front_curve_of_one_proximal_limb_torques_d._on_distal_limbs_torques"
-                "/tab_tau_each_dof" + ".pckl",
-                "wb",
-            ) as file:
-                pickle.dump(tab_tau, file)
+        jobs = sorted(set(family_end_jobs(jobs) + done_jobs))
+    available_cores = sorted(os.sched_getaffinity(0))
+
+    # The folders are created by the main process only, before any worker starts.
+    for tau_minimisation_weight in sorted({job[0] for job in jobs}):
+        os.makedirs(weight_folder(tau_minimisation_weight), exist_ok=True)
+
+    # The missing rows of the jobs already done are taken from their solution.
+    simulations_in_table = set(read_results_table(TAB_TAU_FOLDER)["simulation"])
+    jobs_to_solve = []
+    for job in jobs:
+        data = load_valid_solution(solution_path(*job)) if resume else None
+        if data is None:
+            ledger.set_pending(*job)
+            jobs_to_solve.append(job)
         else:
-            with open(
-                "../4_multistart_different_minimisations/2_results_analysis/"
-                "pareto_front_curve_of_one_proximal_limb_torques_d._on_distal_limbs_torques"
-                "/tab_tau_each_dof" + ".pckl",
-                "rb",
-            ) as file:
-                tab_tau = pickle.load(file)
-
-            tab_tau = pd.concat([tab_tau, new_value])
-            with open(
-                "../4_multistart_different_minimisations/2_results_analysis/"
-                "pareto_front_curve_of_one_proximal_limb_torques_d._on_distal_limbs_torques"
-                "/tab_tau_each_dof" + ".pckl",
-                "wb",
-            ) as file:
-                pickle.dump(tab_tau, file)
-
-        print(tab_tau)
+            ledger.set_done(*job, iterations=data["iterations"])
+            if job_name(*job) not in simulations_in_table:
+                phase_time = data.get("phase_time", PRESSED_PHASE_TIME)
+                append_row(TAB_TAU_FOLDER, tab_tau_row(data["controls"], phase_time, *job))
+    print(str(len(jobs) - len(jobs_to_solve)) + " jobs already done, " + str(len(jobs_to_solve)) + " jobs to solve.")
+
+    if n_workers is None:
+        n_workers = max(1, len(available_cores) // n_threads_per_job)
+    # In adaptive mode, the jobs added during the sweep need workers too.
+    n_jobs_to_solve = len(jobs_to_solve) + (max(max_jobs - len(jobs), 0) if adaptive else 0)
+    n_workers = max(1, min(n_workers, n_jobs_to_solve))
+    if n_anchors is None:
+        n_anchors = max(1, n_workers // len({weight_family(job) for job in jobs}))
+
+    tic = time.time()
+    executor = worker_pool(n_workers, n_threads_per_job, available_cores)
+    # The pool of each future, a broken pool is replaced but its futures are still waited for.
+    future_pools = {}
+    try:
+        futures = {}
+        solved_jobs = set(jobs) - set(jobs_to_solve)
+        remaining_jobs = list(jobs_to_solve)
+
+        def submit(job):
+            nonlocal executor
+            # The folder of a weight added by the adaptive sweep.
+            os.makedirs(weight_folder(job[0]), exist_ok=True)
+            seed = continuation_seed(job, solved_jobs) if continuation else None
+            ledger.set_running(*job)
+            seed_path = solution_path(*seed) if seed else None
+            try:
+                future = executor.submit(solve_job, *job, seed_path, compiled_functions, reuse_ocp)
+            except BrokenProcessPool:
+                # A worker died since the last wait, the jobs of the broken pool fail and are retried when waited for.
+                executor.shutdown(wait=False)
+                executor = worker_pool(n_workers, n_threads_per_job, available_cores)
+                future = executor.submit(solve_job, *job, seed_path, compiled_functions, reuse_ocp)
+            futures[future] = job
+            future_pools[future] = executor
+            if job in remaining_jobs:
+                remaining_jobs.remove(job)
+
+        def submit_ready_jobs():
+            ready = continuation_ready_jobs(jobs, solved_jobs, remaining_jobs, n_anchors) if continuation else []
+            if not continuation or (not ready and not futures):
+                # Without continuation, or if the continuation is stuck by failed jobs, the jobs are all started.
+                ready = list(remaining_jobs)
+            # No more jobs than workers are in the pool, so the jobs lost by a broken pool are only the running ones.
+            for job in ready[: max(n_workers - len(futures), 0)]:
+                submit(job)
+            if adaptive and len(jobs) < max_jobs and len(futures) < n_workers:
+                # The free workers split the largest gaps of the front of the solved jobs.
+                points = front_points(read_results_table(TAB_TAU_FOLDER))
+                failed_jobs = {
+                    (job["tau_minimisation_weight"], job["objectives_weight_coefficient"])
+                    for job in ledger.jobs.values()
+                    if job["status"] == FAILED
+                }
+                new_jobs = adaptive_jobs(
+                    {job: point for job, point in points.items() if job in solved_jobs},
+                    set(futures.values()) | set(remaining_jobs),
+                    min(n_workers - len(futures), max_jobs - len(jobs)),
+                    gap_tolerance,
+                    failed_jobs=failed_jobs,
+                )
+                for job in new_jobs:
+                    jobs.append(job)
+                    submit(job)
+
+        submit_ready_jobs()
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            if any(
+                isinstance(future.exception(), BrokenProcessPool) and future_pools[future] is executor
+                for future in done
+            ):
+                # A worker died (segmentation fault of the linear solver, killed for memory...) : all the jobs of the
+                # pool fail, they are retried in a new pool. Which job killed the worker is not known, so each running
+                # job uses one of its attempts, and a job which always kills its worker stops after n_retries.
+                print("A worker died, the pool of workers is started again.")
+                done |= wait([future for future in futures if future_pools[future] is executor])[0]
+                executor.shutdown(wait=False)
+                executor = worker_pool(n_workers, n_threads_per_job, available_cores)
+            retried_jobs = []
+            for future in done:
+                job = futures.pop(future)
+                future_pools.pop(future)
+                try:
+                    iterations, wall_time = future.result()
+                except Exception as error:
+                    ledger.set_failed(*job, repr(error))
+                    print("The job " + job_name(*job) + " failed : " + repr(error))
+                    if ledger.job(*job)["attempts"] <= n_retries:
+                        retried_jobs.append(job)
+                    continue
+                ledger.set_done(*job, wall_time=wall_time, iterations=iterations)
+                solved_jobs.add(job)
+                print("The job " + job_name(*job) + " is done in " + str(wall_time) + " s.")
+            # The retried jobs are started first.
+            remaining_jobs[:0] = retried_jobs
+            submit_ready_jobs()
+    finally:
+        executor.shutdown()
+
+    # The row files of the jobs are merged into one table.
+    tab_tau = compact_results_table(TAB_TAU_FOLDER)
+    print(tab_tau)
+    print("Temps de resolution du multistart : ", time.time() - tic, "s")
+
+
+if __name__ == "__main__":
+    main()
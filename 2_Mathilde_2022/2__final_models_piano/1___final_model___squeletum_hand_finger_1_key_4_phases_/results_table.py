@@ -0,0 +1,110 @@
+"""
+Append-only table of the integral of the absolute torque of each dof (Σ(| tau * dt |)) of the multistart simulations.
+Each simulation writes its own row file, so several jobs can finish at the same time without reading or rewriting the
+whole table, and compact_results_table merges the row files into one .csv file.
+"""
+import os
+import sys
+import glob
+import pandas as pd
+
+# The helpers of the atomic writes are shared with the experimental datas.
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from atomic_files import write_file
+
+DOF_NAMES = (
+    "pelvis_z",
+    "thorax_y",
+    "thorax_z",
+    "humerus_x",
+    "humerus_y",
+    "humerus_z",
+    "ulna",
+    "radius",
+    "hand",
+    "finger",
+)
+WEIGHT_NAMES = ("tau_minimisation_weight", "objectives_weight_coefficient")
+# The dofs keep the columns 1 to 10 of the old tab_tau_each_dof.pckl, the weights are added after them.
+COLUMNS_DTYPES = dict(simulation="object", **{name: "float64" for name in DOF_NAMES + WEIGHT_NAMES})
+
+TABLE_NAME = "tab_tau_each_dof"
+
+
+def compacted_path(table_folder: str) -> str:
+    return os.path.join(table_folder, TABLE_NAME + ".csv")
+
+
+def rows_folder(table_folder: str) -> str:
+    return os.path.join(table_folder, TABLE_NAME + "_rows")
+
+
+def typed_table(table: pd.DataFrame) -> pd.DataFrame:
+    return table[list(COLUMNS_DTYPES.keys())].astype(COLUMNS_DTYPES).reset_index(drop=True)
+
+
+def append_row(table_folder: str, row: pd.DataFrame):
+    """
+    Add the row of one simulation to the table, in its own file
+
+    Parameters
+    ----------
+    table_folder: str
+        The folder of the table
+    row: pd.DataFrame
+        The one row tab of the simulation
+    """
+    os.makedirs(rows_folder(table_folder), exist_ok=True)
+    path = os.path.join(rows_folder(table_folder), row["simulation"].iloc[0] + ".csv")
+    # Written in a temporary file then renamed, so a reader never sees a half written row.
+    write_file(path, lambda tmp_path: typed_table(row).to_csv(tmp_path, index=False))
+
+
+def read_results_table(table_folder: str) -> pd.DataFrame:
+    """
+    Read the compacted table and the row files not compacted yet
+
+    Parameters
+    ----------
+    table_folder: str
+        The folder of the table
+
+    Returns
+    -------
+    The table, one row per simulation (the last row written is kept if a simulation was solved again)
+    """
+    tables = []
+    if os.path.isfile(compacted_path(table_folder)):
+        tables.append(pd.read_csv(compacted_path(table_folder), dtype=COLUMNS_DTYPES))
+    for path in sorted(glob.glob(os.path.join(rows_folder(table_folder), "*.csv"))):
+        tables.append(pd.read_csv(path, dtype=COLUMNS_DTYPES))
+    if not tables:
+        return typed_table(pd.DataFrame(columns=list(COLUMNS_DTYPES.keys())))
+
+    table = pd.concat(tables).drop_duplicates(subset="simulation", keep="last")
+    return typed_table(table)
+
+
+def compact_results_table(table_folder: str) -> pd.DataFrame:
+    """
+    Merge the row files into the compacted .csv file, then delete them
+
+    Parameters
+    ----------
+    table_folder: str
+        The folder of the table
+
+    Returns
+    -------
+    The compacted table
+    """
+    row_times = {
+        path: os.path.getmtime(path) for path in glob.glob(os.path.join(rows_folder(table_folder), "*.csv"))
+    }
+    table = read_results_table(table_folder)
+    write_file(compacted_path(table_folder), lambda tmp_path: table.to_csv(tmp_path, index=False))
+    # Only the rows unchanged since the compaction started are deleted, a row written meanwhile is kept.
+    for path, row_time in row_times.items():
+        if os.path.getmtime(path) == row_time:
+            os.remove(path)
+    return table
@@ -0,0 +1,221 @@
+"""
+Catalog of the solutions of a tree of results, so the analysis scripts select their solutions by a query
+("attack == 'pressed' and tau_minimisation_weight >= 10000") instead of an absolute path to a .pckl file.
+The tree is scanned once, each solution (.sol, or .pckl converted to .sol, see solution_store) is indexed by its
+metadata only, its arrays are never read : attack type, weights, number of shooting nodes and duration of each phase,
+cost, iterations, solve time and hash of the files. The catalog is saved in a .csv file at the root of the tree, and
+the next scan only opens the solutions added or modified since.
+The attack and the weights of the solutions saved without them are taken from their path (pressed/strucked,
+..._distal_articulations_at_<weight>/other_objectives_multiply_by_<coefficient>).
+"""
+import os
+import re
+import sys
+import glob
+import hashlib
+import numpy as np
+import pandas as pd
+
+from solution_store import open_solution, solution_store_path, is_up_to_date, METADATA_FILE, SOLUTION_SUFFIX
+
+# solution_store adds the folder of the shared helpers to the path.
+from atomic_files import write_file
+
+CATALOG_NAME = "solution_catalog.csv"
+ATTACK_NAMES = ("pressed", "strucked")
+COLUMNS_DTYPES = dict(
+    path="object",
+    attack="object",
+    tau_minimisation_weight="float64",
+    objectives_weight_coefficient="float64",
+    n_phases="int64",
+    # One value per phase, separated by ";".
+    n_shooting="object",
+    phase_time="object",
+    total_time="float64",
+    cost="float64",
+    iterations="float64",
+    real_time_to_optimize="float64",
+    size="int64",
+    mtime="float64",
+    hash="object",
+)
+PATH_WEIGHTS = dict(
+    tau_minimisation_weight=re.compile(r"distal_articulations_at_([0-9.]+)"),
+    objectives_weight_coefficient=re.compile(r"other_objectives_multiply_by_([0-9.]+)"),
+)
+
+
+def catalog_path(root: str) -> str:
+    return os.path.join(root, CATALOG_NAME)
+
+
+def solution_files(path: str) -> list:
+    # The files of a .sol folder, or the .pckl file.
+    if os.path.isdir(path):
+        return sorted(os.path.join(path, name) for name in os.listdir(path))
+    return [path]
+
+
+def files_stamp(path: str) -> dict:
+    files = solution_files(path)
+    return dict(
+        size=sum(os.path.getsize(file) for file in files),
+        mtime=max(os.path.getmtime(file) for file in files),
+    )
+
+
+def files_hash(path: str) -> str:
+    digest = hashlib.sha1()
+    for file_path in solution_files(path):
+        with open(file_path, "rb") as file:
+            digest.update(file.read())
+    return digest.hexdigest()
+
+
+def find_solution_paths(root: str) -> list:
+    """
+    The solutions of a tree : the .pckl files, and the .sol folders which are not converted from a .pckl file
+    """
+    solutions = [
+        path
+        for path in glob.glob(os.path.join(root, "**", "*" + SOLUTION_SUFFIX), recursive=True)
+        if os.path.isfile(os.path.join(path, METADATA_FILE))
+    ]
+    pickles = glob.glob(os.path.join(root, "**", "*.pckl"), recursive=True)
+    # A .pckl file stands for its .sol folder.
+    return sorted(set(solutions) - {solution_store_path(path) for path in pickles}) + sorted(pickles)
+
+
+def joined(values) -> str:
+    return ";".join(repr(float(value)) if not float(value).is_integer() else str(int(value)) for value in values)
+
+
+def solution_row(path: str, root: str) -> dict:
+    """
+    The catalog row of one solution, from its metadata
+
+    Parameters
+    ----------
+    path: str
+        The path to the .sol folder (or .pckl file, converted first)
+    root: str
+        The root of the tree, the path of the row is relative to it
+
+    Returns
+    -------
+    The dict of the columns of the catalog
+    """
+    # A .pckl file is converted, its row is the row of its .sol folder.
+    solution = open_solution(path)
+    path = solution.path
+    relative_path = os.path.relpath(path, root)
+
+    attack = solution.get("attack")
+    if attack is None:
+        parts = [part.lower() for part in relative_path.split(os.sep)]
+        attack = next((name for name in ATTACK_NAMES if any(name in part for part in parts)), "")
+    weights = dict(solution.get("weights", {}))
+    for name, pattern in PATH_WEIGHTS.items():
+        match = pattern.search(relative_path)
+        if name not in weights:
+            weights[name] = float(match.group(1).rstrip(".")) if match else np.nan
+
+    # The number of shooting nodes is read from the shape of the controls, not from the arrays.
+    n_shooting = [solution.shape("controls", phase, "tau")[1] - 1 for phase in range(len(solution["controls"]))]
+    phase_time = solution.get("phase_time")
+    return dict(
+        path=relative_path,
+        attack=attack,
+        tau_minimisation_weight=weights["tau_minimisation_weight"],
+        objectives_weight_coefficient=weights["objectives_weight_coefficient"],
+        n_phases=len(n_shooting),
+        n_shooting=joined(n_shooting),
+        phase_time=joined(phase_time) if phase_time is not None else "",
+        total_time=float(np.sum(phase_time)) if phase_time is not None else np.nan,
+        cost=solution.get("cost", np.nan),
+        iterations=solution.get("iterations", np.nan),
+        real_time_to_optimize=solution.get("real_time_to_optimize", np.nan),
+        hash=files_hash(path),
+        **files_stamp(path),
+    )
+
+
+def typed_catalog(catalog: pd.DataFrame) -> pd.DataFrame:
+    return catalog[list(COLUMNS_DTYPES.keys())].astype(COLUMNS_DTYPES).reset_index(drop=True)
+
+
+def read_catalog(root: str) -> pd.DataFrame:
+    if not os.path.isfile(catalog_path(root)):
+        return typed_catalog(pd.DataFrame(columns=list(COLUMNS_DTYPES.keys())))
+    return typed_catalog(pd.read_csv(catalog_path(root), dtype=COLUMNS_DTYPES, keep_default_na=False, na_values=[""]))
+
+
+def scan(root: str) -> pd.DataFrame:
+    """
+    Index the solutions of a tree, only the solutions added or modified since the last scan are opened
+
+    Parameters
+    ----------
+    root: str
+        The root of the tree of results
+
+    Returns
+    -------
+    The catalog, one row per solution
+    """
+    previous = read_catalog(root).set_index("path")
+    rows = []
+    for path in find_solution_paths(root):
+        solution_path = solution_store_path(path) if path.endswith(".pckl") else path
+        relative_path = os.path.relpath(solution_path, root)
+        # The .sol folder of a .pckl file modified since its conversion is converted and indexed again.
+        up_to_date = not path.endswith(".pckl") or is_up_to_date(path)
+        if relative_path in previous.index and os.path.isdir(solution_path) and up_to_date:
+            row = previous.loc[relative_path]
+            stamp = files_stamp(solution_path)
+            if row["size"] == stamp["size"] and row["mtime"] == stamp["mtime"]:
+                rows.append(dict(row, path=relative_path))
+                continue
+        rows.append(solution_row(path, root))
+
+    catalog = typed_catalog(pd.DataFrame(rows, columns=list(COLUMNS_DTYPES.keys())))
+    # Written in a temporary file then renamed, so a reader never sees a half written catalog.
+    write_file(catalog_path(root), lambda tmp_path: catalog.to_csv(tmp_path, index=False))
+    return read_catalog(root)
+
+
+def select_solutions(root: str, query: str = None, rescan: bool = True, sort_by: str = "path") -> pd.DataFrame:
+    """
+    Select solutions of a tree by a query on the catalog
+
+    Parameters
+    ----------
+    root: str
+        The root of the tree of results
+    query: str
+        A pandas query on the columns of the catalog, for example
+        "attack == 'pressed' and tau_minimisation_weight >= 10000" or "path.str.startswith('pressed/2_')" (the paths
+        are relative to the root), None to select all of them
+    rescan: bool
+        If the tree is scanned for new or modified solutions first, else the saved catalog is used as is
+    sort_by: str
+        The column the solutions are sorted by
+
+    Returns
+    -------
+    The rows of the selected solutions, with the absolute path of each solution
+    """
+    catalog = scan(root) if rescan else read_catalog(root)
+    if query is not None:
+        # The python engine allows the string methods on the paths ("path.str.startswith('pressed/')").
+        catalog = catalog.query(query, engine="python")
+    catalog = catalog.sort_values(sort_by).reset_index(drop=True)
+    catalog["path"] = [os.path.join(os.path.abspath(root), path) for path in catalog["path"]]
+    return catalog
+
+
+if __name__ == "__main__":
+    # python solution_catalog.py <root of the results> ["<query>"]
+    pd.set_option("display.width", 200)
+    print(select_solutions(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None))
@@ -0,0 +1,214 @@
+"""
+Solution files read array by array, instead of the .pckl dicts which must be unpickled entirely (with bioptim
+importable) to read one joint angle.
+A solution is a folder (other_objectives_multiply_by_1.sol) : each array of the data dict (the q, qdot, tau... of each
+phase, the multipliers...) in its own .npy file, and a .json file with the rest of the dict (phase times, weights, cost,
+iterations, detailed cost...) and the shape of each array. The .npy files are opened memory-mapped when they are
+read, so reading the tau of hundreds of solutions only loads these arrays.
+The solution is read as the data dict of the .pckl files : sol["controls"][phase]["tau"], sol["cost"],
+sol.get("phase_time")...
+The .pckl files are converted once (convert_pickle, or convert_folder for a tree of results), and again if the .pckl
+file is modified.
+"""
+import os
+import sys
+import json
+import glob
+import pickle
+from collections.abc import Mapping
+import numpy as np
+
+# The helpers of the atomic writes are shared with the experimental datas.
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from atomic_files import write_folder
+
+SOLUTION_SUFFIX = ".sol"
+METADATA_FILE = "metadata.json"
+# The key of the nodes of the .json tree which are a .npy file.
+ARRAY_KEY = "__array__"
+FORMAT_VERSION = 1
+
+
+def solution_store_path(path: str) -> str:
+    # other_objectives_multiply_by_1.pckl -> other_objectives_multiply_by_1.sol
+    return os.path.splitext(path)[0] + SOLUTION_SUFFIX
+
+
+def source_stamp(path: str) -> dict:
+    return dict(size=os.path.getsize(path), mtime=os.path.getmtime(path))
+
+
+def to_tree(value, name: str, arrays: dict):
+    """
+    The .json tree of a value of the data dict, its arrays are added to arrays by file name
+    """
+    if isinstance(value, dict):
+        return {str(key): to_tree(item, name + "." + str(key), arrays) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_tree(item, name + "." + str(i), arrays) for i, item in enumerate(value)]
+    if isinstance(value, np.ndarray) and value.ndim > 0:
+        file_name = name + ".npy"
+        arrays[file_name] = value
+        return {ARRAY_KEY: file_name}
+    if isinstance(value, (np.ndarray, np.generic)):
+        return value.item()
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    # The objects of bioptim or casadi (DM...) are saved as arrays if they can be, else as their repr.
+    try:
+        return to_tree(np.array(value, dtype=float), name, arrays)
+    except (TypeError, ValueError):
+        return repr(value)
+
+
+def save_solution(path: str, data: dict, source: dict = None) -> str:
+    """
+    Save the data dict of a solution
+
+    Parameters
+    ----------
+    path: str
+        The path of the .sol folder
+    data: dict
+        The data dict of the solution (states, controls, cost...)
+    source: dict
+        The size and modification time of the .pckl file the solution is converted from
+
+    Returns
+    -------
+    The path of the .sol folder
+    """
+    arrays = {}
+    tree = to_tree(data, "solution", arrays)
+    metadata = dict(
+        format=FORMAT_VERSION,
+        source=source,
+        shapes={file_name: list(array.shape) for file_name, array in arrays.items()},
+        data=tree,
+    )
+
+    def write(tmp_folder: str):
+        for file_name, array in arrays.items():
+            np.save(os.path.join(tmp_folder, file_name), np.ascontiguousarray(array))
+        with open(os.path.join(tmp_folder, METADATA_FILE), "w") as file:
+            json.dump(metadata, file, indent=1)
+
+    # Written in a folder of the process, and put in place once complete, so a reader never sees a half written
+    # solution.
+    write_folder(path, write)
+    return path
+
+
+def read_metadata(path: str) -> dict:
+    with open(os.path.join(path, METADATA_FILE), "r") as file:
+        return json.load(file)
+
+
+def is_up_to_date(pickle_path: str) -> bool:
+    metadata_path = os.path.join(solution_store_path(pickle_path), METADATA_FILE)
+    if not os.path.isfile(metadata_path):
+        return False
+    return read_metadata(solution_store_path(pickle_path))["source"] == source_stamp(pickle_path)
+
+
+def convert_pickle(path: str) -> str:
+    """
+    Convert a .pckl solution into a .sol folder next to it, if it is not up to date
+
+    Parameters
+    ----------
+    path: str
+        The path to the .pckl file
+
+    Returns
+    -------
+    The path of the .sol folder
+    """
+    if not is_up_to_date(path):
+        with open(path, "rb") as file:
+            data = pickle.load(file)
+        save_solution(solution_store_path(path), data, source=source_stamp(path))
+    return solution_store_path(path)
+
+
+def convert_folder(folder: str) -> list:
+    """
+    Convert all the .pckl solutions of a tree of results
+
+    Parameters
+    ----------
+    folder: str
+        The folder of the results, its subfolders are converted too
+
+    Returns
+    -------
+    The paths of the .sol folders
+    """
+    paths = sorted(glob.glob(os.path.join(folder, "**", "*.pckl"), recursive=True))
+    return [convert_pickle(path) for path in paths]
+
+
+class SolutionNode(Mapping):
+    """
+    A dict of a solution, whose arrays are only read when they are accessed
+    """
+
+    def __init__(self, path: str, tree: dict, shapes: dict):
+        self.path = path
+        self.tree = tree
+        self.shapes = shapes
+
+    def resolve(self, node):
+        if isinstance(node, dict):
+            if ARRAY_KEY in node:
+                return np.load(os.path.join(self.path, node[ARRAY_KEY]), mmap_mode="r")
+            return SolutionNode(self.path, node, self.shapes)
+        if isinstance(node, list):
+            return [self.resolve(item) for item in node]
+        return node
+
+    def __getitem__(self, key):
+        return self.resolve(self.tree[key])
+
+    def __iter__(self):
+        return iter(self.tree)
+
+    def __len__(self):
+        return len(self.tree)
+
+    def shape(self, *keys) -> tuple:
+        """
+        The shape of an array, without reading it (sol.shape("controls", 0, "tau"))
+        """
+        node = self.tree
+        for key in keys:
+            node = node[key]
+        return tuple(self.shapes[node[ARRAY_KEY]])
+
+    def __repr__(self):
+        return "SolutionNode(" + self.path + ", " + repr(list(self.tree)) + ")"
+
+
+def open_solution(path: str) -> SolutionNode:
+    """
+    Open a solution, a .pckl file is converted first if needed
+
+    Parameters
+    ----------
+    path: str
+        The path to the .sol folder or to the .pckl file
+
+    Returns
+    -------
+    The data dict of the solution, its arrays are memory-mapped when they are accessed
+    """
+    if path.endswith(".pckl"):
+        path = convert_pickle(path)
+    metadata = read_metadata(path)
+    return SolutionNode(path, metadata["data"], metadata["shapes"])
+
+
+if __name__ == "__main__":
+    # python solution_store.py <folder of results> : convert all its .pckl solutions.
+    for solution_path in convert_folder(sys.argv[1] if len(sys.argv) > 1 else os.getcwd()):
+        print(solution_path)
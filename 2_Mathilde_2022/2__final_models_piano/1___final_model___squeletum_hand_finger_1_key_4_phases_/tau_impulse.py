@@ -0,0 +1,74 @@
+"""
+Integral of the absolute torque of each dof during each phase (Σ(| tau * dt |)), computed for all the dofs and all the
+phases of a solution at once.
+"""
+import numpy as np
+
+from solution_store import open_solution
+
+# Phase durations of the pressed attack, for the solutions saved without their phase_time.
+PRESSED_PHASE_TIME = (0.3, 0.044, 0.051, 0.35)
+
+
+def tau_impulse(controls: list, phase_time, integration: str = "constant") -> np.ndarray:
+    """
+    Compute the integral of the absolute torque of each dof during each phase
+
+    Parameters
+    ----------
+    controls: list
+        The controls of the solution, one dict per phase with "tau" of shape (n_dof, n_shooting + 1)
+    phase_time:
+        The real duration of each phase
+    integration: str
+        "constant" : the torque is constant on each shooting interval (the control of COLLOCATION and RK solutions),
+        so Σ(| tau_k | * dt) is the exact integral. "trapezoidal" : the torque is linear between the nodes.
+
+    Returns
+    -------
+    The impulse matrix of shape (n_dof, n_phases)
+    """
+    n_shooting = np.array([phase_controls["tau"].shape[1] - 1 for phase_controls in controls])
+    dt = np.asarray(phase_time, dtype=float) / n_shooting
+    first_nodes = np.concatenate(([0], np.cumsum(n_shooting)[:-1]))
+
+    if integration == "constant":
+        # The last control of each phase is NaN, it does not act on any interval.
+        tau = np.abs(np.hstack([phase_controls["tau"][:, :-1] for phase_controls in controls]))
+    elif integration == "trapezoidal":
+        # The mean of the two nodes of each interval, the NaN last control is replaced by the previous one.
+        nodes = []
+        for phase_controls in controls:
+            phase_tau = np.abs(phase_controls["tau"])
+            phase_tau = np.where(np.isnan(phase_tau), np.roll(phase_tau, 1, axis=1), phase_tau)
+            nodes.append((phase_tau[:, :-1] + phase_tau[:, 1:]) / 2)
+        tau = np.hstack(nodes)
+    else:
+        raise ValueError("integration must be 'constant' or 'trapezoidal'")
+
+    return np.add.reduceat(tau * np.repeat(dt, n_shooting), first_nodes, axis=1)
+
+
+def tau_impulse_from_files(paths: list, integration: str = "constant", default_phase_time=PRESSED_PHASE_TIME):
+    """
+    Compute the impulse matrix of saved solutions
+
+    Parameters
+    ----------
+    paths: list
+        The paths to the .sol solutions or .pckl files
+    integration: str
+        The integration of the torque, see tau_impulse
+    default_phase_time:
+        The phase durations used for the files saved without phase_time
+
+    Returns
+    -------
+    The impulse matrices of shape (n_files, n_dof, n_phases)
+    """
+    impulses = []
+    for path in paths:
+        # Only the tau of each phase is read.
+        data = open_solution(path)
+        impulses.append(tau_impulse(data["controls"], data.get("phase_time", default_phase_time), integration))
+    return np.stack(impulses)
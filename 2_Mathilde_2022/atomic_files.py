@@ -0,0 +1,104 @@
+"""
+Files and folders written in a temporary path of the process then renamed, so a reader (another worker, the next run)
+never sees a half written file, and several processes can write the same file at the same time.
+Shared by the experimental datas and the final models : each folder adds 2_Mathilde_2022 to its path to import it.
+"""
+import os
+import shutil
+
+# The number of times a folder is put in place when other processes keep writing it at the same time.
+N_REPLACE_ATTEMPTS = 5
+
+
+def temporary_path(path: str) -> str:
+    # Named by process, so two processes writing the same path never share their temporary file.
+    return path + "_" + str(os.getpid()) + ".tmp"
+
+
+def write_file(path: str, write) -> str:
+    """
+    Write a file in a temporary file, then rename it (atomic : the file is either the old one or the new one)
+
+    Parameters
+    ----------
+    path: str
+        The path of the file
+    write:
+        The function writing the file at the path it is given
+
+    Returns
+    -------
+    The path of the file
+    """
+    tmp_path = temporary_path(path)
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return path
+
+
+def replace_folder(tmp_folder: str, path: str) -> str:
+    """
+    Put a complete folder in place of a folder : the old folder is renamed aside, the new one is renamed in its place,
+    then the old one is deleted. A folder cannot be renamed onto a non empty folder, so the folder is missing only
+    between these two renames, never while the old folder is deleted.
+
+    Parameters
+    ----------
+    tmp_folder: str
+        The complete folder
+    path: str
+        The path of the folder
+
+    Returns
+    -------
+    The path of the folder
+    """
+    old_folder = path + "_" + str(os.getpid()) + ".old"
+    for _ in range(N_REPLACE_ATTEMPTS):
+        shutil.rmtree(old_folder, ignore_errors=True)
+        try:
+            os.replace(path, old_folder)
+        except FileNotFoundError:
+            # No old folder, or another process has just renamed it aside.
+            pass
+        try:
+            os.replace(tmp_folder, path)
+            break
+        except OSError:
+            # Another process has just put its folder in place : it is renamed aside at the next attempt, the last
+            # folder written is kept.
+            continue
+    else:
+        shutil.rmtree(tmp_folder, ignore_errors=True)
+        raise OSError("The folder " + path + " is written by other processes, it could not be replaced.")
+    shutil.rmtree(old_folder, ignore_errors=True)
+    return path
+
+
+def write_folder(path: str, write) -> str:
+    """
+    Write a folder in a temporary folder, then put it in place of the folder (see replace_folder)
+
+    Parameters
+    ----------
+    path: str
+        The path of the folder
+    write:
+        The function writing the files of the folder in the folder it is given
+
+    Returns
+    -------
+    The path of the folder
+    """
+    tmp_folder = temporary_path(path)
+    os.makedirs(tmp_folder, exist_ok=True)
+    try:
+        write(tmp_folder)
+    except BaseException:
+        shutil.rmtree(tmp_folder, ignore_errors=True)
+        raise
+    return replace_folder(tmp_folder, path)
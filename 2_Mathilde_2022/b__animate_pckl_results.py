@@ -1,18 +1,24 @@
+import os
+import sys
 import bioviz
 import numpy as np
 from matplotlib import pyplot as plt
-import pickle
-from bioptim import (
-    BiorbdInterface,
-)
 
-with open(
-        "/2_Mathilde_2022/2__final_models_piano/1___final_model___squeletum_hand_finger_1_key_4_phases_/pressed/1_every_dof_minimized_at_100/1_every_dof_minimized_at_100.pckl", "rb"
-) as file:
-    new_dict = pickle.load(file)
+FINAL_MODEL_FOLDER = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "2__final_models_piano",
+    "1___final_model___squeletum_hand_finger_1_key_4_phases_",
+)
+sys.path.append(FINAL_MODEL_FOLDER)
+from solution_catalog import select_solutions
+from solution_store import open_solution
 
+# The solution animated, selected in the catalog of the results of the final model (the .pckl files are converted into
+# .sol solutions the first time).
+QUERY = r"attack == 'pressed' and path.str.fullmatch(r'pressed/1_every_dof_minimized_at_100/[^/]+\.sol')"
+solution = open_solution(select_solutions(FINAL_MODEL_FOLDER, QUERY)["path"].iloc[0])
 
-biorbd_model_path: str = "/2_Mathilde_2022/2__final_models_piano/1___final_model___squeletum_hand_finger_1_key_4_phases_/bioMod/Squeletum_hand_finger_3D_2_keys_octave_LA.bioMod"
+biorbd_model_path: str = os.path.join(FINAL_MODEL_FOLDER, "bioMod", "Squeletum_hand_finger_3D_2_keys_octave_LA.bioMod")
 
 # # --- Animate --- # #
 
@@ -26,9 +32,7 @@ b = bioviz.Viz(
     show_local_ref_frame=False,
 )
 
-all_q = np.hstack(
-    (new_dict["states"][0]["q"], new_dict["states"][1]["q"], new_dict["states"][2]["q"], new_dict["states"][3]["q"])
-)
+all_q = np.hstack([np.asarray(states["q"]) for states in solution["states"]])
 
 b.load_movement(all_q)
 b.exec()
@@ -0,0 +1,32 @@
+"""
+Times of the nodes of an ocp phase, shared by the experimental datas (the velocity profiles sampled on the nodes of a
+phase) and the final models (the time axis of the solutions).
+With COLLOCATION, the states of a phase have the collocation points of each interval between its shooting nodes.
+"""
+import numpy as np
+from casadi import collocation_points
+
+
+def node_times(n_shooting: int, polynomial_degree: int = None, collocation_method: str = "legendre") -> np.ndarray:
+    """
+    The normalized times (0 to 1) of the nodes of a phase
+
+    Parameters
+    ----------
+    n_shooting: int
+        The number of shooting intervals of the phase
+    polynomial_degree: int
+        The degree of the collocation polynomials to add the collocation points of each interval, None for the
+        shooting nodes only
+    collocation_method: str
+        The collocation points, "legendre" or "radau"
+
+    Returns
+    -------
+    The times of the n_shooting + 1 nodes, or of the nodes and the collocation points of each interval in order
+    """
+    if polynomial_degree is None:
+        return np.linspace(0, 1, n_shooting + 1)
+    # The start of each interval, then its collocation points.
+    interval_times = np.concatenate(([0], collocation_points(polynomial_degree, collocation_method)))
+    return np.concatenate(((np.arange(n_shooting)[:, np.newaxis] + interval_times).ravel() / n_shooting, [1]))